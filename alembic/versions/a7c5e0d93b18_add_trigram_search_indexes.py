@@ -0,0 +1,44 @@
+"""add pg_trgm search indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Нормализация для поиска: нижний регистр (в том числе кириллица), ё -> е
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT translate(lower(value), 'ё', 'е') $$
+    """)
+    op.execute(
+        "CREATE INDEX ix_users_full_name_trgm ON users "
+        "USING gin (search_normalize(full_name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_users_email_trgm ON users "
+        "USING gin (search_normalize(email) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_teams_team_name_trgm ON teams "
+        "USING gin (search_normalize(team_name) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_teams_team_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_full_name_trgm")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(text)")
@@ -0,0 +1,33 @@
+"""add lease columns to solution_uploads
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблицу solution_uploads создает create_all при старте приложения - сразу с этими колонками
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('solution_uploads'):
+        return
+    if 'lease_token' in {column['name'] for column in inspector.get_columns('solution_uploads')}:
+        return
+    op.add_column('solution_uploads', sa.Column('lease_token', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('solution_uploads', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('solution_uploads', 'lease_expires_at')
+    op.drop_column('solution_uploads', 'lease_token')
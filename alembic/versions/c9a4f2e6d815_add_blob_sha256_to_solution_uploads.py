@@ -0,0 +1,30 @@
+"""add blob_sha256 to solution_uploads
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблицу solution_uploads создает create_all при старте приложения - сразу с этой колонкой
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('solution_uploads'):
+        return
+    if 'blob_sha256' in {column['name'] for column in inspector.get_columns('solution_uploads')}:
+        return
+    op.add_column('solution_uploads', sa.Column('blob_sha256', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('solution_uploads', 'blob_sha256')
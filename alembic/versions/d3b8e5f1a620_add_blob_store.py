@@ -0,0 +1,78 @@
+"""add content-addressed blob store for files
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблицу blobs создает и create_all при старте приложения - создаем, только если ее еще нет
+    if not sa.inspect(op.get_bind()).has_table('blobs'):
+        op.create_table(
+            'blobs',
+            sa.Column('sha256', sa.String(64), primary_key=True),
+            sa.Column('size', sa.BigInteger(), nullable=False),
+            sa.Column('mime_type', sa.String(100), nullable=False),
+            sa.Column('storage_path', sa.String(512), nullable=False),
+            sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True)),
+            sa.Column('last_used_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index(
+            'ix_blobs_unreferenced', 'blobs', ['last_used_at'],
+            postgresql_where=sa.text('ref_count = 0')
+        )
+
+    op.add_column('files', sa.Column('sha256', sa.String(64), sa.ForeignKey('blobs.sha256'), nullable=True))
+    op.add_column('files', sa.Column('size', sa.BigInteger(), nullable=True))
+    op.add_column('files', sa.Column('mime_type', sa.String(100), nullable=True))
+    op.create_index('ix_files_sha256', 'files', ['sha256'])
+
+    # Счетчик ссылок на блоб ведет бд, в том числе при каскадном удалении файлов
+    op.execute("""
+        CREATE OR REPLACE FUNCTION files_blob_ref_count() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                IF OLD.sha256 IS NOT NULL THEN
+                    UPDATE blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.sha256;
+                END IF;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                IF NEW.sha256 IS NOT NULL THEN
+                    UPDATE blobs SET ref_count = ref_count + 1, last_used_at = now() WHERE sha256 = NEW.sha256;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    # CREATE OR REPLACE TRIGGER есть только с Postgres 14
+    op.execute("DROP TRIGGER IF EXISTS files_blob_ref_count ON files")
+    op.execute("""
+        CREATE TRIGGER files_blob_ref_count
+        AFTER INSERT OR DELETE OR UPDATE OF sha256 ON files
+        FOR EACH ROW EXECUTE FUNCTION files_blob_ref_count()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS files_blob_ref_count ON files")
+    op.execute("DROP FUNCTION IF EXISTS files_blob_ref_count()")
+    op.drop_index('ix_files_sha256', table_name='files')
+    op.drop_column('files', 'mime_type')
+    op.drop_column('files', 'size')
+    op.drop_column('files', 'sha256')
+    op.drop_table('blobs')
@@ -0,0 +1,40 @@
+"""unique (team_id, judge_id) in team_evaluations
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Оставляем только последнюю оценку каждого члена жюри для каждой команды
+    op.execute("""
+        DELETE FROM team_evaluations AS t
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY team_id, judge_id
+                       ORDER BY created_at DESC NULLS LAST, updated_at DESC NULLS LAST, id DESC
+                   ) AS rn
+            FROM team_evaluations
+        ) AS d
+        WHERE t.id = d.id AND d.rn > 1
+    """)
+    op.create_unique_constraint(
+        'uq_team_evaluations_team_judge',
+        'team_evaluations',
+        ['team_id', 'judge_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_team_evaluations_team_judge', 'team_evaluations', type_='unique')
@@ -0,0 +1,27 @@
+"""add keyset pagination indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_full_name_id', 'users', ['full_name', 'id'])
+    op.create_index('ix_users_registered_at_id', 'users', ['registered_at', 'id'])
+    op.create_index('ix_teams_team_name_id', 'teams', ['team_name', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_teams_team_name_id', table_name='teams')
+    op.drop_index('ix_users_registered_at_id', table_name='users')
+    op.drop_index('ix_users_full_name_id', table_name='users')
@@ -3,13 +3,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.utils import password_hasher
 from src.db import engine
 from src.init_db import init_models
 from src.routers import auth_router, teams_router, users_router, files_router, stages_router
-from src.routers import auth_router, teams_router, users_router, files_router, evaluations_router
-from src.utils.background_tasks import scheduler
+from src.routers import auth_router, teams_router, users_router, files_router, evaluations_router, campaigns_router
+from src.utils.db_events import db_event_listener
+from src.utils.blob_store import schedule_blob_gc
+from src.utils.email_outbox import email_outbox_worker
 from src.utils.enum_utils import initialize_enum_data
+from src.utils.leaderboard import rebuild_leaderboard
+from src.utils.resumable_upload import schedule_solution_upload_cleanup
 from src.utils.router_states import initialize_router_states
+from src.utils.scheduler_leader import scheduler_leader
+from src.utils.stage_scheduler import replan_stage_transitions
+from src.utils.team_utils import rebuild_team_statuses
+from src.utils.upload_writer import upload_writer
 
 app = FastAPI(
     title="Хакатон API",
@@ -36,6 +45,7 @@ app.include_router(users_router)
 app.include_router(files_router)
 app.include_router(stages_router)
 app.include_router(evaluations_router)
+app.include_router(campaigns_router)
 
 @app.on_event("startup")
 async def startup_event():
@@ -44,7 +54,23 @@ async def startup_event():
     async with AsyncSession(engine) as session:
         await initialize_enum_data(session)
         await initialize_router_states(session)
-    scheduler.start()
+        await rebuild_team_statuses(session)
+        await rebuild_leaderboard(session)
+    scheduler_leader.start(on_elected=replan_stage_transitions)
+    await schedule_solution_upload_cleanup()
+    await schedule_blob_gc()
+    email_outbox_worker.start()
+    db_event_listener.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Выполняется при остановке приложения"""
+    await scheduler_leader.stop()
+    await db_event_listener.stop()
+    await email_outbox_worker.stop()
+    password_hasher.shutdown()
+    upload_writer.shutdown()
 
 def custom_openapi():
     if app.openapi_schema:
@@ -0,0 +1,64 @@
+"""
+Время расчета нормализованного рейтинга (compute_normalized_ranking) на синтетических оценках:
+каждую команду оценивает --judges-per-team случайных судей, у каждого судьи свой сдвиг строгости.
+
+Запуск из корня репозитория (нужен .env, как для приложения):
+    python -m scripts.bench_evaluation_stats --teams 100 300 500 --iterations 2000 5000
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк нормализованного рейтинга")
+    parser.add_argument("--teams", type=int, nargs="+", default=[100, 300, 500], help="Количество команд")
+    parser.add_argument("--judges", type=int, default=30, help="Количество судей")
+    parser.add_argument("--judges-per-team", type=int, default=5, help="Судей на команду")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[2000, 5000], help="Итераций бутстрепа")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов на каждый вариант")
+    return parser.parse_args()
+
+
+def make_scores(teams: int, judges: int, judges_per_team: int, criteria: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    quality = rng.uniform(2, 9, size=(teams, criteria))
+    severity = rng.normal(0, 1.5, size=judges)
+
+    scores = np.full((judges, teams, criteria), np.nan)
+    for team in range(teams):
+        for judge in rng.choice(judges, size=judges_per_team, replace=False):
+            marks = quality[team] + severity[judge] + rng.normal(0, 0.7, size=criteria)
+            scores[judge, team] = np.clip(np.round(marks), 0, 10)
+    return scores
+
+
+def main() -> None:
+    args = parse_args()
+
+    from src.settings import settings
+    from src.utils.evaluation_stats import compute_normalized_ranking
+
+    weights = np.asarray(settings.evaluation_criterion_weights, dtype=float)
+    print(f"Судей {args.judges}, судей на команду {args.judges_per_team}, критериев {len(weights)}")
+
+    for teams in args.teams:
+        scores = make_scores(teams, args.judges, args.judges_per_team, len(weights))
+        team_ids = [uuid.uuid4() for _ in range(teams)]
+        for iterations in args.iterations:
+            durations = []
+            for _ in range(args.repeat):
+                started_at = time.perf_counter()
+                compute_normalized_ranking(team_ids, scores, weights, iterations, settings.ranking_confidence_level)
+                durations.append(time.perf_counter() - started_at)
+            print(
+                f"команд {teams}, итераций {iterations}: "
+                f"медиана {statistics.median(durations) * 1000:.1f} мс, min {min(durations) * 1000:.1f} мс"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Время ответа со списком пользователей: стандартный путь FastAPI
+(повторная валидация response_model + jsonable_encoder + json.dumps) против FastJSONResponse.
+
+Запуск из корня репозитория (нужен .env, как для приложения):
+    python -m scripts.bench_json_responses --rows 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации больших списков")
+    parser.add_argument("--rows", type=int, default=1000, help="Пользователей в ответе")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов на каждый вариант")
+    return parser.parse_args()
+
+
+def make_users(count: int) -> list:
+    """Пользователи в том виде, в котором их загружает user_load_options(UserView.FULL)"""
+    from src.models import User, Role, UserStatusType, ParticipantInfo
+    from src.models.user import User2Roles, UserStatusHistory
+
+    pending = UserStatusType(id=uuid.uuid4(), name="pending", description="Ожидает подтверждения")
+    approved = UserStatusType(id=uuid.uuid4(), name="approved", description="Подтвержден")
+    participant = Role(id=uuid.uuid4(), name="participant", description="Участник")
+    registered_at = datetime(2026, 9, 1, 12, 0)
+
+    users = []
+    for index in range(count):
+        user_id = uuid.uuid4()
+        user = User(
+            id=user_id,
+            email=f"user{index}@example.com",
+            full_name=f"Участник Номер {index}",
+            registered_at=registered_at + timedelta(minutes=index),
+            current_status=approved
+        )
+        user.participant_info = ParticipantInfo(
+            id=uuid.uuid4(), user_id=user_id, number=f"+7900{index:07d}", vuz="МГУ",
+            vuz_direction="Прикладная математика", code_speciality="01.03.02", course="3"
+        )
+        user.user2roles = [User2Roles(id=uuid.uuid4(), user_id=user_id, role=participant)]
+        user.status_history = [
+            UserStatusHistory(id=uuid.uuid4(), status=approved, comment="Подтвержден",
+                              created_at=registered_at + timedelta(days=1)),
+            UserStatusHistory(id=uuid.uuid4(), status=pending, comment="Начальный статус при регистрации",
+                              created_at=registered_at),
+        ]
+        users.append(user)
+    return users
+
+
+async def run(rows: int, repeat: int) -> None:
+    import httpx
+    from fastapi import FastAPI
+
+    from src.schemas.user import PaginatedUserResponse, UserView
+    from src.utils.responses import FastJSONResponse
+    from src.utils.user_views import serialize_users
+
+    users = make_users(rows)
+    app = FastAPI()
+
+    @app.get("/users/default", response_model=PaginatedUserResponse)
+    async def users_default(view: UserView = UserView.FULL):
+        return {"users": serialize_users(users, view), "total": rows, "next_cursor": None}
+
+    @app.get("/users/fast", response_model=PaginatedUserResponse)
+    async def users_fast(view: UserView = UserView.FULL):
+        return FastJSONResponse({"users": serialize_users(users, view), "total": rows, "next_cursor": None})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for view in UserView:
+            bodies, timings = {}, {}
+            for mode in ("default", "fast"):
+                durations = []
+                for _ in range(repeat):
+                    started_at = time.perf_counter()
+                    response = await client.get(f"/users/{mode}", params={"view": view.value})
+                    durations.append(time.perf_counter() - started_at)
+                    response.raise_for_status()
+                bodies[mode] = response.content
+                timings[mode] = statistics.median(durations)
+
+            # Оба пути должны отдавать одинаковые данные
+            assert json.loads(bodies["default"]) == json.loads(bodies["fast"])
+            print(
+                f"view={view.value}, {rows} строк, {len(bodies['fast']) / 1024:.0f} КБ: "
+                f"стандартный {timings['default'] * 1000:.1f} мс, "
+                f"FastJSONResponse {timings['fast'] * 1000:.1f} мс, "
+                f"ускорение x{timings['default'] / timings['fast']:.1f}"
+            )
+
+
+def main() -> None:
+    args = parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
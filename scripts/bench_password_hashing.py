@@ -0,0 +1,80 @@
+"""
+Задержка /ping во время волны одновременных входов:
+bcrypt прямо в обработчике (как было раньше) против пула password_hasher.
+
+Запуск из корня репозитория (нужен .env, как для приложения):
+    python -m scripts.bench_password_hashing --logins 100
+"""
+import argparse
+import asyncio
+import os
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк хэширования паролей")
+    parser.add_argument("--logins", type=int, default=100, help="Одновременных входов")
+    parser.add_argument("--rounds", type=int, help="Стоимость bcrypt (по умолчанию PASSWORD_HASH_ROUNDS)")
+    parser.add_argument("--workers", type=int, help="Потоков пула (по умолчанию PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--max-pending", type=int, help="Лимит очереди (по умолчанию PASSWORD_HASH_MAX_PENDING)")
+    return parser.parse_args()
+
+
+async def run(logins: int) -> None:
+    from fastapi import HTTPException
+
+    from scripts.benchmark import format_latency, measure_under_load, ping_app
+    from src.auth.utils import password_hasher, pwd_context, verify_password
+    from src.settings import settings
+
+    password = "benchmark-password"
+    hashed_password = pwd_context.hash(password)
+
+    app = ping_app()
+
+    @app.post("/login/inline")
+    async def login_inline():
+        return {"ok": verify_password(password, hashed_password)}
+
+    @app.post("/login/executor")
+    async def login_executor():
+        try:
+            verified, _ = await password_hasher.verify_and_update(password, hashed_password)
+        except HTTPException as e:
+            return {"ok": False, "status": e.status_code}
+        return {"ok": verified}
+
+    print(
+        f"bcrypt rounds {settings.password_hash_rounds}, потоков {settings.password_hash_workers}, "
+        f"лимит очереди {settings.password_hash_max_pending}, входов {logins}"
+    )
+
+    for mode in ("inline", "executor"):
+        results = []
+
+        async def burst(client):
+            responses = await asyncio.gather(*(client.post(f"/login/{mode}") for _ in range(logins)))
+            results.extend(response.json() for response in responses)
+
+        elapsed, latencies = await measure_under_load(app, burst)
+        rejected = sum(1 for result in results if result.get("status") == 503)
+        print(f"[{mode}] входы заняли {elapsed:.2f} с, успешно {logins - rejected}, отклонено 503: {rejected}")
+        print("  " + format_latency("/ping", latencies))
+
+    password_hasher.shutdown()
+
+
+def main() -> None:
+    args = parse_args()
+    # Настройки читаются при импорте src, поэтому переопределяем их до импорта
+    for name, value in (
+            ("PASSWORD_HASH_ROUNDS", args.rounds),
+            ("PASSWORD_HASH_WORKERS", args.workers),
+            ("PASSWORD_HASH_MAX_PENDING", args.max_pending),
+    ):
+        if value is not None:
+            os.environ[name] = str(value)
+    asyncio.run(run(args.logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Пропускная способность /evaluations/public-results после публикации результатов (отдача замороженного снимка).
+Запросы передаются приложению напрямую по ASGI, без HTTP сервера, сети и HTTP клиента:
+результат - потолок одного воркера по самому приложению.
+Сквозной замер делается внешним генератором нагрузки (wrk, hey) по запущенному приложению.
+
+Запуск из корня репозитория (нужен .env, как для приложения):
+    python -m scripts.bench_public_results --teams 300 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк отдачи снимка публичных результатов")
+    parser.add_argument("--teams", type=int, default=300, help="Команд в результатах")
+    parser.add_argument("--requests", type=int, default=5000, help="Запросов на каждый вариант")
+    parser.add_argument("--concurrency", type=int, default=50, help="Одновременных запросов")
+    return parser.parse_args()
+
+
+async def call(app, headers: dict) -> int:
+    """Один GET /evaluations/public-results через ASGI интерфейс приложения"""
+    path = "/evaluations/public-results"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    status_code = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run(teams: int, total: int, concurrency: int, directory: Path) -> None:
+    from app import app
+    from src.db import get_session
+    from src.models.enums import StageType
+    from src.utils.results_snapshot import _write_snapshot, results_snapshot_store
+    from src.utils.router_states import CurrentStage, stage_router_state
+
+    body = json.dumps([
+        {
+            "team_id": str(uuid.uuid4()),
+            "team_name": f"Команда {index}",
+            "team_motto": "Девиз команды",
+            "average_score": 50 - index / teams,
+            "evaluations_count": 5,
+            "total_score": 250 - 5 * index / teams
+        }
+        for index in range(teams)
+    ], ensure_ascii=False).encode("utf-8")
+    version = _write_snapshot(directory, body)
+
+    results_snapshot_store.directory = directory
+    results_snapshot_store.invalidate()
+    stage_router_state.cache_enabled = True
+    stage_router_state.current_stage = CurrentStage(
+        id=uuid.uuid4(), name="Публикация результатов", type=StageType.RESULTS_PUBLICATION.value, order=7
+    )
+    stage_router_state._cache_loaded = True
+
+    async def override_session():
+        # Снимок и текущий этап берутся из памяти - сессия не используется
+        yield None
+
+    app.dependency_overrides[get_session] = override_session
+    print(f"Снимок {version}: {teams} команд, {len(body) / 1024:.0f} КБ JSON")
+
+    variants = (
+        ("br", {"Accept-Encoding": "br"}),
+        ("gzip", {"Accept-Encoding": "gzip"}),
+        ("identity", {"Accept-Encoding": "identity"}),
+        ("304", {"If-None-Match": f'"{version}"'}),
+    )
+    for title, headers in variants:
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                assert await call(app, headers) in (200, 304)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+        print(f"[{title}] {total} запросов за {elapsed:.2f} с: {total / elapsed:.0f} req/s")
+
+    app.dependency_overrides.clear()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(args.teams, args.requests, args.concurrency, Path(directory)))
+
+
+if __name__ == "__main__":
+    main()
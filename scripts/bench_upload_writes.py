@@ -0,0 +1,89 @@
+"""
+Задержка /ping во время одновременных загрузок файлов:
+запись на диск прямо в event loop (как save_file до UploadWriter) против upload_writer.
+
+Запуск из корня репозитория (нужен .env, как для приложения):
+    python -m scripts.bench_upload_writes --uploads 8 --size-mb 64
+Файлы пишутся во временный каталог внутри --dir (по умолчанию UPLOAD_STAGING_DIR),
+чтобы замер шел на том же диске, что и настоящие загрузки.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+
+class MemoryUpload:
+    """Загружаемый файл из памяти с интерфейсом чтения UploadFile"""
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size < 0 else self._position + size
+        chunk = self._data[self._position:end]
+        self._position += len(chunk)
+        return bytes(chunk)
+
+
+async def save_inline(upload_file: MemoryUpload, directory: str) -> None:
+    """Прежняя запись из save_file: блоки по 64 КБ синхронно в event loop, между ними sleep(0)"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, prefix="upload_", dir=directory)
+    while chunk := await upload_file.read(64 * 1024):
+        temp_file.write(chunk)
+        await asyncio.sleep(0)
+    temp_file.close()
+    shutil.move(temp_file.name, temp_file.name + ".done")
+
+
+async def save_with_writer(upload_file: MemoryUpload, directory: str) -> None:
+    from src.utils.upload_writer import upload_writer
+
+    stream = await upload_writer.receive(upload_file, directory)
+    os.replace(stream.temp_path, stream.temp_path + ".done")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк записи загружаемых файлов")
+    parser.add_argument("--uploads", type=int, default=8, help="Одновременных загрузок")
+    parser.add_argument("--size-mb", type=int, default=64, help="Размер каждого файла в МБ")
+    parser.add_argument("--dir", help="Каталог для временных файлов (по умолчанию UPLOAD_STAGING_DIR)")
+    return parser.parse_args()
+
+
+async def run(uploads: int, size_mb: int, base_dir: str) -> None:
+    from scripts.benchmark import format_latency, measure_under_load, ping_app
+    from src.utils.upload_writer import upload_writer
+
+    payload = os.urandom(size_mb * 1024 * 1024)
+    total_mb = uploads * size_mb
+    app = ping_app()
+    print(
+        f"Загрузок {uploads} по {size_mb} МБ, буфер {upload_writer.buffer_size // 1024} КБ, "
+        f"потоков записи {upload_writer.max_workers}, каталог {base_dir}"
+    )
+
+    os.makedirs(base_dir, exist_ok=True)
+    for title, save in (("inline", save_inline), ("upload_writer", save_with_writer)):
+        with tempfile.TemporaryDirectory(dir=base_dir) as directory:
+            async def workload(client):
+                await asyncio.gather(*(save(MemoryUpload(payload), directory) for _ in range(uploads)))
+
+            elapsed, latencies = await measure_under_load(app, workload)
+            print(f"[{title}] записано {total_mb} МБ за {elapsed:.2f} с ({total_mb / elapsed:.0f} МБ/с)")
+            print("  " + format_latency("/ping", latencies))
+
+    upload_writer.shutdown()
+
+
+def main() -> None:
+    args = parse_args()
+    from src.settings import settings
+
+    asyncio.run(run(args.uploads, args.size_mb, args.dir or settings.upload_staging_dir))
+
+
+if __name__ == "__main__":
+    main()
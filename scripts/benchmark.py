@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Sequence, Tuple
+
+import httpx
+from fastapi import FastAPI
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_latency(title: str, latencies: Sequence[float]) -> str:
+    return (
+        f"{title}: запросов {len(latencies)}, "
+        f"p50 {percentile(latencies, 50) * 1000:.1f} мс, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f} мс, "
+        f"max {max(latencies, default=0) * 1000:.1f} мс"
+    )
+
+
+def ping_app() -> FastAPI:
+    """Приложение с легким эндпоинтом /ping - его задержка показывает, насколько занят event loop"""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> List[float]:
+    """
+    Отправляет /ping по расписанию раз в interval секунд.
+    Задержка считается от планового времени запроса: если event loop был занят,
+    пропущенные запросы отправляются после освобождения и учитывают время ожидания.
+    """
+    latencies = []
+    requests = []
+
+    async def ping(scheduled_at: float) -> None:
+        response = await client.get("/ping")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - scheduled_at)
+
+    next_at = time.perf_counter()
+    while True:
+        while next_at <= time.perf_counter():
+            requests.append(asyncio.create_task(ping(next_at)))
+            next_at += interval
+        if stop.is_set():
+            break
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    await asyncio.gather(*requests)
+    return latencies
+
+
+async def measure_under_load(
+        app: FastAPI,
+        workload: Callable[[httpx.AsyncClient], Awaitable[None]],
+        interval: float = 0.01
+) -> Tuple[float, List[float]]:
+    """
+    Выполняет workload и параллельно опрашивает /ping того же приложения в том же event loop.
+
+    Returns:
+        tuple: (время выполнения workload в секундах, задержки /ping в секундах)
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop, interval))
+        started_at = time.perf_counter()
+        try:
+            await workload(client)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            stop.set()
+        return elapsed, await probe
@@ -1,14 +1,20 @@
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, and_
 
+from src.auth.principal import AuthPrincipal
 from src.db import get_session
-from src.models import User
+from src.models import User, TeamMember
+from src.models.user import User2Roles
 from src.settings import settings
+from src.utils.router_states import team_router_state
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="auth/login",
@@ -17,16 +23,135 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
+class PrincipalCache:
+    """In-process кэш проверенных токенов с коротким TTL"""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[float, AuthPrincipal]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, token: str) -> Optional[AuthPrincipal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(token, None)
+            return None
+        return principal
+
+    def set(self, token: str, principal: AuthPrincipal) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if len(self._entries) >= self.max_size:
+            self._entries = {
+                key: entry for key, entry in self._entries.items()
+                if entry[0] >= now
+            }
+            while len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[token] = (now + self.ttl_seconds, principal)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if entry[1].id != user_id
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    max_size=settings.auth_cache_max_size
+)
+
+
+def _accepted_memberships_join():
+    return and_(
+        TeamMember.user_id == User.id,
+        TeamMember.status_id == team_router_state.accepted_status_id
+    )
+
+
+def _memberships(rows) -> Dict[UUID, UUID]:
+    return {row.team_id: row.team_role_id for row in rows if row.team_id is not None}
+
+
+async def _load_token_state(session: AsyncSession, user_id: UUID) -> Optional[Tuple[int, Dict[UUID, UUID]]]:
+    """
+    token_version пользователя и его принятые членства в командах одним запросом.
+    Членства сохраняются в запросе и переиспользуются AuthContext без повторного обращения к бд.
+    """
+    result = await session.execute(
+        select(User.token_version, TeamMember.team_id, TeamMember.role_id.label("team_role_id"))
+        .select_from(User)
+        .outerjoin(TeamMember, _accepted_memberships_join())
+        .where(User.id == user_id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    return rows[0].token_version, _memberships(rows)
+
+
+async def _load_legacy_principal(
+        session: AsyncSession,
+        email: str
+) -> Optional[Tuple[AuthPrincipal, Dict[UUID, UUID]]]:
+    """Токены старого формата содержат только email - восстанавливаем principal и членства из бд одним запросом"""
+    result = await session.execute(
+        select(
+            User.id,
+            User.email,
+            User.current_status_id,
+            User.token_version,
+            User2Roles.role_id,
+            TeamMember.team_id,
+            TeamMember.role_id.label("team_role_id")
+        )
+        .select_from(User)
+        .outerjoin(User2Roles, User2Roles.user_id == User.id)
+        .outerjoin(TeamMember, _accepted_memberships_join())
+        .where(User.email == email)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    user = rows[0]
+    principal = AuthPrincipal(
+        id=user.id,
+        email=user.email,
+        role_ids={row.role_id for row in rows if row.role_id is not None},
+        current_status_id=user.current_status_id,
+        token_version=user.token_version
+    )
+    return principal, _memberships(rows)
+
+
 async def get_current_user(
+        request: Request,
         token: str = Depends(oauth2_scheme),
         session: AsyncSession = Depends(get_session)
-) -> User:
+) -> AuthPrincipal:
+    """
+    Проверка токена. Без кэша выполняется один запрос (token_version вместе с членствами в командах),
+    загруженные членства сохраняются в request.state.auth_memberships для AuthContext.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt.decode(
             token,
@@ -39,16 +164,59 @@ async def get_current_user(
     except JWTError as e:
         raise credentials_exception
 
-    query = select(User).where(User.email == email)
-    result = await session.execute(query)
-    user = result.scalar_one_or_none()
+    if "uid" not in payload:
+        loaded = await _load_legacy_principal(session, email)
+        if loaded is None or loaded[0].token_version != 0:
+            raise credentials_exception
+        principal, request.state.auth_memberships = loaded
+        principal_cache.set(token, principal)
+        return principal
 
-    if user is None:
+    try:
+        principal = AuthPrincipal.from_claims(payload)
+    except (KeyError, ValueError, TypeError):
         raise credentials_exception
 
+    token_state = await _load_token_state(session, principal.id)
+    if token_state is None or token_state[0] != principal.token_version:
+        raise credentials_exception
+
+    request.state.auth_memberships = token_state[1]
+    principal_cache.set(token, principal)
+    return principal
+
+
+async def get_current_user_model(
+        current_user: AuthPrincipal = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session)
+) -> User:
+    """Полная модель пользователя из бд - только для эндпоинтов, которым нужны поля помимо claims"""
+    result = await session.execute(
+        select(User).where(User.id == current_user.id)
+    )
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
+async def revoke_user_tokens(session: AsyncSession, user_id: UUID) -> None:
+    """
+    Отзывает все выданные пользователю токены, увеличивая token_version.
+    Другие воркеры перестанут принимать токены после истечения TTL кэша.
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+    )
+    principal_cache.invalidate_user(user_id)
+
+
 def create_access_token(
         data: dict,
         expires_delta: Optional[timedelta] = None
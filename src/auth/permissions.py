@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.jwt import get_current_user
+from src.auth.principal import AuthPrincipal
+from src.db import get_session
+from src.models import TeamMember
+from src.models.enums import UserRole
+from src.utils.router_states import user_router_state, team_router_state
+
+
+def get_user_role_id(role: UserRole) -> UUID:
+    return getattr(user_router_state, f"{role.value}_role_id")
+
+
+class AuthContext:
+    """
+    Контекст авторизации на время одного запроса.
+    Роли берутся из токена, принятые членства в командах приходят из проверки токена
+    (если она обращалась к бд) или загружаются одним запросом при первом обращении
+    и переиспользуются до конца запроса. Итого не больше одного запроса авторизации на запрос.
+    """
+
+    def __init__(
+            self,
+            principal: AuthPrincipal,
+            session: AsyncSession,
+            memberships: Optional[Dict[UUID, UUID]] = None
+    ):
+        self.principal = principal
+        self.session = session
+        self._memberships = memberships
+
+    @property
+    def user_id(self) -> UUID:
+        return self.principal.id
+
+    def has_role(self, role: UserRole) -> bool:
+        return self.principal.has_role(get_user_role_id(role))
+
+    def has_any_role(self, roles: Iterable[UserRole]) -> bool:
+        return any(self.has_role(role) for role in roles)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.has_role(UserRole.ADMIN)
+
+    @property
+    def is_organizer(self) -> bool:
+        return self.has_role(UserRole.ORGANIZER)
+
+    @property
+    def is_judge(self) -> bool:
+        return self.has_role(UserRole.JUDGE)
+
+    @property
+    def is_mentor(self) -> bool:
+        return self.has_role(UserRole.MENTOR)
+
+    @property
+    def is_participant(self) -> bool:
+        return self.has_role(UserRole.PARTICIPANT)
+
+    async def memberships(self) -> Dict[UUID, UUID]:
+        """Принятые членства пользователя: team_id -> role_id в команде"""
+        if self._memberships is None:
+            result = await self.session.execute(
+                select(TeamMember.team_id, TeamMember.role_id).where(
+                    TeamMember.user_id == self.principal.id,
+                    TeamMember.status_id == team_router_state.accepted_status_id
+                )
+            )
+            self._memberships = dict(result.all())
+        return self._memberships
+
+    async def is_team_member(self, team_id: UUID) -> bool:
+        return team_id in await self.memberships()
+
+    async def is_team_mentor(self, team_id: UUID) -> bool:
+        memberships = await self.memberships()
+        return memberships.get(team_id) == team_router_state.mentor_role_id
+
+    async def require(
+            self,
+            any_of: Iterable[UserRole] = (),
+            team_member: Optional[UUID] = None,
+            team_mentor: Optional[UUID] = None,
+            detail: str = "Недостаточно прав"
+    ) -> None:
+        """
+        Проверка доступа: есть одна из ролей any_of,
+        либо пользователь состоит в команде team_member,
+        либо является ментором команды team_mentor.
+        Членства запрашиваются только если проверки ролей недостаточно.
+
+        :raises: HTTPException 403 если ни одно из условий не выполнено
+        """
+        if self.has_any_role(any_of):
+            return
+        if team_member is not None and await self.is_team_member(team_member):
+            return
+        if team_mentor is not None and await self.is_team_mentor(team_mentor):
+            return
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+
+async def get_auth_context(
+        request: Request,
+        current_user: AuthPrincipal = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session)
+) -> AuthContext:
+    return AuthContext(current_user, session, getattr(request.state, "auth_memberships", None))
+
+
+def require_roles(*roles: UserRole, detail: str = "Недостаточно прав"):
+    """Зависимость FastAPI: пропускает только пользователей с одной из ролей"""
+
+    async def dependency(auth: AuthContext = Depends(get_auth_context)) -> AuthContext:
+        await auth.require(any_of=roles, detail=detail)
+        return auth
+
+    return dependency
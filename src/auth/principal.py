@@ -0,0 +1,48 @@
+from typing import FrozenSet, Iterable, Optional
+from uuid import UUID
+
+
+class AuthPrincipal:
+    """Аутентифицированный пользователь, восстановленный из подписанных claims JWT"""
+
+    __slots__ = ("id", "email", "role_ids", "current_status_id", "token_version")
+
+    def __init__(
+            self,
+            id: UUID,
+            email: str,
+            role_ids: Iterable[UUID],
+            current_status_id: Optional[UUID],
+            token_version: int
+    ):
+        self.id = id
+        self.email = email
+        self.role_ids: FrozenSet[UUID] = frozenset(role_ids)
+        self.current_status_id = current_status_id
+        self.token_version = token_version
+
+    def has_role(self, role_id: UUID) -> bool:
+        return role_id in self.role_ids
+
+    def has_any_role(self, *role_ids: UUID) -> bool:
+        return any(role_id in self.role_ids for role_id in role_ids)
+
+    def to_claims(self) -> dict:
+        return {
+            "sub": self.email,
+            "uid": str(self.id),
+            "roles": [str(role_id) for role_id in self.role_ids],
+            "status": str(self.current_status_id) if self.current_status_id else None,
+            "ver": self.token_version
+        }
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "AuthPrincipal":
+        status_id = payload.get("status")
+        return cls(
+            id=UUID(payload["uid"]),
+            email=payload["sub"],
+            role_ids=[UUID(role_id) for role_id in payload.get("roles", [])],
+            current_status_id=UUID(status_id) if status_id else None,
+            token_version=int(payload.get("ver", 0))
+        )
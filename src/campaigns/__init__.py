@@ -0,0 +1,24 @@
+from .audiences import Audience, Recipient, resolve_audience
+from .templates import CampaignTemplate
+from .registry import Campaign, CampaignName, CAMPAIGNS, get_campaign
+from .dispatcher import dispatch, start_campaign, fill_campaign, launch_campaign, run_campaign, \
+    reset_failed_deliveries, get_campaign_progress, send_campaign_to_user
+
+__all__ = [
+    'Audience',
+    'Recipient',
+    'resolve_audience',
+    'CampaignTemplate',
+    'Campaign',
+    'CampaignName',
+    'CAMPAIGNS',
+    'get_campaign',
+    'dispatch',
+    'start_campaign',
+    'fill_campaign',
+    'launch_campaign',
+    'run_campaign',
+    'reset_failed_deliveries',
+    'get_campaign_progress',
+    'send_campaign_to_user'
+]
@@ -0,0 +1,106 @@
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select, exists, func, literal, String
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+from src.models import User, Team, TeamMember, TeamRoleTable
+from src.models.enums import UserRole
+from src.models.user import User2Roles
+from src.utils.router_states import team_router_state, user_router_state
+from src.utils.team_utils import active_team_ids_query
+
+
+class Recipient(NamedTuple):
+    email: str
+    name: str
+    team_name: Optional[str]
+    team_members: Optional[List[str]] = None
+
+
+class Audience:
+    """
+    Декларативное описание получателей рассылки.
+
+    active_team_members - принятые участники (включая менторов) активных команд,
+    roles - пользователи хотя бы с одной из ролей,
+    team_roster - вместе с получателем выбрать состав его команды ("ФИО (роль)").
+    При указании обоих условий берутся участники активных команд с нужной ролью.
+    """
+
+    def __init__(self, roles: Iterable[UserRole] = (), active_team_members: bool = False, team_roster: bool = False):
+        self.roles = tuple(roles)
+        self.active_team_members = active_team_members
+        self.team_roster = team_roster
+
+    def _roles_filter(self):
+        role_ids = [getattr(user_router_state, f"{role.value}_role_id") for role in self.roles]
+        return exists().where(
+            User2Roles.user_id == User.id,
+            User2Roles.role_id.in_(role_ids)
+        )
+
+    @staticmethod
+    def _team_roster():
+        """Коррелированный подзапрос: принятые участники команды в порядке вступления"""
+        member, user = aliased(TeamMember), aliased(User)
+        return (
+            select(func.array_agg(aggregate_order_by(
+                user.full_name + " (" + TeamRoleTable.name + ")",
+                member.created_at
+            )))
+            .select_from(member)
+            .join(user, user.id == member.user_id)
+            .join(TeamRoleTable, TeamRoleTable.id == member.role_id)
+            .where(
+                member.team_id == Team.id,
+                member.status_id == team_router_state.accepted_status_id
+            )
+            .scalar_subquery()
+            .label("team_members")
+        )
+
+    def query(self) -> Select:
+        """Один SQL запрос, возвращающий (email, name, team_name) и при team_roster - team_members"""
+        if self.active_team_members:
+            query = (
+                select(User.email, User.full_name, Team.team_name)
+                .join(TeamMember, TeamMember.user_id == User.id)
+                .join(Team, Team.id == TeamMember.team_id)
+                .where(
+                    TeamMember.status_id == team_router_state.accepted_status_id,
+                    TeamMember.team_id.in_(active_team_ids_query())
+                )
+                .order_by(Team.team_name, User.full_name)
+            )
+            if self.team_roster:
+                query = query.add_columns(self._team_roster())
+        else:
+            query = (
+                select(User.email, User.full_name, literal(None, type_=String).label("team_name"))
+                .order_by(User.full_name)
+            )
+
+        if self.roles:
+            query = query.where(self._roles_filter())
+        return query
+
+
+ACTIVE_TEAM_MEMBERS = Audience(active_team_members=True)
+PARTICIPANTS_AND_MENTORS = Audience(roles=[UserRole.PARTICIPANT, UserRole.MENTOR])
+ACTIVE_TEAMS_WITH_ROSTER = Audience(active_team_members=True, team_roster=True)
+JUDGES = Audience(roles=[UserRole.JUDGE])
+
+
+async def resolve_audience(session: AsyncSession, audience: Audience) -> List[Recipient]:
+    """
+    Получатели рассылки. Один адрес - одно письмо:
+    ментор нескольких команд получит письмо с названием первой из них
+    """
+    result = await session.execute(audience.query())
+    recipients = {}
+    for row in result.all():
+        recipients.setdefault(row.email, Recipient(*row))
+    return list(recipients.values())
@@ -0,0 +1,231 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import BackgroundTasks
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.campaigns.audiences import Recipient, resolve_audience
+from src.campaigns.registry import CampaignName, get_campaign
+from src.campaigns.templates import CampaignTemplate
+from src.db import async_session
+from src.models import User, CampaignRun, EmailOutboxMessage
+from src.models.enums import CampaignStatus, EmailStatus
+from src.settings import settings
+from src.utils.email_utils import email_sender
+
+
+async def dispatch(campaign_id: UUID, template: CampaignTemplate, recipients: List[Recipient]) -> int:
+    """
+    Ставит письма в очередь отправки пачками по campaign_batch_size.
+    Каждая пачка записывается в outbox одной транзакцией,
+    уже поставленные получатели рассылки пропускаются.
+
+    Returns:
+        int: Количество поставленных в очередь писем
+    """
+    batch_size = settings.campaign_batch_size
+    queued = 0
+    for start in range(0, len(recipients), batch_size):
+        batch = recipients[start:start + batch_size]
+        queued += await email_sender.send_emails(
+            (
+                (
+                    recipient.email,
+                    template.subject,
+                    template.render(recipient.name, recipient.team_name, recipient.team_members)
+                )
+                for recipient in batch
+            ),
+            is_html=True,
+            campaign_id=campaign_id
+        )
+    return queued
+
+
+async def start_campaign(
+        session: AsyncSession,
+        name: CampaignName,
+        idempotency_key: Optional[str] = None
+) -> Tuple[CampaignRun, bool]:
+    """
+    Создает запуск рассылки. Если запуск с таким idempotency_key уже есть - возвращает его.
+
+    Returns:
+        tuple: (запуск рассылки, True если запуск создан)
+    """
+    if idempotency_key:
+        result = await session.execute(
+            select(CampaignRun).where(CampaignRun.idempotency_key == idempotency_key)
+        )
+        campaign_run = result.scalar_one_or_none()
+        if campaign_run:
+            return campaign_run, False
+
+    campaign_run = CampaignRun(name=CampaignName(name).value, idempotency_key=idempotency_key)
+    session.add(campaign_run)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Параллельный запрос с тем же ключом успел создать запуск
+        await session.rollback()
+        result = await session.execute(
+            select(CampaignRun).where(CampaignRun.idempotency_key == idempotency_key)
+        )
+        return result.scalar_one(), False
+
+    return campaign_run, True
+
+
+async def fill_campaign(campaign_id: UUID) -> int:
+    """
+    Ставит в очередь отправки получателей рассылки, которым письмо еще не ставилось.
+    Безопасно для повторного вызова: используется и при запуске, и при возобновлении.
+    """
+    async with async_session() as session:
+        campaign_run = await session.get(CampaignRun, campaign_id)
+        if campaign_run is None:
+            return 0
+
+        campaign = get_campaign(campaign_run.name)
+        start_time = datetime.now()
+
+        try:
+            recipients = await resolve_audience(session, campaign.audience)
+            campaign_run.total_recipients = len(recipients)
+            await session.commit()
+
+            logging.info(f"Начало рассылки {campaign_run.name} ({campaign_run.id}). Всего получателей: {len(recipients)}")
+            queued = await dispatch(campaign_run.id, campaign.template, recipients)
+
+            campaign_run.status = CampaignStatus.QUEUED.value
+            campaign_run.queued_at = datetime.utcnow()
+            await session.commit()
+        except Exception as e:
+            logging.error(f"Ошибка рассылки {campaign_run.name} ({campaign_run.id}): {str(e)}")
+            return 0
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logging.info(f"""
+Рассылка {campaign.name.value} ({campaign_id}) поставлена в очередь!
+Время выполнения: {duration:.2f} секунд
+Всего получателей: {len(recipients)}
+Поставлено в очередь: {queued}
+    """)
+    return queued
+
+
+async def launch_campaign(
+        session: AsyncSession,
+        background_tasks: BackgroundTasks,
+        name: CampaignName,
+        idempotency_key: Optional[str] = None
+) -> CampaignRun:
+    """Создает запуск рассылки и ставит получателей в очередь в фоне"""
+    campaign_run, created = await start_campaign(session, name, idempotency_key)
+    if created:
+        background_tasks.add_task(fill_campaign, campaign_run.id)
+    return campaign_run
+
+
+async def run_campaign(
+        session: AsyncSession,
+        name: CampaignName,
+        idempotency_key: Optional[str] = None
+) -> UUID:
+    """Создает запуск рассылки и сразу ставит получателей в очередь (для фоновых задач)"""
+    campaign_run, created = await start_campaign(session, name, idempotency_key)
+    if created:
+        await fill_campaign(campaign_run.id)
+    return campaign_run.id
+
+
+async def reset_failed_deliveries(session: AsyncSession, campaign_id: UUID) -> int:
+    """
+    Возвращает в очередь письма рассылки, отправка которых не удалась.
+
+    Returns:
+        int: Количество писем, возвращенных в очередь
+    """
+    result = await session.execute(
+        update(EmailOutboxMessage)
+        .where(
+            EmailOutboxMessage.campaign_id == campaign_id,
+            EmailOutboxMessage.status == EmailStatus.FAILED.value
+        )
+        .values(
+            status=EmailStatus.PENDING.value,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            last_error=None
+        )
+    )
+    return result.rowcount
+
+
+async def get_campaign_progress(session: AsyncSession, campaign_id: UUID) -> Optional[dict]:
+    """Счетчики доставки и скорость отправки рассылки"""
+    campaign_run = await session.get(CampaignRun, campaign_id)
+    if campaign_run is None:
+        return None
+
+    result = await session.execute(
+        select(
+            EmailOutboxMessage.status,
+            func.count(),
+            func.max(EmailOutboxMessage.sent_at)
+        )
+        .where(EmailOutboxMessage.campaign_id == campaign_id)
+        .group_by(EmailOutboxMessage.status)
+    )
+
+    counts = {}
+    last_sent_at = None
+    for status, count, max_sent_at in result:
+        counts[status] = count
+        if status == EmailStatus.SENT.value:
+            last_sent_at = max_sent_at
+
+    sent = counts.get(EmailStatus.SENT.value, 0)
+    failed = counts.get(EmailStatus.FAILED.value, 0)
+    pending = max(campaign_run.total_recipients - sent - failed, 0)
+
+    throughput = None
+    if sent and campaign_run.created_at:
+        finished_at = last_sent_at if pending == 0 else datetime.now(timezone.utc)
+        elapsed = (finished_at - campaign_run.created_at).total_seconds()
+        if elapsed > 0:
+            throughput = round(sent / elapsed * 60, 2)
+
+    return {
+        "id": campaign_run.id,
+        "name": campaign_run.name,
+        "status": campaign_run.status,
+        "idempotency_key": campaign_run.idempotency_key,
+        "total_recipients": campaign_run.total_recipients,
+        "sent": sent,
+        "failed": failed,
+        "pending": pending,
+        "throughput_per_minute": throughput,
+        "created_at": campaign_run.created_at,
+        "queued_at": campaign_run.queued_at
+    }
+
+
+async def send_campaign_to_user(name: CampaignName, user: User) -> bool:
+    """Отправляет письмо рассылки одному пользователю"""
+    campaign = get_campaign(name)
+    success = await email_sender.send_email(
+        to_email=user.email,
+        subject=campaign.template.subject,
+        body=campaign.template.render(user.full_name),
+        is_html=True
+    )
+    if success:
+        logging.info(f"Письмо {campaign.name.value} поставлено в очередь для {user.email}")
+    else:
+        logging.error(f"Ошибка постановки письма {campaign.name.value} в очередь для {user.email}")
+    return success
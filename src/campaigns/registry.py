@@ -0,0 +1,194 @@
+from enum import Enum
+from typing import Dict
+
+from src.campaigns.audiences import (
+    Audience, ACTIVE_TEAM_MEMBERS, ACTIVE_TEAMS_WITH_ROSTER, PARTICIPANTS_AND_MENTORS, JUDGES
+)
+from src.campaigns.templates import CampaignTemplate, paragraph, button, link, TEAM_NAME, TEAM_MEMBERS
+from src.settings import settings
+
+CONFERENCE_URL = "https://bigbb2.tyuiu.ru/b/hyc-sjb-5lk-prq"
+TEAM_PROFILE_URL = f"{settings.base_url}/profile/team"
+
+
+class CampaignName(str, Enum):
+    HACKATHON_CONSULTATION = "hackathon_consultation"
+    JUDGE_BRIEFING = "judge_briefing"
+    REGISTRATION_CLOSED = "registration_closed"
+    TEAM_CONFIRMATION = "team_confirmation"
+    TASK_UPDATE = "task_update"
+    HACKATHON_OPENING = "hackathon_opening"
+    HACKATHON_STARTED = "hackathon_started"
+    SOLUTION_SUBMISSION = "solution_submission"
+    HACKATHON_ENDED = "hackathon_ended"
+    JUDGE_OPENING = "judge_opening"
+    DEFENSE_SCHEDULE = "defense_schedule"
+    CLOSING_CEREMONY = "closing_ceremony"
+
+
+class Campaign:
+    """Рассылка: кому (audience) и что (template) отправить"""
+
+    def __init__(self, name: CampaignName, audience: Audience, template: CampaignTemplate):
+        self.name = name
+        self.audience = audience
+        self.template = template
+
+
+CAMPAIGNS: Dict[CampaignName, Campaign] = {
+    campaign.name: campaign for campaign in [
+        Campaign(
+            CampaignName.HACKATHON_CONSULTATION,
+            PARTICIPANTS_AND_MENTORS,
+            CampaignTemplate(
+                "Консультация хакатона",
+                "Консультация по проведению хакатона",
+                paragraph("Приглашаем вас на онлайн-консультацию по проведению хакатона, которая состоится завтра, "
+                          "<strong>3 апреля, в 9:30 по Московскому времени</strong>."),
+                button(CONFERENCE_URL, "Присоединиться к консультации"),
+                link(CONFERENCE_URL),
+            )
+        ),
+        Campaign(
+            CampaignName.JUDGE_BRIEFING,
+            JUDGES,
+            CampaignTemplate(
+                "Брифинг для членов жюри хакатона",
+                "Брифинг для членов жюри хакатона",
+                paragraph("Приглашаем вас на брифинг по проведению хакатона, который состоится завтра, "
+                          "<strong>3 апреля, в 8:30 по Московскому времени</strong>."),
+                button(CONFERENCE_URL, "Присоединиться к брифингу"),
+                link(CONFERENCE_URL),
+            )
+        ),
+        Campaign(
+            CampaignName.REGISTRATION_CLOSED,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Регистрация закрыта - опубликованы исходные данные",
+                "Регистрация на хакатон закрыта",
+                paragraph("Регистрация на хакатон завершена. "
+                          "В разделе \"Моя команда\" опубликованы исходные данные для выполнения задания."),
+                button(TEAM_PROFILE_URL, "Перейти к исходным данным"),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.TEAM_CONFIRMATION,
+            ACTIVE_TEAMS_WITH_ROSTER,
+            CampaignTemplate(
+                "Подтверждение участия в хакатоне",
+                "Подтверждение участия в хакатоне",
+                paragraph("Ваша команда \"$team_name\" успешно зарегистрирована для участия в хакатоне."),
+                TEAM_MEMBERS,
+            )
+        ),
+        Campaign(
+            CampaignName.TASK_UPDATE,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Опубликовано дополнение к исходным данным",
+                "Дополнение к исходным данным",
+                paragraph("На сайте хакатона опубликовано дополнение к исходным данным. "
+                          "Ознакомьтесь с обновленной информацией в личном кабинете."),
+                button(TEAM_PROFILE_URL, "Перейти к дополнению"),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.HACKATHON_OPENING,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Открытие хакатона",
+                "Открытие хакатона",
+                paragraph("Приглашаем вас на онлайн-открытие хакатона, которое состоится завтра, "
+                          "<strong>9 апреля, в 9:00 по Московскому времени</strong>."),
+                button(CONFERENCE_URL, "Присоединиться к открытию"),
+                link(CONFERENCE_URL),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.HACKATHON_STARTED,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Хакатон начался! Опубликованы тестовые данные",
+                "Хакатон начался!",
+                paragraph("Хакатон официально стартовал! "
+                          "В разделе \"Моя команда\" опубликованы тестовые данные для выполнения задания."),
+                paragraph("Желаем вашей команде продуктивной работы и успешного выполнения задания!"),
+                button(TEAM_PROFILE_URL, "Перейти к тестовым данным"),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.SOLUTION_SUBMISSION,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Завершение хакатона через 30 минут",
+                "Завершение хакатона через 30 минут",
+                paragraph("До окончания хакатона осталось менее 30 минут. "
+                          "Просим вас убедиться, что все материалы вашего решения прикреплены в личном кабинете."),
+                button(TEAM_PROFILE_URL, "Перейти в личный кабинет"),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.HACKATHON_ENDED,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Хакатон завершен",
+                "Хакатон завершен",
+                paragraph("Хакатон официально завершен. В настоящее время жюри приступает к проверке решений команд."),
+                paragraph("Благодарим вас за участие! О результатах проверки и дальнейших шагах мы сообщим дополнительно."),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.JUDGE_OPENING,
+            JUDGES,
+            CampaignTemplate(
+                "Очное открытие хакатона",
+                "Очное открытие хакатона",
+                paragraph("Приглашаем вас на очное открытие хакатона, которое состоится сегодня, "
+                          "<strong>в 10:30 по тюменскому времени</strong>."),
+                paragraph("Место проведения: <strong>ул. Володарского, 38, аудитория 237</strong>"),
+                paragraph("Просим вас прибыть за 10-15 минут до начала мероприятия."),
+            )
+        ),
+        Campaign(
+            CampaignName.DEFENSE_SCHEDULE,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Защита проектов - Информация о подключении",
+                "Защита проектов",
+                paragraph("Просим подключиться в <strong>8:30 (Мск) 11.04.25</strong> для проверки связи."),
+                paragraph(
+                    "Во время защиты необходимо продемонстрировать работу своей программы. "
+                    "В докладе перечислить результаты моделирования.",
+                    "BigBlueButton позволяет осуществлять демонстрацию экрана.",
+                    "<strong>Продолжительность доклада не более 5 минут.</strong>",
+                    "<strong>График защит представлен на главной странице сайта.</strong>"
+                ),
+                button(CONFERENCE_URL, "Присоединиться к защите"),
+                TEAM_NAME,
+            )
+        ),
+        Campaign(
+            CampaignName.CLOSING_CEREMONY,
+            ACTIVE_TEAM_MEMBERS,
+            CampaignTemplate(
+                "Торжественное закрытие хакатона",
+                "Торжественное закрытие хакатона",
+                paragraph("Приглашаем вас принять участие в торжественном закрытии хакатона, "
+                          "которое состоится сегодня в <strong>14:00 (Мск)</strong>."),
+                button(CONFERENCE_URL, "Присоединиться к церемонии закрытия"),
+                TEAM_NAME,
+            )
+        ),
+    ]
+}
+
+
+def get_campaign(name: CampaignName) -> Campaign:
+    return CAMPAIGNS[CampaignName(name)]
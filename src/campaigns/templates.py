@@ -0,0 +1,148 @@
+from html import escape
+from string import Template
+from typing import List, Optional
+
+LAYOUT = """
+<!DOCTYPE html>
+<html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    </head>
+    <body style="margin: 0; padding: 0; background-color: #f5f5f5;">
+        <table border="0" cellpadding="0" cellspacing="0" width="100%" style="font-family: Arial, sans-serif;">
+            <tr>
+                <td align="center" style="padding: 20px 0;">
+                    <table border="0" cellpadding="0" cellspacing="0" width="600" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);">
+                        <tr>
+                            <td align="center" style="padding: 40px 30px;">
+                                <!-- Header -->
+                                <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 30px;">
+                                    <tr>
+                                        <td align="center">
+                                            <h1 style="color: #2196F3; font-size: 24px; margin: 0;">$title</h1>
+                                        </td>
+                                    </tr>
+                                </table>
+
+                                <!-- Content -->
+                                <table border="0" cellpadding="0" cellspacing="0" width="100%">
+                                    <tr>
+                                        <td align="center" style="padding: 0 0 20px 0;">
+                                            <p style="margin: 0;">Здравствуйте, $$name!</p>
+                                        </td>
+                                    </tr>
+$content
+                                </table>
+
+                                <!-- Footer -->
+                                <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-top: 30px;">
+                                    <tr>
+                                        <td align="center" style="color: #666666; font-size: 14px;">
+                                            <p style="margin: 0;">Это автоматическое уведомление, пожалуйста, не отвечайте на него.</p>
+                                        </td>
+                                    </tr>
+                                </table>
+                            </td>
+                        </tr>
+                    </table>
+                </td>
+            </tr>
+        </table>
+    </body>
+</html>
+"""
+
+ROW_INDENT = " " * 36
+
+
+def literal(value: str) -> str:
+    """
+    Текст, вставляемый в шаблон как есть: $ экранируется как $$.
+    Строки шаблона подставляются в макет, а затем макет еще раз проходит через Template при отправке,
+    поэтому $ в заголовке, ссылках и надписях иначе был бы принят за подстановку.
+    """
+    return value.replace("$", "$$")
+
+
+def paragraph(*lines: str) -> str:
+    """
+    Строка таблицы с одним или несколькими абзацами.
+    Строки - шаблон: $name и $team_name подставляются при отправке, знак доллара пишется как $$.
+    """
+    paragraphs = [f'<p style="margin: 0;">{lines[0]}</p>'] + [
+        f'<p style="margin: 10px 0 0 0;">{line}</p>' for line in lines[1:]
+    ]
+    return (
+        '<tr>\n'
+        '    <td align="center" style="padding: 0 0 20px 0;">\n'
+        + ''.join(f'        {p}\n' for p in paragraphs) +
+        '    </td>\n'
+        '</tr>'
+    )
+
+
+def button(url: str, label: str) -> str:
+    """Строка таблицы с кнопкой-ссылкой"""
+    url, label = literal(url), literal(label)
+    return (
+        '<tr>\n'
+        '    <td align="center" style="padding: 20px 0;">\n'
+        '        <table border="0" cellpadding="0" cellspacing="0">\n'
+        '            <tr>\n'
+        '                <td align="center" bgcolor="#2196F3" style="border-radius: 4px;">\n'
+        f'                    <a href="{url}" \n'
+        '                       style="display: inline-block; padding: 12px 24px; color: #ffffff; text-decoration: none; font-weight: bold;">\n'
+        f'                        {label}\n'
+        '                    </a>\n'
+        '                </td>\n'
+        '            </tr>\n'
+        '        </table>\n'
+        '    </td>\n'
+        '</tr>'
+    )
+
+
+def link(url: str) -> str:
+    """Строка таблицы с запасной текстовой ссылкой"""
+    url = literal(url)
+    return paragraph(f'Или перейдите по ссылке: <a href="{url}" style="color: #2196F3;">{url}</a>')
+
+
+TEAM_NAME = paragraph("Команда: $team_name")
+
+# $team_members - пункты списка, собранные при отправке из состава команды получателя
+TEAM_MEMBERS = (
+    '<tr>\n'
+    '    <td align="center" style="padding: 0 0 20px 0;">\n'
+    '        <p style="margin: 0;">Состав команды:</p>\n'
+    '        <ul style="list-style: none; padding: 0;">$team_members</ul>\n'
+    '    </td>\n'
+    '</tr>'
+)
+
+
+class CampaignTemplate:
+    """
+    Шаблон письма рассылки. Общий макет собирается один раз при создании шаблона,
+    при отправке подставляются только имя получателя и название команды.
+    """
+
+    def __init__(self, subject: str, title: str, *rows: str):
+        self.subject = subject
+        content = "\n".join(
+            "\n".join(ROW_INDENT + line for line in row.splitlines())
+            for row in rows
+        )
+        self._template = Template(
+            Template(LAYOUT).substitute(title=literal(escape(title)), content=content)
+        )
+
+    def render(self, name: str, team_name: Optional[str] = None, team_members: Optional[List[str]] = None) -> str:
+        return self._template.substitute(
+            name=escape(name or ""),
+            team_name=escape(team_name or ""),
+            team_members="".join(
+                f'<li style="margin: 5px 0;">{escape(member)}</li>' for member in team_members or []
+            )
+        )
@@ -1,3 +1,4 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from src.db import Base
@@ -10,13 +11,19 @@ from src.models.enum_tables import (
     FileOwnerTypeTable
 )
 from src.models.enums import TeamRole, TeamMemberStatus, FileFormat, FileType, FileOwnerType, StageType
+from src.utils.blob_store import BLOB_STORE_DDL
+from src.utils.search import SEARCH_DDL
 import uuid
 
 
 async def init_models(engine: AsyncEngine):
     """Инициализация моделей базы данных"""
     async with engine.begin() as conn:
+        for statement in SEARCH_DDL:
+            await conn.execute(text(statement))
         await conn.run_sync(Base.metadata.create_all)
+        for statement in BLOB_STORE_DDL:
+            await conn.execute(text(statement))
 
     async_session = sessionmaker(
         engine, class_=AsyncSession, expire_on_commit=False
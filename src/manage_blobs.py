@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import sys
+
+from src.db import async_session
+from src.utils.blob_store import blob_store
+
+
+def _format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f}MB"
+
+
+async def stats() -> int:
+    async with async_session() as session:
+        result = await blob_store.stats(session)
+
+    print(f"Блобов: {result['blobs']} (без ссылок: {result['unreferenced_blobs']})")
+    print(f"Файлов в хранилище: {result['files']}, файлов вне хранилища: {result['legacy_files']}")
+    print(f"Занято на диске: {_format_size(result['physical_bytes'])}")
+    print(f"Без дедупликации: {_format_size(result['logical_bytes'])}")
+    print(f"Сэкономлено: {_format_size(result['saved_bytes'])}, коэффициент: {result['dedup_ratio']}")
+    return 0
+
+
+async def verify(quick: bool, repair_refs: bool) -> int:
+    async with async_session() as session:
+        problems = await blob_store.verify(session, rehash=not quick, repair_refs=repair_refs)
+
+    titles = {
+        "missing": "Нет файла",
+        "size_mismatch": "Размер не совпадает",
+        "hash_mismatch": "SHA-256 не совпадает",
+        "ref_count_mismatch": "Неверный ref_count" + (" (исправлен)" if repair_refs else ""),
+        "orphaned": "Файл без записи блоба",
+    }
+    for kind, items in problems.items():
+        for item in items:
+            print(f"{titles[kind]}: {item}")
+
+    total = sum(len(items) for items in problems.values())
+    print("Ошибок не найдено" if total == 0 else f"Найдено проблем: {total}")
+    return 0 if total == 0 else 1
+
+
+async def gc() -> int:
+    removed = await blob_store.collect_garbage()
+    print(f"Удалено блобов без ссылок: {removed}")
+    return 0
+
+
+async def import_legacy() -> int:
+    async with async_session() as session:
+        result = await blob_store.import_legacy(session)
+
+    print(f"Перенесено файлов: {result['imported']} (уже были в хранилище: {result['deduplicated']})")
+    if result["missing"]:
+        print(f"Файлов нет на диске: {result['missing']}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Обслуживание хранилища файлов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="Занятое место и экономия от дедупликации")
+    verify_parser = commands.add_parser("verify", help="Проверка целостности хранилища")
+    verify_parser.add_argument("--quick", action="store_true", help="Проверять наличие и размер без пересчета SHA-256")
+    verify_parser.add_argument("--repair-refs", action="store_true", help="Исправить неверные ref_count")
+    commands.add_parser("gc", help="Удалить блобы без ссылок")
+    commands.add_parser("import-legacy", help="Перенести в хранилище файлы, сохраненные до него")
+
+    args = parser.parse_args()
+    if args.command == "stats":
+        return asyncio.run(stats())
+    if args.command == "verify":
+        return asyncio.run(verify(args.quick, args.repair_refs))
+    if args.command == "gc":
+        return asyncio.run(gc())
+    return asyncio.run(import_legacy())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,17 @@
-from .enums import TeamRole, FileFormat, FileType, FileOwnerType, UserRole, UserStatus, TeamMemberStatus
+from .enums import TeamRole, FileFormat, FileType, FileOwnerType, UserRole, UserStatus, TeamMemberStatus, EmailStatus, CampaignStatus
 from .user import User, ParticipantInfo, MentorInfo, UserStatusType, UserStatusHistory
 from .file import File
 from .team import Team, TeamMember
+from .team_status import TeamStatusSummary
 from .role import Role
 from .evaluation import TeamEvaluation
+from .leaderboard import TeamScore
 from .enum_tables import TeamRoleTable, TeamMemberStatusTable, FileFormatTable, FileTypeTable, FileOwnerTypeTable
 from .stage import Stage
+from .email_outbox import EmailOutboxMessage
+from .campaign import CampaignRun
+from .solution_upload import SolutionUpload
+from .blob import Blob
 
 __all__ = [
     'User',
@@ -14,6 +20,7 @@ __all__ = [
     'ParticipantInfo',
     'Team',
     'TeamMember',
+    'TeamStatusSummary',
     'TeamRole',
     'File',
     'FileFormat',
@@ -30,5 +37,12 @@ __all__ = [
     'FileOwnerTypeTable',
     'Stage'
     'FileOwnerTypeTable',
-    'TeamEvaluation'
+    'TeamEvaluation',
+    'TeamScore',
+    'EmailStatus',
+    'EmailOutboxMessage',
+    'CampaignStatus',
+    'CampaignRun',
+    'SolutionUpload',
+    'Blob'
 ]
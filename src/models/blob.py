@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, Integer, DateTime, Index, text
+
+from src.db import Base
+
+
+class Blob(Base):
+    """
+    Содержимое файла в контентно-адресуемом хранилище, одно на все файлы с одинаковым SHA-256.
+    ref_count - количество записей files, ссылающихся на блоб (ведет триггер files_blob_ref_count)
+    """
+    __tablename__ = 'blobs'
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    mime_type = Column(String(100), nullable=False)
+    storage_path = Column(String(512), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    last_used_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_blobs_unreferenced', 'last_used_at', postgresql_where=text('ref_count = 0')),
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+from src.models.enums import CampaignStatus
+
+
+class CampaignRun(Base):
+    """Запуск рассылки. Состояние доставки по получателям хранится в email_outbox"""
+    __tablename__ = 'campaign_runs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(100), nullable=False)
+    idempotency_key = Column(String(255), nullable=True, unique=True)
+    status = Column(String(20), nullable=False, default=CampaignStatus.QUEUING.value)
+    total_recipients = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    queued_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    messages = relationship("EmailOutboxMessage", back_populates="campaign", passive_deletes=True)
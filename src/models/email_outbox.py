@@ -0,0 +1,37 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Index, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+from src.models.enums import EmailStatus
+
+
+class EmailOutboxMessage(Base):
+    """Письмо в очереди отправки. Отправляется воркером email_outbox_worker"""
+    __tablename__ = 'email_outbox'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey('campaign_runs.id', ondelete='CASCADE'), nullable=True)
+    to_email = Column(Text, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    is_html = Column(Boolean, nullable=False, default=False)
+
+    status = Column(String(20), nullable=False, default=EmailStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    # Relationships
+    campaign = relationship("CampaignRun", back_populates="messages")
+
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+        # Один получатель - одно письмо в рамках рассылки
+        UniqueConstraint('campaign_id', 'to_email', name='uq_email_outbox_campaign_recipient'),
+    )
@@ -58,3 +58,15 @@ class StageType(Enum):
     ONLINE_DEFENSE = "online_defense"
     RESULTS_PUBLICATION = "results_publication"
     AWARD_CEREMONY = "award_ceremony"
+
+
+class EmailStatus(str, Enum):
+    PENDING = "pending"  # Ожидает отправки (в том числе повторной)
+    SENDING = "sending"  # Захвачено воркером
+    SENT = "sent"
+    FAILED = "failed"  # Исчерпаны попытки отправки
+
+
+class CampaignStatus(str, Enum):
+    QUEUING = "queuing"  # Получатели ставятся в очередь отправки
+    QUEUED = "queued"  # Все получатели в очереди отправки
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, ForeignKey, Integer, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, DateTime, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -28,6 +28,10 @@ class TeamEvaluation(Base):
     team = relationship("Team", backref="evaluations")
     judge = relationship("User")
 
+    __table_args__ = (
+        UniqueConstraint('team_id', 'judge_id', name='uq_team_evaluations_team_judge'),
+    )
+
     def get_total_score(self) -> int:
         """Подсчет суммарного балла по всем критериям"""
         return (self.criterion_1 + self.criterion_2 + self.criterion_3 + 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, String, BigInteger, ForeignKey, DateTime, Enum as SQLAlchemyEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -16,6 +16,11 @@ class File(Base):
     file_path = Column(String(512), nullable=False)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    # Заполняются при загрузке; у файлов, сохраненных до хранилища блобов, пустые
+    sha256 = Column(String(64), ForeignKey('blobs.sha256'), nullable=True, index=True)
+    size = Column(BigInteger, nullable=True)
+    mime_type = Column(String(100), nullable=True)
+
     file_format_id = Column(UUID(as_uuid=True), ForeignKey('file_formats.id'), nullable=False)
     file_type_id = Column(UUID(as_uuid=True), ForeignKey('file_types.id'), nullable=False)
     owner_type_id = Column(UUID(as_uuid=True), ForeignKey('file_owner_types.id'), nullable=False)
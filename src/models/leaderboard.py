@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, DateTime, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+
+
+class TeamScore(Base):
+    """Строка лидерборда: итог по последним оценкам каждого члена жюри, обновляется при записи оценки"""
+    __tablename__ = 'team_scores'
+
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True)
+    total_score = Column(Integer, nullable=False, default=0)
+    evaluations_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    team = relationship("Team")
+
+    __table_args__ = (
+        Index('ix_team_scores_total_score', 'total_score'),
+    )
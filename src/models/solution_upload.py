@@ -0,0 +1,39 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, BigInteger, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+
+
+class SolutionUpload(Base):
+    """
+    Сессия докачиваемой загрузки решения команды. Принятые части лежат в файле file_path.
+    Запрос, принимающий часть или завершающий загрузку, захватывает сессию арендой lease_token
+    до lease_expires_at - без открытой транзакции на время приема тела запроса.
+    """
+    __tablename__ = 'solution_uploads'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(512), nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    received_size = Column(BigInteger, nullable=False, default=0)
+    sha256 = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    lease_token = Column(UUID(as_uuid=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # SHA-256 архива, уже перенесенного в хранилище блобов: повтор /complete берет его оттуда
+    blob_sha256 = Column(String(64), nullable=True)
+
+    # Relationships
+    team = relationship("Team")
+
+    __table_args__ = (
+        Index('ix_solution_uploads_team_id', 'team_id'),
+        Index('ix_solution_uploads_expires_at', 'expires_at'),
+    )
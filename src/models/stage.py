@@ -15,6 +15,8 @@ class Stage(Base):
     type = Column(String, nullable=False)
     order = Column(Integer, nullable=False, unique=True)
     is_active = Column(Boolean, default=False)
+    # Время автоматического перехода на этап, None - этап включается вручную
+    starts_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
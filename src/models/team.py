@@ -1,12 +1,13 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 from src.db import Base
+from src.utils.search import trigram_index_expression
 from . import File, TeamMemberStatus, UserStatus, TeamRole
 
 
@@ -26,6 +27,14 @@ class Team(Base):
     members = relationship("TeamMember", back_populates="team")
     logo = relationship("File", foreign_keys=[logo_file_id])
     files = relationship("File", back_populates="team", foreign_keys=[File.team_id])
+    status_summary = relationship("TeamStatusSummary", back_populates="team", uselist=False, passive_deletes=True)
+
+    # Ключ пагинации списка команд
+    __table_args__ = (
+        Index('ix_teams_team_name_id', 'team_name', 'id'),
+        # Поиск по названию (pg_trgm)
+        Index('ix_teams_team_name_trgm', trigram_index_expression('team_name'), postgresql_using='gin'),
+    )
 
     def get_active_members(self) -> List["TeamMember"]:
         """Получение списка принятых участников команды"""
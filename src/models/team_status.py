@@ -0,0 +1,53 @@
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Boolean, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+
+
+class TeamStatusSummary(Base):
+    """Хранимый статус команды, обновляется при изменении состава или статусов участников"""
+    __tablename__ = 'team_status_summaries'
+
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True)
+    status = Column(String(50), nullable=False, default="incomplete")
+    total_members = Column(Integer, nullable=False, default=0)
+    regular_members_count = Column(Integer, nullable=False, default=0)
+    has_mentor = Column(Boolean, nullable=False, default=False)
+    mentor_status = Column(String(50), nullable=True)
+    has_team_leader = Column(Boolean, nullable=False, default=False)
+    team_leader_status = Column(String(50), nullable=True)
+    members_approved = Column(Integer, nullable=False, default=0)
+    members_pending = Column(Integer, nullable=False, default=0)
+    members_need_update = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    team = relationship("Team", back_populates="status_summary")
+
+    __table_args__ = (
+        Index('ix_team_status_summaries_status', 'status'),
+    )
+
+    @property
+    def can_participate(self) -> bool:
+        return self.status == "active"
+
+    def get_status_details(self) -> dict:
+        """Детали статуса в формате Team.get_status_details"""
+        return {
+            "status": self.status,
+            "can_participate": self.can_participate,
+            "total_members": self.total_members,
+            "regular_members_count": self.regular_members_count,
+            "has_mentor": self.has_mentor,
+            "mentor_status": self.mentor_status,
+            "has_team_leader": self.has_team_leader,
+            "team_leader_status": self.team_leader_status,
+            "members_status": {
+                "approved": self.members_approved,
+                "pending": self.members_pending,
+                "need_update": self.members_need_update
+            }
+        }
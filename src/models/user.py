@@ -1,10 +1,11 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 from src.db import Base
+from src.utils.search import trigram_index_expression
 
 
 class User(Base):
@@ -18,6 +19,7 @@ class User(Base):
     registered_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     current_status_id = Column(UUID(as_uuid=True), ForeignKey('user_status_types.id'), nullable=False)
     email_verified = Column(Boolean, default=False, nullable=False)
+    token_version = Column(Integer, default=0, server_default='0', nullable=False)
 
     # Relationships
     user2roles = relationship("User2Roles", back_populates="user")
@@ -29,6 +31,15 @@ class User(Base):
     current_status = relationship("UserStatusType")
     status_history = relationship("UserStatusHistory", back_populates="user", order_by="UserStatusHistory.created_at.desc()")
 
+    # Ключи пагинации списков пользователей
+    __table_args__ = (
+        Index('ix_users_full_name_id', 'full_name', 'id'),
+        Index('ix_users_registered_at_id', 'registered_at', 'id'),
+        # Поиск по ФИО и email (pg_trgm)
+        Index('ix_users_full_name_trgm', trigram_index_expression('full_name'), postgresql_using='gin'),
+        Index('ix_users_email_trgm', trigram_index_expression('email'), postgresql_using='gin'),
+    )
+
     @property
     def roles(self):
         return [user2role.role for user2role in self.user2roles]
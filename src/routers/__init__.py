@@ -4,6 +4,7 @@ from .users import router as users_router
 from .files import router as files_router
 from .stages import router as stages_router
 from .evaluations import router as evaluations_router
+from .campaigns import router as campaigns_router
 
 __all__ = ['auth_router', 'teams_router', 'users_router', 'files_router', 'stages_router']
-__all__ = ['auth_router', 'teams_router', 'users_router', 'files_router', 'evaluations_router']
+__all__ = ['auth_router', 'teams_router', 'users_router', 'files_router', 'evaluations_router', 'campaigns_router']
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Form, BackgroundTasks, Request
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,52 +9,68 @@ import uuid
 import os
 import aiofiles
 
-from src.auth.utils import verify_password, get_password_hash
+from src.auth.utils import password_hasher
 from src.db import get_session
 from src.models import User, FileType, FileOwnerType, File as FileModel, ParticipantInfo
 from src.models.enums import StageType
 from src.models.user import User2Roles, MentorInfo, UserStatusHistory, EmailVerificationToken
 from src.schemas.user import UserCreate, UserLogin, Token, UserResponse, UserResponseRegister, MentorCreate
-from src.auth.jwt import create_access_token, get_current_user
+from src.auth.jwt import create_access_token, get_current_user, get_current_user_model
+from src.auth.principal import AuthPrincipal
 from src.settings import settings
 from src.utils.email_verification import create_verification_token, send_verification_email, verify_email_token
-from src.utils.file_utils import save_file
+from src.utils.file_utils import DOCUMENT_FILE, save_file
+from src.utils.multipart_stream import StreamedForm, parse_multipart_stream, multipart_openapi
 
 from src.utils.router_states import file_router_state, user_router_state
 from src.utils.stage_checker import check_stage
-from src.utils.background_tasks import send_registration_confirmation_email, \
-    send_single_hackathon_consultation_notification
+from src.utils.background_tasks import send_registration_confirmation_email
 
 security = HTTPBearer()
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=UserResponseRegister)
+@router.post(
+    "/register",
+    response_model=UserResponseRegister,
+    openapi_extra=multipart_openapi(
+        ["email", "password", "number", "vuz", "vuz_direction", "code_speciality", "course"],
+        ["consent_file", "education_certificate_file"],
+        optional_fields=["full_name"]
+    )
+)
 async def register(
-        email: str = Form(...),
-        password: str = Form(...),
-        number: str = Form(...),
-        vuz: str = Form(...),
-        vuz_direction: str = Form(...),
-        code_speciality: str = Form(...),
-        course: str = Form(...),
-        full_name: str = Form(None),
-        consent_file: UploadFile = File(...),
-        education_certificate_file: UploadFile = File(...),
+        request: Request,
         background_tasks: BackgroundTasks = BackgroundTasks(),
         session: AsyncSession = Depends(get_session)
 ):
+    """Регистрация участника. Документы пишутся на диск потоком во время чтения запроса."""
     await check_stage(session, StageType.REGISTRATION)
 
+    form = await parse_multipart_stream(
+        request,
+        settings.upload_staging_dir,
+        {"consent_file": DOCUMENT_FILE, "education_certificate_file": DOCUMENT_FILE}
+    )
+    try:
+        return await register_participant(form, background_tasks, session)
+    finally:
+        await form.discard()
+
+
+async def register_participant(form: StreamedForm, background_tasks: BackgroundTasks, session: AsyncSession):
+    consent_file = form.file("consent_file")
+    education_certificate_file = form.file("education_certificate_file")
+
     user_data = UserCreate(
-        email=email.lower(),
-        password=password,
-        number=number,
-        vuz=vuz,
-        vuz_direction=vuz_direction,
-        code_speciality=code_speciality,
-        course=course,
-        full_name=full_name
+        email=form.field("email").lower(),
+        password=form.field("password"),
+        number=form.field("number"),
+        vuz=form.field("vuz"),
+        vuz_direction=form.field("vuz_direction"),
+        code_speciality=form.field("code_speciality"),
+        course=form.field("course"),
+        full_name=form.field("full_name", required=False)
     )
 
     query = select(User).where(User.email == user_data.email)
@@ -68,7 +84,7 @@ async def register(
     user = User(
         id=uuid.uuid4(),
         email=user_data.email,
-        password=get_password_hash(user_data.password),
+        password=await password_hasher.hash(user_data.password),
         full_name=user_data.full_name,
         current_status_id=user_router_state.pending_status_id,
     )
@@ -139,28 +155,44 @@ async def register(
     return user_with_data
 
 
-@router.post("/register/mentor", response_model=UserResponseRegister)
+@router.post(
+    "/register/mentor",
+    response_model=UserResponseRegister,
+    openapi_extra=multipart_openapi(
+        ["email", "password", "full_name", "number", "job", "job_title"],
+        ["consent_file", "job_certificate_file"]
+    )
+)
 async def register_mentor(
-        email: str = Form(...),
-        password: str = Form(...),
-        full_name: str = Form(...),
-        number: str = Form(...),
-        job: str = Form(...),
-        job_title: str = Form(...),
-        consent_file: UploadFile = File(...),
-        job_certificate_file: UploadFile = File(...),
+        request: Request,
         background_tasks: BackgroundTasks = BackgroundTasks(),
         session: AsyncSession = Depends(get_session)
 ):
+    """Регистрация ментора. Документы пишутся на диск потоком во время чтения запроса."""
     await check_stage(session, StageType.REGISTRATION)
 
+    form = await parse_multipart_stream(
+        request,
+        settings.upload_staging_dir,
+        {"consent_file": DOCUMENT_FILE, "job_certificate_file": DOCUMENT_FILE}
+    )
+    try:
+        return await register_mentor_user(form, background_tasks, session)
+    finally:
+        await form.discard()
+
+
+async def register_mentor_user(form: StreamedForm, background_tasks: BackgroundTasks, session: AsyncSession):
+    consent_file = form.file("consent_file")
+    job_certificate_file = form.file("job_certificate_file")
+
     mentor_data = MentorCreate(
-        email=email.lower(),
-        password=password,
-        full_name=full_name,
-        number=number,
-        job=job,
-        job_title=job_title
+        email=form.field("email").lower(),
+        password=form.field("password"),
+        full_name=form.field("full_name"),
+        number=form.field("number"),
+        job=form.field("job"),
+        job_title=form.field("job_title")
     )
 
     query = select(User).where(User.email == mentor_data.email)
@@ -174,7 +206,7 @@ async def register_mentor(
     user = User(
         id=uuid.uuid4(),
         email=mentor_data.email,
-        password=get_password_hash(mentor_data.password),
+        password=await password_hasher.hash(mentor_data.password),
         full_name=mentor_data.full_name,
         current_status_id=user_router_state.pending_status_id,
     )
@@ -261,7 +293,7 @@ async def register_special(
     user = User(
         id=uuid.uuid4(),
         email=email.lower(),
-        password=get_password_hash(password),
+        password=await password_hasher.hash(password),
         full_name=full_name,
         current_status_id=user_router_state.approved_status_id,
     )
@@ -310,32 +342,55 @@ async def register_special(
 
 @router.post("/login", response_model=Token)
 async def login(user_data: UserLogin, session: AsyncSession = Depends(get_session)):
-    query = select(User).where(User.email == user_data.email.lower())
+    query = (
+        select(User)
+        .options(selectinload(User.user2roles))
+        .where(User.email == user_data.email.lower())
+    )
     result = await session.execute(query)
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(user_data.password, user.password):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неверный логин или пароль",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    is_valid, new_hash = await password_hasher.verify_and_update(user_data.password, user.password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный логин или пароль",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if new_hash:
+        user.password = new_hash
+        await session.commit()
+
     if not user.email_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email не подтвержден. Пожалуйста, проверьте вашу почту или запросите новое письмо для подтверждения.",
         )
 
+    principal = AuthPrincipal(
+        id=user.id,
+        email=user.email,
+        role_ids=[user2role.role_id for user2role in user.user2roles],
+        current_status_id=user.current_status_id,
+        token_version=user.token_version
+    )
     access_token = create_access_token(
-        data={"sub": user.email}
+        data=principal.to_claims()
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     query = (
@@ -388,7 +443,7 @@ async def verify_email(
 
 @router.post("/resend-verification")
 async def resend_verification(
-        current_user: User = Depends(get_current_user),
+        current_user: User = Depends(get_current_user_model),
         session: AsyncSession = Depends(get_session)
 ):
     """Повторная отправка письма для подтверждения email"""
@@ -0,0 +1,64 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.permissions import AuthContext, require_roles
+from src.campaigns import fill_campaign, get_campaign_progress, reset_failed_deliveries
+from src.db import get_session
+from src.models.enums import UserRole
+from src.schemas.campaign import CampaignProgressResponse
+
+router = APIRouter(
+    prefix="/campaigns",
+    tags=["campaigns"]
+)
+
+
+@router.get("/{campaign_id}", response_model=CampaignProgressResponse)
+async def get_campaign(
+        campaign_id: UUID,
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
+        session: AsyncSession = Depends(get_session)
+):
+    """Прогресс рассылки: отправлено, ошибки, в очереди и скорость отправки (писем в минуту)"""
+    progress = await get_campaign_progress(session, campaign_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Рассылка не найдена"
+        )
+    return progress
+
+
+@router.post("/{campaign_id}/resume", response_model=CampaignProgressResponse)
+async def resume_campaign(
+        campaign_id: UUID,
+        background_tasks: BackgroundTasks,
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
+        session: AsyncSession = Depends(get_session)
+):
+    """
+    Возобновить рассылку: письма с ошибкой отправки возвращаются в очередь,
+    получатели, до которых рассылка не дошла, ставятся в очередь.
+    Уже получившим письмо повторно ничего не отправляется.
+    """
+    progress = await get_campaign_progress(session, campaign_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Рассылка не найдена"
+        )
+
+    await reset_failed_deliveries(session, campaign_id)
+    await session.commit()
+
+    background_tasks.add_task(fill_campaign, campaign_id)
+
+    return await get_campaign_progress(session, campaign_id)
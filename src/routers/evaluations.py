@@ -1,22 +1,34 @@
 import uuid
-from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_, true
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
-from src.auth.jwt import get_current_user
+from src.auth.permissions import AuthContext, require_roles
 from src.db import get_session
 from src.models.user import User, User2Roles
 from src.models.team import Team, TeamMember
 from src.models.evaluation import TeamEvaluation
+from src.models.leaderboard import TeamScore
+from src.models.enums import UserRole
 from src.schemas.evaluation import (
     TeamEvaluationCreate,
     TeamEvaluationResponse,
-    TeamTotalScore, UnevaluatedTeam, DetailedTeamEvaluationResponse
+    TeamTotalScore, UnevaluatedTeam, DetailedTeamEvaluationResponse,
+    TeamEvaluationBatch, TeamEvaluationBatchItem, TeamEvaluationBatchResponse,
+    RankingMode, NormalizedTeamScore
 )
+from src.utils.evaluation_stats import normalized_ranking_cache
+from src.utils.evaluation_utils import upsert_evaluations
+from src.utils.leaderboard import (
+    leaderboard_cache, leaderboard_response, lock_team_scores, refresh_team_score, refresh_team_scores
+)
+from src.utils.responses import FastJSONResponse
+from src.utils.results_snapshot import public_results_response
 from src.utils.router_states import user_router_state
+from src.utils.team_utils import active_team_ids_query
 
 router = APIRouter(
     prefix="/evaluations",
@@ -27,128 +39,105 @@ router = APIRouter(
 @router.post("/evaluate-team", response_model=TeamEvaluationResponse)
 async def create_evaluation(
         evaluation: TeamEvaluationCreate,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE,
+            detail="Only judges can evaluate teams"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
-    """Создание оценки команды членом жюри"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-
-    if not is_judge:
-        raise HTTPException(status_code=403, detail="Only judges can evaluate teams")
-
-    team_query = (
-        select(Team)
-        .where(Team.id == evaluation.team_id)
-    )
-    team = await session.execute(team_query)
-    team = team.scalar_one_or_none()
-
-    if not team:
+    """Создание или обновление оценки команды членом жюри"""
+    await lock_team_scores(session, [evaluation.team_id])
+    try:
+        saved_evaluations = await upsert_evaluations(session, auth.user_id, [evaluation])
+    except IntegrityError:
+        # Нарушен внешний ключ team_id
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Команда не найдена"
         )
 
-    existing_evaluation_query = (
-        select(TeamEvaluation)
-        .where(
-            TeamEvaluation.team_id == evaluation.team_id,
-            TeamEvaluation.judge_id == current_user.id
-        )
-    )
-    existing_evaluation = await session.execute(existing_evaluation_query)
-    existing_evaluation = existing_evaluation.scalar_one_or_none()
-
-    if existing_evaluation:
-        existing_evaluation.criterion_1 = evaluation.criterion_1
-        existing_evaluation.criterion_2 = evaluation.criterion_2
-        existing_evaluation.criterion_3 = evaluation.criterion_3
-        existing_evaluation.criterion_4 = evaluation.criterion_4
-        existing_evaluation.criterion_5 = evaluation.criterion_5
-        existing_evaluation.updated_at = datetime.utcnow()
-        await session.commit()
+    await refresh_team_score(session, evaluation.team_id)
+    await session.commit()
+    leaderboard_cache.invalidate()
+    normalized_ranking_cache.invalidate()
 
-        return TeamEvaluationResponse(
-            id=existing_evaluation.id,
-            team_id=existing_evaluation.team_id,
-            team_name=team.team_name,
-            team_motto=team.team_motto,
-            judge_id=existing_evaluation.judge_id,
-            criterion_1=existing_evaluation.criterion_1,
-            criterion_2=existing_evaluation.criterion_2,
-            criterion_3=existing_evaluation.criterion_3,
-            criterion_4=existing_evaluation.criterion_4,
-            criterion_5=existing_evaluation.criterion_5,
-            total_score=existing_evaluation.get_total_score(),
-            created_at=existing_evaluation.created_at,
-            updated_at=existing_evaluation.updated_at
-        )
-    else:
-        new_evaluation = TeamEvaluation(
-            id=uuid.uuid4(),
-            team_id=evaluation.team_id,
-            judge_id=current_user.id,
-            criterion_1=evaluation.criterion_1,
-            criterion_2=evaluation.criterion_2,
-            criterion_3=evaluation.criterion_3,
-            criterion_4=evaluation.criterion_4,
-            criterion_5=evaluation.criterion_5
-        )
+    return saved_evaluations[0]
 
-        session.add(new_evaluation)
-        await session.commit()
-        await session.refresh(new_evaluation)
 
-        return TeamEvaluationResponse(
-            id=new_evaluation.id,
-            team_id=new_evaluation.team_id,
-            team_name=team.team_name,
-            team_motto=team.team_motto,
-            judge_id=new_evaluation.judge_id,
-            criterion_1=new_evaluation.criterion_1,
-            criterion_2=new_evaluation.criterion_2,
-            criterion_3=new_evaluation.criterion_3,
-            criterion_4=new_evaluation.criterion_4,
-            criterion_5=new_evaluation.criterion_5,
-            total_score=new_evaluation.get_total_score(),
-            created_at=new_evaluation.created_at,
-            updated_at=new_evaluation.updated_at
-        )
+@router.post("/batch", response_model=TeamEvaluationBatchResponse)
+async def create_evaluations_batch(
+        batch: TeamEvaluationBatch,
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE,
+            detail="Only judges can evaluate teams"
+        )),
+        session: AsyncSession = Depends(get_session)
+):
+    """
+    Сохранение пакета оценок члена жюри одной транзакцией.
+    Команды проверяются одним запросом; оценки несуществующих команд и повторы команды
+    в пакете не сохраняются и возвращаются с ошибкой, остальные сохраняются.
+    """
+    team_ids = {evaluation.team_id for evaluation in batch.evaluations}
+    result = await session.execute(select(Team.id).where(Team.id.in_(team_ids)))
+    existing_team_ids = set(result.scalars().all())
+
+    to_save = []
+    results = []
+    seen_team_ids = set()
+    for evaluation in batch.evaluations:
+        item = TeamEvaluationBatchItem(team_id=evaluation.team_id, status="saved")
+        if evaluation.team_id not in existing_team_ids:
+            item.status = "team_not_found"
+            item.detail = "Команда не найдена"
+        elif evaluation.team_id in seen_team_ids:
+            item.status = "duplicate"
+            item.detail = "Команда уже оценена в этом пакете"
+        else:
+            seen_team_ids.add(evaluation.team_id)
+            to_save.append(evaluation)
+        results.append(item)
+
+    if to_save:
+        await lock_team_scores(session, seen_team_ids)
+        try:
+            saved_evaluations = await upsert_evaluations(session, auth.user_id, to_save)
+        except IntegrityError:
+            # Команду удалили после проверки
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Список команд изменился, повторите отправку"
+            )
+        await refresh_team_scores(session, seen_team_ids)
+        await session.commit()
+        leaderboard_cache.invalidate()
+        normalized_ranking_cache.invalidate()
+
+        saved_by_team = {saved.team_id: saved for saved in saved_evaluations}
+        for item in results:
+            if item.status == "saved":
+                item.evaluation = saved_by_team[item.team_id]
+
+    saved_count = len(to_save)
+    return TeamEvaluationBatchResponse(
+        saved_count=saved_count,
+        failed_count=len(results) - saved_count,
+        results=results
+    )
 
 
 @router.get("/team/{team_id}", response_model=List[TeamEvaluationResponse])
 async def get_team_evaluations(
         team_id: str,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE, UserRole.ADMIN,
+            detail="Only judges and administrators can view evaluations"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Получение всех оценок команды"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in user_roles
-    )
-
-    if not (is_judge or is_admin):
-        raise HTTPException(
-            status_code=403,
-            detail="Only judges and administrators can view evaluations"
-        )
-
     result = await session.execute(
         select(TeamEvaluation)
         .options(selectinload(TeamEvaluation.team))
@@ -181,96 +170,39 @@ async def get_team_evaluations(
     return evaluation_responses
 
 
-@router.get("/results", response_model=List[TeamTotalScore])
+@router.get("/results", response_model=Union[List[TeamTotalScore], List[NormalizedTeamScore]])
 async def get_evaluation_results(
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        mode: RankingMode = RankingMode.RAW,
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE, UserRole.ADMIN,
+            detail="Only judges and administrators can view results"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
-    """Получение итоговых результатов всех команд"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in user_roles
-    )
-
-    if not (is_judge or is_admin):
-        raise HTTPException(
-            status_code=403,
-            detail="Only judges and administrators can view results"
-        )
-
-    latest_evaluations = (
-        select(TeamEvaluation.id)
-        .distinct(TeamEvaluation.judge_id, TeamEvaluation.team_id)
-        .order_by(
-            TeamEvaluation.judge_id,
-            TeamEvaluation.team_id,
-            TeamEvaluation.created_at.desc()
-        )
-    ).scalar_subquery()
-
-    query = select(
-        Team.id.label('team_id'),
-        Team.team_name.label('team_name'),
-        Team.team_motto.label('team_motto'),
-        func.avg(
-            TeamEvaluation.criterion_1 +
-            TeamEvaluation.criterion_2 +
-            TeamEvaluation.criterion_3 +
-            TeamEvaluation.criterion_4 +
-            TeamEvaluation.criterion_5
-        ).label('average_score'),
-        func.count(TeamEvaluation.judge_id.distinct()).label('evaluations_count'),
-        func.sum(
-            TeamEvaluation.criterion_1 +
-            TeamEvaluation.criterion_2 +
-            TeamEvaluation.criterion_3 +
-            TeamEvaluation.criterion_4 +
-            TeamEvaluation.criterion_5
-        ).label('total_score')
-    ).join(
-        TeamEvaluation,
-        Team.id == TeamEvaluation.team_id
-    ).where(
-        TeamEvaluation.id.in_(latest_evaluations)
-    ).group_by(
-        Team.id,
-        Team.team_name
-    )
-
-    result = await session.execute(query)
-    return result.all()
+    """
+    Получение итоговых результатов всех команд.
+    mode=normalized - рейтинг с поправкой на строгость судей (z-оценки по судье и критерию)
+    и доверительными интервалами мест.
+    """
+    if mode == RankingMode.NORMALIZED:
+        return await normalized_ranking_cache.get(session)
+    return await leaderboard_response(request, session)
 
 
 @router.get("/my-evaluations", response_model=List[TeamEvaluationResponse])
 async def get_judge_evaluations(
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE,
+            detail="Only judges can access this endpoint"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Получение всех оценок, выставленных текущим членом жюри"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-
-    if not is_judge:
-        raise HTTPException(status_code=403, detail="Only judges can access this endpoint")
-
     result = await session.execute(
         select(TeamEvaluation)
         .options(selectinload(TeamEvaluation.team))
-        .where(TeamEvaluation.judge_id == current_user.id)
+        .where(TeamEvaluation.judge_id == auth.user_id)
     )
     evaluations = result.scalars().all()
 
@@ -301,31 +233,17 @@ async def get_judge_evaluations(
 
 @router.get("/unevaluated-teams", response_model=List[UnevaluatedTeam])
 async def get_unevaluated_teams(
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.JUDGE, UserRole.ADMIN,
+            detail="Only judges can access this endpoint"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Получение списка команд, которые еще не были оценены текущим членом жюри"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in user_roles
-    )
-
-    if not is_judge and not is_admin:
-        raise HTTPException(status_code=403, detail="Only judges can access this endpoint")
-
     evaluated_teams_subquery = (
         select(TeamEvaluation.team_id)
         .options(selectinload(TeamEvaluation.team))
-        .where(TeamEvaluation.judge_id == current_user.id)
+        .where(TeamEvaluation.judge_id == auth.user_id)
         .scalar_subquery()
     )
 
@@ -361,165 +279,127 @@ async def get_unevaluated_teams(
 
 @router.get("/detailed", response_model=List[DetailedTeamEvaluationResponse])
 async def get_detailed_evaluations(
-        current_user: User = Depends(get_current_user),
+        team_id: Optional[List[uuid.UUID]] = Query(None, description="Только указанные команды"),
+        limit: Optional[int] = Query(None, ge=1, le=500),
+        offset: int = Query(0, ge=0),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Only administrators and organizers can view detailed evaluations"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Получение детальной информации об оценках всех команд всеми судьями.
     Доступно только для администраторов и организаторов.
-    """
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
 
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=403,
-            detail="Only administrators and organizers can view detailed evaluations"
-        )
-
-    teams_query = (
-        select(Team)
-        .options(
-            selectinload(Team.members)
-            .selectinload(TeamMember.user)
-            .selectinload(User.current_status),
-            selectinload(Team.members)
-            .selectinload(TeamMember.role),
-            selectinload(Team.members)
-            .selectinload(TeamMember.status)
+    Матрица команды x судьи строится одним запросом: страница команд (по убыванию итогового балла)
+    соединяется со всеми судьями и их оценками.
+    """
+    teams_page = (
+        select(
+            Team.id,
+            Team.team_name,
+            Team.team_motto,
+            Team.solution_link,
+            func.coalesce(TeamScore.total_score, 0).label('rank_score')
         )
+        .outerjoin(TeamScore, TeamScore.team_id == Team.id)
+        .where(Team.id.in_(active_team_ids_query()))
+        .order_by(func.coalesce(TeamScore.total_score, 0).desc(), Team.id)
+        .offset(offset)
     )
-    teams = await session.execute(teams_query)
-    teams = teams.scalars().all()
-
-    judges_query = (
-        select(User)
-        .join(User2Roles)
+    if team_id:
+        teams_page = teams_page.where(Team.id.in_(team_id))
+    if limit is not None:
+        teams_page = teams_page.limit(limit)
+    teams_page = teams_page.cte('teams_page')
+
+    judges = (
+        select(User.id, User.full_name, User.email)
+        .join(User2Roles, User2Roles.user_id == User.id)
         .where(User2Roles.role_id == user_router_state.judge_role_id)
+        .distinct()
+        .cte('judges')
     )
-    judges = await session.execute(judges_query)
-    judges = judges.scalars().all()
 
-    evaluations_query = (
-        select(TeamEvaluation)
-        .options(
-            selectinload(TeamEvaluation.judge),
-            selectinload(TeamEvaluation.team)
+    evaluations = TeamEvaluation.__table__
+
+    query = (
+        select(
+            teams_page.c.id.label('team_id'),
+            teams_page.c.team_name,
+            teams_page.c.team_motto,
+            teams_page.c.solution_link,
+            judges.c.id.label('judge_id'),
+            judges.c.full_name.label('judge_name'),
+            judges.c.email.label('judge_email'),
+            evaluations.c.criterion_1,
+            evaluations.c.criterion_2,
+            evaluations.c.criterion_3,
+            evaluations.c.criterion_4,
+            evaluations.c.criterion_5,
+            evaluations.c.created_at,
+            evaluations.c.updated_at
+        )
+        .select_from(
+            teams_page
+            .outerjoin(judges, true())
+            .outerjoin(
+                evaluations,
+                and_(evaluations.c.team_id == teams_page.c.id, evaluations.c.judge_id == judges.c.id)
+            )
         )
+        .order_by(teams_page.c.rank_score.desc(), teams_page.c.id, judges.c.full_name)
     )
-    evaluations = await session.execute(evaluations_query)
-    evaluations = evaluations.scalars().all()
-
-    evaluation_map = {}
-    for eval in evaluations:
-        key = (str(eval.team_id), str(eval.judge_id))
-        if key not in evaluation_map or eval.created_at > evaluation_map[key].created_at:
-            evaluation_map[key] = eval
-
-    detailed_evaluations = []
-    for team in teams:
-        if team.can_participate():
-            team_evaluations = []
-            team_total_score = 0
-            evaluations_count = 0
-
-            for judge in judges:
-                key = (str(team.id), str(judge.id))
-                evaluation = evaluation_map.get(key)
-
-                if evaluation:
-                    evaluations_count += 1
-                    score = evaluation.get_total_score()
-                    team_total_score += score
-                    team_evaluations.append({
-                        "judge_id": judge.id,
-                        "judge_name": judge.full_name,
-                        "judge_email": judge.email,
-                        "criterion_1": evaluation.criterion_1,
-                        "criterion_2": evaluation.criterion_2,
-                        "criterion_3": evaluation.criterion_3,
-                        "criterion_4": evaluation.criterion_4,
-                        "criterion_5": evaluation.criterion_5,
-                        "total_score": score,
-                        "created_at": evaluation.created_at,
-                        "updated_at": evaluation.updated_at
-                    })
-                else:
-                    team_evaluations.append({
-                        "judge_id": judge.id,
-                        "judge_name": judge.full_name,
-                        "judge_email": judge.email,
-                        "criterion_1": 0,
-                        "criterion_2": 0,
-                        "criterion_3": 0,
-                        "criterion_4": 0,
-                        "criterion_5": 0,
-                        "total_score": 0,
-                        "created_at": None,
-                        "updated_at": None
-                    })
-
-            detailed_evaluations.append({
-                "team_id": team.id,
-                "team_name": team.team_name,
-                "team_motto": team.team_motto,
-                "solution_link": team.solution_link,
-                "evaluations_count": evaluations_count,
-                "total_score": team_total_score,
-                "evaluations": team_evaluations
-            })
-
-    detailed_evaluations.sort(key=lambda x: x["total_score"], reverse=True)
-
-    return detailed_evaluations
+    result = await session.execute(query)
+
+    detailed_evaluations = {}
+    for row in result:
+        team = detailed_evaluations.get(row.team_id)
+        if team is None:
+            team = detailed_evaluations[row.team_id] = {
+                "team_id": row.team_id,
+                "team_name": row.team_name,
+                "team_motto": row.team_motto,
+                "solution_link": row.solution_link,
+                "evaluations_count": 0,
+                "total_score": 0.0,
+                "evaluations": []
+            }
+
+        if row.judge_id is None:
+            continue
+
+        evaluated = row.created_at is not None
+        criteria = [row.criterion_1, row.criterion_2, row.criterion_3, row.criterion_4, row.criterion_5]
+        score = sum(criteria) if evaluated else 0
+        if evaluated:
+            team["evaluations_count"] += 1
+            team["total_score"] += score
+
+        team["evaluations"].append({
+            "judge_id": row.judge_id,
+            "judge_name": row.judge_name,
+            "judge_email": row.judge_email,
+            "criterion_1": row.criterion_1 or 0,
+            "criterion_2": row.criterion_2 or 0,
+            "criterion_3": row.criterion_3 or 0,
+            "criterion_4": row.criterion_4 or 0,
+            "criterion_5": row.criterion_5 or 0,
+            "total_score": score,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at
+        })
+
+    return FastJSONResponse(list(detailed_evaluations.values()))
 
 @router.get("/public-results", response_model=List[TeamTotalScore])
 async def get_public_evaluation_results(
+        request: Request,
         session: AsyncSession = Depends(get_session)
 ):
-    """Публичное получение итоговых результатов всех команд без авторизации"""
-    latest_evaluations = (
-        select(TeamEvaluation.id)
-        .distinct(TeamEvaluation.judge_id, TeamEvaluation.team_id)
-        .order_by(
-            TeamEvaluation.judge_id,
-            TeamEvaluation.team_id,
-            TeamEvaluation.created_at.desc()
-        )
-    ).scalar_subquery()
-
-    query = select(
-        Team.id.label('team_id'),
-        Team.team_name.label('team_name'),
-        Team.team_motto.label('team_motto'),
-        func.avg(
-            TeamEvaluation.criterion_1 +
-            TeamEvaluation.criterion_2 +
-            TeamEvaluation.criterion_3 +
-            TeamEvaluation.criterion_4 +
-            TeamEvaluation.criterion_5
-        ).label('average_score'),
-        func.count(TeamEvaluation.judge_id.distinct()).label('evaluations_count'),
-        func.sum(
-            TeamEvaluation.criterion_1 +
-            TeamEvaluation.criterion_2 +
-            TeamEvaluation.criterion_3 +
-            TeamEvaluation.criterion_4 +
-            TeamEvaluation.criterion_5
-        ).label('total_score')
-    ).join(
-        TeamEvaluation,
-        Team.id == TeamEvaluation.team_id
-    ).where(
-        TeamEvaluation.id.in_(latest_evaluations)
-    ).group_by(
-        Team.id,
-        Team.team_name
-    )
-
-    result = await session.execute(query)
-    return result.all()
+    """
+    Публичное получение итоговых результатов всех команд без авторизации.
+    С этапа публикации результатов отдается замороженный снимок.
+    """
+    return await public_results_response(request, session)
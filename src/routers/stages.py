@@ -1,30 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
+from uuid import UUID
 from src.db import get_session
 from src.models.stage import Stage, StageType
-from src.schemas.stage import StageResponse, StageActivationResponse
+from src.schemas.stage import StageResponse, StageActivationResponse, StageScheduleResponse, StageScheduleUpdate
 from src.auth.jwt import get_current_user
-from src.models.user import User, User2Roles
-from src.models.role import Role
+from src.auth.permissions import AuthContext, require_roles
+from src.auth.principal import AuthPrincipal
+from src.models.enums import UserRole
 from sqlalchemy import select, update
+from src.utils.results_snapshot import freeze_results_if_published
 from src.utils.router_states import stage_router_state
+from src.utils.scheduler_leader import notify_scheduler_changed
+from src.utils.stage_events import notify_stage_changed
+from src.utils.stage_scheduler import plan_stage_transitions, get_stage_next_run_times
 
 router = APIRouter(
     prefix="/stages",
     tags=["stages"]
 )
 
-async def check_admin_role(user: User, db: AsyncSession) -> bool:
-    """Проверка наличия роли администратора у пользователя"""
-    query = select(Role).join(User2Roles).where(User2Roles.user_id == user.id)
-    result = await db.execute(query)
-    user_roles = result.scalars().all()
-    return any(role.name == "admin" for role in user_roles)
 
 @router.get("/all", response_model=List[StageResponse])
 async def get_stages(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить список всех этапов"""
@@ -39,6 +39,7 @@ async def get_stages(
             type=stage.type,
             order=stage.order,
             is_active=stage.is_active,
+            starts_at=stage.starts_at,
             created_at=stage.created_at,
             updated_at=stage.updated_at
         )
@@ -46,6 +47,72 @@ async def get_stages(
     ]
 
 
+async def build_stage_schedule(session: AsyncSession) -> List[StageScheduleResponse]:
+    result = await session.execute(select(Stage).order_by(Stage.order))
+    stages = result.scalars().all()
+    next_run_times = await get_stage_next_run_times()
+
+    return [
+        StageScheduleResponse(
+            id=stage.id,
+            name=stage.name,
+            type=stage.type,
+            order=stage.order,
+            is_active=stage.is_active,
+            starts_at=stage.starts_at,
+            next_run_time=next_run_times.get(stage.type)
+        )
+        for stage in stages
+    ]
+
+
+@router.get("/schedule", response_model=List[StageScheduleResponse])
+async def get_stage_schedule(
+        current_user: AuthPrincipal = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session)
+):
+    """Расписание этапов и время запланированных автоматических переходов"""
+    return await build_stage_schedule(session)
+
+
+@router.put("/{stage_id}/schedule", response_model=List[StageScheduleResponse])
+async def update_stage_schedule(
+        stage_id: UUID,
+        schedule: StageScheduleUpdate,
+        session: AsyncSession = Depends(get_session),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN,
+            detail="Only admin can change stage schedule"
+        ))
+):
+    """
+    Задать время автоматического перехода на этап (admin only).
+    starts_at = null отменяет автоматический переход.
+    """
+    stage = await session.get(Stage, stage_id)
+    if not stage:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stage not found"
+        )
+
+    if schedule.starts_at is not None and schedule.starts_at.tzinfo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="starts_at must include a timezone"
+        )
+
+    stage.starts_at = schedule.starts_at
+    await session.commit()
+
+    await plan_stage_transitions(session)
+    # Задачи мог изменить не лидер - будим планировщик лидера
+    await notify_scheduler_changed(session)
+    await session.commit()
+
+    return await build_stage_schedule(session)
+
+
 @router.get("/current", response_model=StageResponse)
 async def get_current_stage(db: AsyncSession = Depends(get_session)):
     """Get current active stage"""
@@ -65,15 +132,12 @@ async def get_current_stage(db: AsyncSession = Depends(get_session)):
 @router.get("/available-transitions", response_model=Dict[str, List[StageResponse]])
 async def get_available_transitions(
         db: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN,
+            detail="Only admin can view available transitions"
+        ))
 ):
     """Get available stage transitions for the current stage"""
-    if not await check_admin_role(current_user, db):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admin can view available transitions"
-        )
-
     current_result = await db.execute(
         select(Stage).where(Stage.is_active == True)
     )
@@ -105,7 +169,10 @@ async def get_available_transitions(
 async def activate_stage(
         stage_id: str,
         db: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN,
+            detail="Only admin can change stages"
+        ))
 ):
     """
     Activate specific stage (admin only)
@@ -113,12 +180,6 @@ async def activate_stage(
     The stage can only be changed to the next or previous stage in sequence,
     except for 'registration_closed' which is set automatically
     """
-    if not await check_admin_role(current_user, db):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admin can change stages"
-        )
-
     new_stage_result = await db.execute(
         select(Stage).where(Stage.id == stage_id)
     )
@@ -157,10 +218,17 @@ async def activate_stage(
     )
 
     new_stage.is_active = True
+    await freeze_results_if_published(db, new_stage.type)
+    await notify_stage_changed(db)
     await db.commit()
     await db.refresh(new_stage)
 
-    await stage_router_state.initialize(db)
+    await stage_router_state.refresh(db)
+
+    # Переходы на пройденные этапы больше не нужны
+    await plan_stage_transitions(db)
+    await notify_scheduler_changed(db)
+    await db.commit()
 
     return {
         "message": f"Stage '{new_stage.name}' activated successfully",
@@ -1,46 +1,48 @@
 import uuid
 
 from fastapi import Header
-from fastapi.responses import StreamingResponse, Response
-import hashlib
-import aiofiles
-import asyncio
-from datetime import datetime
-
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, Form, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, exists, func, and_
 from typing import List, Optional
 import json
 from uuid import UUID
-import os
 
 from sqlalchemy.orm import joinedload, selectinload
 
 from src.db import get_session
 from src.models import User, Team, TeamMember, Role, UserStatusHistory, Stage
 from src.models.file import File as DBFile
-from src.models.enums import TeamMemberStatus, TeamRole, FileType, FileOwnerType, StageType
+from src.models.enums import TeamMemberStatus, TeamRole, FileType, FileOwnerType, StageType, UserRole
 from src.models.user import User2Roles
 from src.schemas.team import TeamCreate, TeamResponse, TeamMemberResponse, TeamMemberCreate, TeamInvitationResponse, \
     TeamMembersResponse, TeamMemberDetailResponse, TeamStatusDetails, PaginatedTeamsResponse
+from src.schemas.solution_upload import SolutionUploadCreate, SolutionUploadResponse
 from src.auth.jwt import get_current_user
+from src.auth.principal import AuthPrincipal
+from src.auth.permissions import AuthContext, get_auth_context, require_roles
 
 from src.settings import settings
 from fastapi import BackgroundTasks
-from src.utils.background_tasks import send_team_invitation_email, \
-    send_hackathon_consultation_notification, send_team_confirmation_email, send_judge_briefing_notification, \
-    send_single_judge_briefing_notification, send_task_update_notification, send_hackathon_opening_notification, \
-    send_judge_opening_notification, send_defense_schedule_notification, send_closing_ceremony_notification
+from src.campaigns import CampaignName, launch_campaign, send_campaign_to_user
+from src.utils.background_tasks import send_team_invitation_email
 from src.utils.email_utils import email_sender
-from src.utils.file_utils import save_file
+from src.utils.blob_store import blob_store
+from src.utils.file_serving import serve_stored_file, guess_media_type
+from src.utils.file_utils import DEPLOYMENT_FILE, save_file
+from src.utils.multipart_stream import parse_multipart_stream, multipart_openapi
+from src.utils.pagination import Keyset, count_cache
+from src.utils.responses import FastJSONResponse
 from src.utils.router_states import team_router_state, user_router_state, stage_router_state
+from src.utils.search import search_condition
 from src.utils.stage_checker import check_stage
 from src.utils.router_states import team_router_state, user_router_state, file_router_state
+from src.utils.team_utils import refresh_team_status, check_and_update_registration_stage
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
+TEAMS_BY_NAME = Keyset(Team.team_name, Team.id)
+
 
 def get_role_id(role: TeamRole) -> UUID:
     if role == TeamRole.TEAMLEAD:
@@ -65,7 +67,7 @@ async def create_team(
         member_ids: str = Form(default="[]"),
         logo: UploadFile = UploadFile(...),
         background_tasks: BackgroundTasks = BackgroundTasks(),
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     await check_stage(session, StageType.REGISTRATION)
@@ -141,6 +143,8 @@ async def create_team(
         status_id=team_router_state.accepted_status_id
     )
     session.add(team_leader_member)
+    await session.flush()
+    await refresh_team_status(session, team.id)
 
     if member_ids_list:
         team_members = []
@@ -212,7 +216,7 @@ async def invite_team_mentor(
         team_id: uuid.UUID,
         mentor_id: UUID,
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Пригласить ментора в команду"""
@@ -331,7 +335,7 @@ async def invite_team_member(
         team_id: uuid.UUID,
         member_data: TeamMemberCreate,
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Пригласить пользователя в команду"""
@@ -425,7 +429,7 @@ async def invite_team_member(
 
 @router.get("/invitations", response_model=List[TeamInvitationResponse])
 async def get_pending_invitations(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить список pending приглашений в команды"""
@@ -469,7 +473,7 @@ async def get_pending_invitations(
 @router.post("/invitations/{invitation_id}/accept")
 async def accept_invitation(
         invitation_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         background_tasks: BackgroundTasks = BackgroundTasks(),
         session: AsyncSession = Depends(get_session)
 ):
@@ -545,56 +549,21 @@ async def accept_invitation(
 
     invitation.status_id = team_router_state.accepted_status_id
     await session.flush()
-    await session.refresh(invitation)
-
-    teams_query = (
-        select(Team)
-        .options(
-            selectinload(Team.members.and_(
-                TeamMember.status_id == team_router_state.accepted_status_id
-            ))
-            .selectinload(TeamMember.user)
-            .selectinload(User.current_status),
-            selectinload(Team.members)
-            .selectinload(TeamMember.role),
-            selectinload(Team.members)
-            .selectinload(TeamMember.status)
-        )
-    )
-    result = await session.execute(teams_query)
-    teams = result.scalars().all()
-
-    active_teams = [team for team in teams if team.get_status() == "active"]
-    active_teams_count = len(active_teams)
 
-    if active_teams_count >= 20:
-        current_stage_query = select(Stage).where(Stage.is_active == True)
-        current_stage = await session.execute(current_stage_query)
-        current_stage = current_stage.scalar_one_or_none()
-
-        if current_stage and current_stage.type == StageType.REGISTRATION.value:
-            registration_closed_stage_query = (
-                select(Stage)
-                .where(Stage.type == StageType.REGISTRATION_CLOSED.value)
-            )
-            registration_closed_stage = await session.execute(registration_closed_stage_query)
-            registration_closed_stage = registration_closed_stage.scalar_one_or_none()
-
-            if registration_closed_stage:
-                current_stage.is_active = False
-                registration_closed_stage.is_active = True
-                await stage_router_state.initialize(session)
-
-                background_tasks.add_task(send_team_confirmation_email, session)
+    await refresh_team_status(session, invitation.team_id)
 
+    registration_closed = await check_and_update_registration_stage(session, commit=False)
     await session.commit()
+
+    if registration_closed:
+        await launch_campaign(session, background_tasks, CampaignName.TEAM_CONFIRMATION)
     return {"message": "Приглашение принято"}
 
 
 @router.post("/invitations/{invitation_id}/reject")
 async def reject_invitation(
         invitation_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Отклонить приглашение в команду"""
@@ -621,7 +590,7 @@ async def reject_invitation(
 
 @router.get("", response_model=List[TeamResponse])
 async def get_teams(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить список команд пользователя"""
@@ -663,7 +632,7 @@ async def get_teams(
 @router.get("/{team_id}", response_model=TeamResponse)
 async def get_team(
         team_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить информацию о команде по ID"""
@@ -680,17 +649,10 @@ async def get_team(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        team_member=team_id,
+        detail="У вас нет доступа к информации об этой команде"
     )
-    is_member = await session.execute(member_query)
-    if not is_member.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="У вас нет доступа к информации об этой команде"
-        )
 
     return TeamResponse(
         id=team.id,
@@ -705,7 +667,7 @@ async def get_team(
 
 @router.get("/my/team", response_model=TeamResponse)
 async def get_my_team(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить информацию о своей команде"""
@@ -760,28 +722,10 @@ async def get_my_team(
 
 @router.get("/mentor/teams", response_model=List[TeamResponse])
 async def get_mentor_teams(
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(UserRole.MENTOR, detail="Доступ разрешен только для менторов")),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить список всех команд, где пользователь является ментором"""
-    user_roles_query = (
-        select(User2Roles)
-        .where(User2Roles.user_id == current_user.id)
-    )
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_mentor = any(
-        role.role_id == user_router_state.mentor_role_id
-        for role in user_roles
-    )
-
-    if not is_mentor:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для менторов"
-        )
-
     teams_query = (
         select(Team)
         .options(
@@ -797,7 +741,7 @@ async def get_mentor_teams(
             exists(
                 select(1).where(
                     TeamMember.team_id == Team.id,
-                    TeamMember.user_id == current_user.id,
+                    TeamMember.user_id == auth.user_id,
                     TeamMember.role_id == team_router_state.mentor_role_id,
                     TeamMember.status_id == team_router_state.accepted_status_id
                 )
@@ -824,38 +768,20 @@ async def get_mentor_teams(
 @router.get("/admin/teams", response_model=PaginatedTeamsResponse)
 async def get_admin_teams(
         limit: int = Query(default=10, le=50, description="Number of results to return"),
-        offset: int = Query(default=0, description="Number of results to skip"),
+        offset: int = Query(default=0, description="Number of results to skip (ignored with cursor)"),
+        cursor: Optional[str] = Query(None, description="Cursor of the next page from the previous response"),
+        include_total: bool = Query(True, description="Return total count (cached for a short time)"),
         search: Optional[str] = Query(None, min_length=2, description="Optional search query for team name"),
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Получение списка всех команд с пагинацией и поиском.
     Доступно только для администраторов и организаторов.
     """
-    current_user_query = (
-        select(User)
-        .options(selectinload(User.user2roles))
-        .where(User.id == current_user.id)
-    )
-    result = await session.execute(current_user_query)
-    current_user_with_roles = result.scalar_one()
-
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in current_user_with_roles.user2roles
-    )
-    is_organizer = any(
-        role.role_id == user_router_state.organizer_role_id
-        for role in current_user_with_roles.user2roles
-    )
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
     query = (
         select(Team)
         .options(
@@ -870,23 +796,21 @@ async def get_admin_teams(
     )
 
     if search:
-        search_query = f"%{search}%"
-        query = query.where(Team.team_name.ilike(search_query))
+        query = query.where(search_condition([Team.team_name], search))
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await session.scalar(count_query)
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await count_cache.get(("admin_teams", search), lambda: session.scalar(count_query))
 
-    query = (
-        query
-        .order_by(Team.team_name)
-        .limit(limit)
-        .offset(offset)
-    )
+    query = TEAMS_BY_NAME.apply(query, cursor, limit)
+    if not cursor:
+        query = query.offset(offset)
 
     result = await session.execute(query)
-    teams = result.scalars().all()
+    teams, next_cursor = TEAMS_BY_NAME.page(result.scalars().all(), limit)
 
-    return {
+    return FastJSONResponse({
         "teams": [
             TeamResponse(
                 id=team.id,
@@ -899,71 +823,30 @@ async def get_admin_teams(
             )
             for team in teams
         ],
-        "total": total
-    }
+        "total": total,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/mentor/teams/{team_id}", response_model=TeamResponse)
 async def get_mentor_team(
         team_id: UUID,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить информацию о конкретной команде ментора"""
-    user_roles_query = (
-        select(User2Roles)
-        .where(User2Roles.user_id == current_user.id)
-    )
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_mentor = any(
-        role.role_id == user_router_state.mentor_role_id
-        for role in user_roles
-    )
-
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in user_roles
-    )
-
-    is_judge = any(
-        role.role_id == user_router_state.judge_role_id
-        for role in user_roles
-    )
-
-    is_organizer = any(
-        role.role_id == user_router_state.organizer_role_id
-        for role in user_roles
-    )
-
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
-    )
-    is_team_member = await session.execute(member_query)
-    is_team_member = is_team_member.scalar_one_or_none()
-
-    if not (is_mentor or is_admin or is_team_member or is_judge or is_organizer):
+    if not (auth.is_mentor or auth.is_admin or auth.is_judge or auth.is_organizer
+            or await auth.is_team_member(team_id)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Доступ разрешен только для менторов"
         )
 
-    if not (is_admin or is_team_member or is_judge or is_organizer):
-        mentor_check_query = select(TeamMember).where(
-            TeamMember.team_id == team_id,
-            TeamMember.user_id == current_user.id,
-            TeamMember.role_id == team_router_state.mentor_role_id,
-            TeamMember.status_id == team_router_state.accepted_status_id
-        )
-        mentor_check = await session.execute(mentor_check_query)
-        if not mentor_check.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="У вас нет доступа к информации об этой команде"
-            )
+    await auth.require(
+        any_of=[UserRole.ADMIN, UserRole.JUDGE, UserRole.ORGANIZER],
+        team_member=team_id,
+        detail="У вас нет доступа к информации об этой команде"
+    )
 
     team_query = (
         select(Team)
@@ -1002,6 +885,7 @@ async def get_mentor_team(
 @router.get("/{team_id}/logo")
 async def get_team_logo(
         team_id: uuid.UUID,
+        request: Request,
         session: AsyncSession = Depends(get_session)
 ):
     """Получить логотип команды"""
@@ -1025,16 +909,19 @@ async def get_team_logo(
     logo_file = await session.execute(logo_query)
     logo_file = logo_file.scalar_one_or_none()
 
-    if not logo_file or not os.path.exists(logo_file.file_path):
+    if not logo_file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Файл логотипа не найден"
         )
 
-    return FileResponse(
-        logo_file.file_path,
-        filename=logo_file.filename,
-        media_type=f"image/{str(logo_file.file_format).lower()}"
+    # Логотип публичный - его можно кэшировать и на промежуточных прокси
+    return await serve_stored_file(
+        request,
+        logo_file,
+        media_type=guess_media_type(logo_file.filename, "image/png"),
+        cache_control="public, max-age=3600",
+        not_found_detail="Файл логотипа не найден"
     )
 
 
@@ -1042,7 +929,7 @@ async def get_team_logo(
 async def remove_team_member(
         team_id: uuid.UUID,
         member_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Удалить участника из команды"""
@@ -1085,6 +972,8 @@ async def remove_team_member(
         )
 
     await session.delete(team_member)
+    await session.flush()
+    await refresh_team_status(session, team_id)
     await session.commit()
 
     return {"message": "Участник успешно удален из команды"}
@@ -1094,7 +983,7 @@ async def remove_team_member(
 async def update_team_logo(
         team_id: uuid.UUID,
         logo: UploadFile = UploadFile(...),
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Обновить логотип команды"""
@@ -1135,8 +1024,7 @@ async def update_team_logo(
         old_logo = await session.execute(old_logo_query)
         old_logo = old_logo.scalar_one_or_none()
         if old_logo:
-            if os.path.exists(old_logo.file_path):
-                os.remove(old_logo.file_path)
+            await blob_store.remove_legacy_file(old_logo)
             await session.delete(old_logo)
 
     await session.commit()
@@ -1149,7 +1037,7 @@ async def update_team_info(
         team_id: uuid.UUID,
         team_name: str = Form(...),
         team_motto: str = Form(...),
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Обновить название и девиз команды"""
@@ -1182,7 +1070,7 @@ async def update_team_info(
 @router.get("/{team_id}/members", response_model=TeamMembersResponse)
 async def get_team_members(
         team_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить список всех участников команды"""
@@ -1199,36 +1087,11 @@ async def get_team_members(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        any_of=[UserRole.ADMIN, UserRole.ORGANIZER],
+        team_member=team_id,
+        detail="У вас нет доступа к информации об участниках этой команды"
     )
-    is_member = await session.execute(member_query)
-    is_member = is_member.scalar_one_or_none()
-
-    user_roles_query = (
-        select(User2Roles)
-        .where(User2Roles.user_id == current_user.id)
-    )
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in user_roles
-    )
-
-    is_organizer = any(
-        role.role_id == user_router_state.organizer_role_id
-        for role in user_roles
-    )
-
-    if not (is_member or is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="У вас нет доступа к информации об участниках этой команды"
-        )
 
     members_query = (
         select(TeamMember)
@@ -1272,7 +1135,7 @@ async def get_team_members(
 @router.delete("/{team_id}")
 async def delete_team(
         team_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Удалить команду (только для лидера команды)"""
@@ -1314,8 +1177,7 @@ async def delete_team(
         logo_file = await session.execute(logo_query)
         logo_file = logo_file.scalar_one_or_none()
         if logo_file:
-            if os.path.exists(logo_file.file_path):
-                os.remove(logo_file.file_path)
+            await blob_store.remove_legacy_file(logo_file)
             await session.delete(logo_file)
 
     await session.commit()
@@ -1325,7 +1187,7 @@ async def delete_team(
 
 @router.post("/leave")
 async def leave_team(
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """Выйти из команды (недоступно для лидера команды)"""
@@ -1351,22 +1213,32 @@ async def leave_team(
         )
 
     await session.delete(member)
+    await session.flush()
+    await refresh_team_status(session, member.team_id)
     await session.commit()
 
     return {"message": "Вы успешно вышли из команды"}
 
 
-from src.utils.solution_utils import save_team_solution
+from src.utils.solution_utils import save_team_solution, remove_team_solution, SOLUTION_FILE, SOLUTION_MAX_FILE_SIZE
+from src.utils.resumable_upload import (
+    create_solution_upload, get_solution_upload, claim_solution_upload, write_solution_chunk,
+    complete_solution_upload, solution_upload_response
+)
 
 
-@router.post("/{team_id}/solution")
+@router.post("/{team_id}/solution", openapi_extra=multipart_openapi([], ["solution_file"]))
 async def upload_team_solution(
         team_id: uuid.UUID,
-        solution_file: UploadFile = File(...),
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
-    """Загрузка ZIP файла с решением команды"""
+    """
+    Загрузка ZIP файла с решением команды.
+    Тело запроса читается потоком только после проверки прав: файл пишется во временный каталог
+    settings.upload_staging_dir, после чего переносится в хранилище блобов.
+    """
     await check_stage(session, [StageType.TASK_DISTRIBUTION, StageType.SOLUTION_SUBMISSION])
 
     team_query = select(Team).where(Team.id == team_id)
@@ -1379,55 +1251,133 @@ async def upload_team_solution(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        team_member=team_id,
+        detail="Вы не являетесь участником этой команды"
     )
-    member = await session.execute(member_query)
-    member = member.scalar_one_or_none()
 
-    if not member:
+    form = await parse_multipart_stream(
+        request,
+        settings.upload_staging_dir,
+        {"solution_file": SOLUTION_FILE},
+        prefix="solution_"
+    )
+    try:
+        solution_file = form.file("solution_file")
+
+        solution_file_model = await save_team_solution(
+            upload_file=solution_file,
+            team_id=team_id,
+            session=session,
+            max_file_size=SOLUTION_MAX_FILE_SIZE
+        )
+        await remove_team_solution(session, team_id)
+
+        session.add(solution_file_model)
+        await session.commit()
+        await session.refresh(solution_file_model)
+    finally:
+        await form.discard()
+
+    return solution_file_model
+
+
+async def check_solution_upload_access(team_id: uuid.UUID, auth: AuthContext, session: AsyncSession) -> None:
+    """Проверки перед любой операцией докачиваемой загрузки решения"""
+    await check_stage(session, [StageType.TASK_DISTRIBUTION, StageType.SOLUTION_SUBMISSION])
+
+    team = await session.scalar(select(Team.id).where(Team.id == team_id))
+    if not team:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Вы не являетесь участником этой команды"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Команда не найдена"
         )
 
-    existing_solution_query = select(DBFile).where(
-        DBFile.team_id == team_id,
-        DBFile.file_type_id == file_router_state.solution_type_id
+    await auth.require(
+        team_member=team_id,
+        detail="Вы не являетесь участником этой команды"
     )
-    existing_solution = await session.execute(existing_solution_query)
-    existing_solution = existing_solution.scalar_one_or_none()
 
-    if existing_solution:
-        if os.path.exists(existing_solution.file_path):
-            os.remove(existing_solution.file_path)
-        await session.delete(existing_solution)
-        await session.flush()
 
-    solution_file_model = await save_team_solution(
-        upload_file=solution_file,
-        team_id=team_id,
-        session=session,
-        max_file_size=500 * 1024 * 1024  # 500MB
-    )
+@router.post("/{team_id}/solution/uploads", response_model=SolutionUploadResponse,
+             status_code=status.HTTP_201_CREATED)
+async def create_team_solution_upload(
+        team_id: uuid.UUID,
+        upload_data: SolutionUploadCreate,
+        auth: AuthContext = Depends(get_auth_context),
+        session: AsyncSession = Depends(get_session)
+):
+    """
+    Начало докачиваемой загрузки решения.
+    Дальше части отправляются через PUT /uploads/{upload_id}?offset=..., загрузка завершается через /complete.
+    """
+    await check_solution_upload_access(team_id, auth, session)
+    upload = await create_solution_upload(session, team_id, auth.user_id, upload_data)
+    return solution_upload_response(upload)
 
-    session.add(solution_file_model)
-    await session.commit()
-    await session.refresh(solution_file_model)
 
-    return solution_file_model
+@router.get("/{team_id}/solution/uploads/{upload_id}", response_model=SolutionUploadResponse)
+async def get_team_solution_upload(
+        team_id: uuid.UUID,
+        upload_id: uuid.UUID,
+        auth: AuthContext = Depends(get_auth_context),
+        session: AsyncSession = Depends(get_session)
+):
+    """Текущий offset загрузки - с него нужно продолжать после обрыва соединения"""
+    await check_solution_upload_access(team_id, auth, session)
+    upload = await get_solution_upload(session, team_id, upload_id)
+    return solution_upload_response(upload)
+
+
+@router.put("/{team_id}/solution/uploads/{upload_id}", response_model=SolutionUploadResponse,
+            openapi_extra={"requestBody": {"required": True, "content": {
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}}
+            }}})
+async def upload_team_solution_chunk(
+        team_id: uuid.UUID,
+        upload_id: uuid.UUID,
+        request: Request,
+        offset: int = Query(..., ge=0, description="Position of the chunk in the file, must match the upload offset"),
+        chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", pattern="^[0-9a-fA-F]{64}$",
+                                   description="SHA-256 of the chunk body"),
+        auth: AuthContext = Depends(get_auth_context),
+        session: AsyncSession = Depends(get_session)
+):
+    """
+    Прием части архива (тело запроса - байты части).
+    При несовпадении offset возвращается 409 с текущим offset в заголовке Upload-Offset.
+    """
+    await check_solution_upload_access(team_id, auth, session)
+    upload = await claim_solution_upload(session, team_id, upload_id)
+    await write_solution_chunk(session, upload, request, offset, chunk_sha256)
+    return solution_upload_response(upload)
+
+
+@router.post("/{team_id}/solution/uploads/{upload_id}/complete")
+async def complete_team_solution_upload(
+        team_id: uuid.UUID,
+        upload_id: uuid.UUID,
+        auth: AuthContext = Depends(get_auth_context),
+        session: AsyncSession = Depends(get_session)
+):
+    """Завершение загрузки: собранный архив становится решением команды"""
+    await check_solution_upload_access(team_id, auth, session)
+    upload = await claim_solution_upload(session, team_id, upload_id)
+    return await complete_solution_upload(session, upload)
 
 
-@router.post("/{team_id}/deployment")
+@router.post("/{team_id}/deployment", openapi_extra=multipart_openapi([], ["deployment_file"]))
 async def upload_team_deployment(
         team_id: uuid.UUID,
-        deployment_file: UploadFile = File(...),
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
-    """Загрузка файла с описанием развертывания (TXT или MD)"""
+    """
+    Загрузка файла с описанием развертывания (TXT или MD).
+    Тело запроса читается потоком только после проверки прав: файл пишется во временный каталог
+    settings.upload_staging_dir, после чего переносится в хранилище блобов.
+    """
     await check_stage(session, [StageType.TASK_DISTRIBUTION, StageType.SOLUTION_SUBMISSION])
 
     team_query = select(Team).where(Team.id == team_id)
@@ -1440,50 +1390,39 @@ async def upload_team_deployment(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        team_member=team_id,
+        detail="Вы не являетесь участником этой команды"
     )
-    member = await session.execute(member_query)
-    member = member.scalar_one_or_none()
 
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Вы не являетесь участником этой команды"
-        )
+    form = await parse_multipart_stream(request, settings.upload_staging_dir, {"deployment_file": DEPLOYMENT_FILE})
+    try:
+        deployment_file = form.file("deployment_file")
 
-    file_ext = os.path.splitext(deployment_file.filename.lower())[1]
-    if file_ext not in ['.txt', '.md']:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Файл описания должен быть в формате TXT или MD"
+        deployment_file_model = await save_file(
+            upload_file=deployment_file,
+            owner_id=team_id,
+            file_type=FileType.DEPLOYMENT,
+            owner_type=FileOwnerType.TEAM
         )
 
-    existing_deployment_query = select(DBFile).where(
-        DBFile.team_id == team_id,
-        DBFile.file_type_id == file_router_state.deployment_type_id
-    )
-    existing_deployment = await session.execute(existing_deployment_query)
-    existing_deployment = existing_deployment.scalar_one_or_none()
-
-    if existing_deployment:
-        if os.path.exists(existing_deployment.file_path):
-            os.remove(existing_deployment.file_path)
-        await session.delete(existing_deployment)
-        await session.flush()
+        existing_deployment_query = select(DBFile).where(
+            DBFile.team_id == team_id,
+            DBFile.file_type_id == file_router_state.deployment_type_id
+        )
+        existing_deployment = await session.execute(existing_deployment_query)
+        existing_deployment = existing_deployment.scalar_one_or_none()
 
-    deployment_file_model = await save_file(
-        upload_file=deployment_file,
-        owner_id=team_id,
-        file_type=FileType.DEPLOYMENT,
-        owner_type=FileOwnerType.TEAM
-    )
+        if existing_deployment:
+            await blob_store.remove_legacy_file(existing_deployment)
+            await session.delete(existing_deployment)
+            await session.flush()
 
-    session.add(deployment_file_model)
-    await session.commit()
-    await session.refresh(deployment_file_model)
+        session.add(deployment_file_model)
+        await session.commit()
+        await session.refresh(deployment_file_model)
+    finally:
+        await form.discard()
 
     return deployment_file_model
 
@@ -1491,10 +1430,8 @@ async def upload_team_deployment(
 @router.get("/{team_id}/solution")
 async def get_team_solution(
         team_id: uuid.UUID,
-        range: Optional[str] = Header(None),
-        if_none_match: Optional[str] = Header(None),
-        if_modified_since: Optional[str] = Header(None),
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить файл решения команды"""
@@ -1508,27 +1445,11 @@ async def get_team_solution(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        any_of=[UserRole.ADMIN, UserRole.ORGANIZER, UserRole.JUDGE],
+        team_member=team_id,
+        detail="У вас нет доступа к файлам этой команды"
     )
-    is_member = await session.execute(member_query)
-    is_member = is_member.scalar_one_or_none()
-
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-    is_judge = any(role.role_id == user_router_state.judge_role_id for role in user_roles)
-
-    if not (is_member or is_admin or is_organizer or is_judge):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="У вас нет доступа к файлам этой команды"
-        )
 
     solution_query = select(DBFile).where(
         DBFile.team_id == team_id,
@@ -1537,89 +1458,25 @@ async def get_team_solution(
     solution = await session.execute(solution_query)
     solution = solution.scalar_one_or_none()
 
-    if not solution or not os.path.exists(solution.file_path):
+    if not solution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Файл решения не найден"
         )
 
-    file_size = os.path.getsize(solution.file_path)
-    mtime = os.path.getmtime(solution.file_path)
-    mtime_dt = datetime.fromtimestamp(mtime)
-
-    etag = hashlib.md5(f"{mtime}{file_size}".encode()).hexdigest()
-
-    if if_none_match and if_none_match == etag:
-        return Response(status_code=304)
-
-    if if_modified_since:
-        try:
-            ims_dt = datetime.strptime(if_modified_since, "%a, %d %b %Y %H:%M:%S GMT")
-            if mtime_dt <= ims_dt:
-                return Response(status_code=304)
-        except ValueError:
-            pass
-
-    start = 0
-    end = file_size - 1
-    status_code = 200
-
-    if range is not None:
-        try:
-            start_str = range.replace('bytes=', '').split('-')[0]
-            start = int(start_str)
-            if start < 0 or start >= file_size:
-                raise HTTPException(
-                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
-                    detail="Requested range not satisfiable"
-                )
-            status_code = 206
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid range header"
-            )
-
-    headers = {
-        'Content-Disposition': f'attachment; filename="{solution.filename}"',
-        'Content-Type': 'application/zip',
-        'Accept-Ranges': 'bytes',
-        'Cache-Control': 'public, max-age=3600',
-        'ETag': etag,
-        'Last-Modified': mtime_dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
-        'Content-Length': str(end - start + 1),
-        'X-Accel-Buffering': 'no'
-    }
-
-    if status_code == 206:
-        headers['Content-Range'] = f'bytes {start}-{end}/{file_size}'
-
-    async def file_iterator():
-        chunk_size = 256 * 1024
-        async with aiofiles.open(solution.file_path, 'rb') as f:
-            await f.seek(start)
-            bytes_remaining = end - start + 1
-            while bytes_remaining > 0:
-                chunk_size = min(chunk_size, bytes_remaining)
-                chunk = await f.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
-                bytes_remaining -= len(chunk)
-                await asyncio.sleep(0)
-
-    return StreamingResponse(
-        file_iterator(),
-        headers=headers,
-        media_type='application/zip',
-        status_code=status_code
+    return await serve_stored_file(
+        request,
+        solution,
+        media_type="application/zip",
+        not_found_detail="Файл решения не найден"
     )
 
 
 @router.get("/{team_id}/deployment")
 async def get_team_deployment(
         team_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Получить файл описания развертывания команды"""
@@ -1633,27 +1490,11 @@ async def get_team_deployment(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        any_of=[UserRole.ADMIN, UserRole.ORGANIZER, UserRole.JUDGE],
+        team_member=team_id,
+        detail="У вас нет доступа к файлам этой команды"
     )
-    is_member = await session.execute(member_query)
-    is_member = is_member.scalar_one_or_none()
-
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-    is_judge = any(role.role_id == user_router_state.judge_role_id for role in user_roles)
-
-    if not (is_member or is_admin or is_organizer or is_judge):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="У вас нет доступа к файлам этой команды"
-        )
 
     deployment_query = select(DBFile).where(
         DBFile.team_id == team_id,
@@ -1662,70 +1503,55 @@ async def get_team_deployment(
     deployment = await session.execute(deployment_query)
     deployment = deployment.scalar_one_or_none()
 
-    if not deployment or not os.path.exists(deployment.file_path):
+    if not deployment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Файл описания развертывания не найден"
         )
 
-    return FileResponse(
-        path=deployment.file_path,
-        filename=deployment.filename,
-        media_type="text/plain" if deployment.filename.endswith('.txt') else "text/markdown"
+    return await serve_stored_file(
+        request,
+        deployment,
+        media_type="text/plain" if deployment.filename.endswith('.txt') else "text/markdown",
+        not_found_detail="Файл описания развертывания не найден"
     )
 
 
 @router.post("/notify/consultation")
 async def notify_hackathon_consultation(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление о консультации хакатона всем участникам и менторам"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_hackathon_consultation_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.HACKATHON_CONSULTATION, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений о консультации хакатона"
+        "message": "Запущена рассылка уведомлений о консультации хакатона",
+        "campaign_id": campaign_run.id
     }
 
 
 @router.post("/notify/judge-briefing")
 async def notify_hackathon_briefing(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление о брифинге хакатона всем членам жюри"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_judge_briefing_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.JUDGE_BRIEFING, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений о консультации хакатона"
+        "message": "Запущена рассылка уведомлений о консультации хакатона",
+        "campaign_id": campaign_run.id
     }
 
 
@@ -1734,24 +1560,14 @@ async def send_judge_briefing(
         user_id: UUID,
         background_tasks: BackgroundTasks,
         session: AsyncSession = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        ))
 ):
     """
     Отправляет уведомление о брифинге конкретному члену жюри
     """
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
     user_query = (
         select(User)
         .join(User2Roles)
@@ -1772,7 +1588,7 @@ async def send_judge_briefing(
             detail="Пользователь не найден или не является членом жюри"
         )
 
-    background_tasks.add_task(send_single_judge_briefing_notification, user)
+    background_tasks.add_task(send_campaign_to_user, CampaignName.JUDGE_BRIEFING, user)
 
     return {"message": f"Уведомление о брифинге поставлено в очередь для отправки пользователю {user.email}"}
 
@@ -1781,7 +1597,7 @@ async def send_judge_briefing(
 async def update_solution_link(
         team_id: UUID,
         solution_link: str = Form(...),
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """Обновить ссылку на решение команды"""
@@ -1797,19 +1613,10 @@ async def update_solution_link(
             detail="Команда не найдена"
         )
 
-    member_query = select(TeamMember).where(
-        TeamMember.team_id == team_id,
-        TeamMember.user_id == current_user.id,
-        TeamMember.status_id == team_router_state.accepted_status_id
+    await auth.require(
+        team_member=team_id,
+        detail="Вы не являетесь участником этой команды"
     )
-    member = await session.execute(member_query)
-    member = member.scalar_one_or_none()
-
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Вы не являетесь участником этой команды"
-        )
 
     team.solution_link = solution_link
     await session.commit()
@@ -1824,134 +1631,94 @@ async def update_solution_link(
 @router.post("/notify/task-update")
 async def notify_task_update(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление о публикации дополнения к исходным данным всем активным командам"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_task_update_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.TASK_UPDATE, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений о публикации дополнения к исходным данным"
+        "message": "Запущена рассылка уведомлений о публикации дополнения к исходным данным",
+        "campaign_id": campaign_run.id
     }
 
 
 @router.post("/notify/opening")
 async def notify_hackathon_opening(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление об открытии хакатона всем активным командам"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_hackathon_opening_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.HACKATHON_OPENING, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений об открытии хакатона"
+        "message": "Запущена рассылка уведомлений об открытии хакатона",
+        "campaign_id": campaign_run.id
     }
 
 
 @router.post("/notify/judge-opening")
 async def notify_judge_opening(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление об очном открытии хакатона всем членам жюри"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_judge_opening_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.JUDGE_OPENING, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений об очном открытии хакатона членам жюри"
+        "message": "Запущена рассылка уведомлений об очном открытии хакатона членам жюри",
+        "campaign_id": campaign_run.id
     }
 
 
 @router.post("/notify/defense-schedule", response_model=dict)
 async def send_defense_schedule_notification_route(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Отправляет уведомления о защите проектов всем активным командам
     """
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_defense_schedule_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.DEFENSE_SCHEDULE, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений о защите проектов всем активным командам"
+        "message": "Запущена рассылка уведомлений о защите проектов всем активным командам",
+        "campaign_id": campaign_run.id
     }
 
 @router.post("/notify/closing-ceremony", response_model=dict)
 async def notify_closing_ceremony(
         background_tasks: BackgroundTasks,
-        current_user: User = Depends(get_current_user),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN, UserRole.ORGANIZER,
+            detail="Доступ разрешен только для администраторов и организаторов"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """Отправить уведомление о торжественном закрытии хакатона всем активным командам"""
-    user_roles_query = select(User2Roles).where(User2Roles.user_id == current_user.id)
-    user_roles = await session.execute(user_roles_query)
-    user_roles = user_roles.scalars().all()
-
-    is_admin = any(role.role_id == user_router_state.admin_role_id for role in user_roles)
-    is_organizer = any(role.role_id == user_router_state.organizer_role_id for role in user_roles)
-
-    if not (is_admin or is_organizer):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Доступ разрешен только для администраторов и организаторов"
-        )
-
-    background_tasks.add_task(send_closing_ceremony_notification, session)
+    campaign_run = await launch_campaign(session, background_tasks, CampaignName.CLOSING_CEREMONY, idempotency_key)
 
     return {
-        "message": "Запущена рассылка уведомлений о торжественном закрытии хакатона"
+        "message": "Запущена рассылка уведомлений о торжественном закрытии хакатона",
+        "campaign_id": campaign_run.id
     }
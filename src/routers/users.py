@@ -1,44 +1,55 @@
-import asyncio
-import os
 import uuid
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query, HTTPException, Form, UploadFile, File, BackgroundTasks
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, and_, not_, exists, func, delete
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from starlette import status
 
-from src.auth.jwt import get_current_user
+from src.auth.jwt import get_current_user, revoke_user_tokens
+from src.auth.permissions import AuthContext, get_auth_context, require_roles
+from src.auth.principal import AuthPrincipal
+from src.campaigns import CampaignName, launch_campaign
 from src.db import get_session
-from src.models import User, TeamMember, File as FileModel, UserStatus, Team, Stage
-from src.models.enums import StageType
+from src.models import User, TeamMember, File as FileModel, UserStatus, Stage
+from src.models.enums import StageType, UserRole
 from src.models.user import User2Roles, UserStatusHistory, UserStatusType
 from src.schemas.file import FileResponse
-from src.schemas.user import UserResponse, PaginatedUserResponse, ChangeUserStatusRequest, UpdateUserRolesRequest, \
+from src.schemas.user import UserResponse, UserCompactResponse, UserView, PaginatedUserResponse, ChangeUserStatusRequest, UpdateUserRolesRequest, \
     UpdateUserDocumentsRequest
-from src.utils.background_tasks import send_status_change_email, send_team_confirmation_email
+from src.utils.background_tasks import send_status_change_email
+from src.utils.blob_store import blob_store
 from src.utils.router_states import team_router_state, user_router_state, file_router_state, stage_router_state
+from src.utils.pagination import Keyset, count_cache
+from src.utils.search import search_condition, search_rank
 from src.utils.stage_checker import check_stage
+from src.utils.team_utils import check_team_status_after_user_update, refresh_user_teams_status
+from src.utils.responses import FastJSONResponse
+from src.utils.user_views import user_load_options, serialize_users
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+USERS_BY_NAME = Keyset(User.full_name, User.id)
+USERS_BY_REGISTRATION = Keyset(User.registered_at, User.id, descending=True)
 
-@router.get("/search", response_model=List[UserResponse])
+
+@router.get("/search", response_model=Union[List[UserResponse], List[UserCompactResponse]])
 async def search_users(
         query: str = Query(..., min_length=2, description="Search query for user full name"),
         limit: int = Query(default=10, le=50, description="Number of results to return"),
         offset: int = Query(default=0, description="Number of results to skip"),
-        current_user: User = Depends(get_current_user),
+        view: UserView = Query(UserView.FULL, description="compact - only name, email and status"),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Поиск пользователей по ФИО с пагинацией.
+    Без учета регистра и ё/е, с допуском опечаток; результаты отсортированы по релевантности.
     """
-    search_query = f"%{query}%"
-
     current_user_team = (
         select(TeamMember.team_id)
         .where(
@@ -51,16 +62,10 @@ async def search_users(
 
     stmt = (
         select(User)
-        .options(
-            selectinload(User.participant_info),
-            selectinload(User.mentor_info),
-            selectinload(User.user2roles).selectinload(User2Roles.role),
-            selectinload(User.current_status),
-            selectinload(User.status_history).selectinload(UserStatusHistory.status),
-        )
+        .options(*user_load_options(view))
         .where(
             and_(
-                User.full_name.ilike(search_query),
+                search_condition([User.full_name], query),
                 User.id != current_user.id,
                 exists(
                     select(1)
@@ -94,23 +99,22 @@ async def search_users(
                 )
             )
         )
+        .order_by(search_rank([User.full_name], query).desc(), User.full_name, User.id)
         .limit(limit)
         .offset(offset)
-        .order_by(User.full_name)
     )
 
     result = await session.execute(stmt)
-    users = result.scalars().all()
+    return FastJSONResponse(serialize_users(result.unique().scalars().all(), view))
 
-    return users
 
-
-@router.get("/search/mentors", response_model=List[UserResponse])
+@router.get("/search/mentors", response_model=Union[List[UserResponse], List[UserCompactResponse]])
 async def search_mentors(
         query: str = Query(..., min_length=2, description="Search query for mentor full name"),
         limit: int = Query(default=10, le=50, description="Number of results to return"),
         offset: int = Query(default=0, description="Number of results to skip"),
-        current_user: User = Depends(get_current_user),
+        view: UserView = Query(UserView.FULL, description="compact - only name, email and status"),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """
@@ -118,9 +122,8 @@ async def search_mentors(
     В отличие от поиска обычных пользователей:
     - Ищет только пользователей с ролью ментора
     - Может возвращать менторов, которые уже состоят в других командах
+    Результаты отсортированы по релевантности.
     """
-    search_query = f"%{query}%"
-
     current_user_team = (
         select(TeamMember.team_id)
         .where(
@@ -133,16 +136,10 @@ async def search_mentors(
 
     stmt = (
         select(User)
-        .options(
-            selectinload(User.participant_info),
-            selectinload(User.mentor_info),
-            selectinload(User.user2roles).selectinload(User2Roles.role),
-            selectinload(User.current_status),
-            selectinload(User.status_history).selectinload(UserStatusHistory.status),
-        )
+        .options(*user_load_options(view))
         .where(
             and_(
-                User.full_name.ilike(search_query),
+                search_condition([User.full_name], query),
                 User.id != current_user.id,
                 exists(
                     select(1)
@@ -166,27 +163,28 @@ async def search_mentors(
                 )
             )
         )
+        .order_by(search_rank([User.full_name], query).desc(), User.full_name, User.id)
         .limit(limit)
         .offset(offset)
-        .order_by(User.full_name)
     )
 
     result = await session.execute(stmt)
-    mentors = result.scalars().all()
-
-    return mentors
+    return FastJSONResponse(serialize_users(result.unique().scalars().all(), view))
 
 
 @router.get("/all", response_model=PaginatedUserResponse)
 async def get_users(
         limit: int = Query(default=10, le=50, description="Number of results to return"),
-        offset: int = Query(default=0, description="Number of results to skip"),
+        offset: int = Query(default=0, description="Number of results to skip (ignored with cursor)"),
+        cursor: Optional[str] = Query(None, description="Cursor of the next page from the previous response"),
+        include_total: bool = Query(True, description="Return total count (cached for a short time)"),
+        view: UserView = Query(UserView.FULL, description="compact - only name, email and status"),
         search: Optional[str] = Query(None, min_length=2,
                                       description="Optional search query for user full name or email"),
         roles: Optional[List[str]] = Query(None,
                                            description="Filter by user roles. Use '-' to find users without roles"),
         statuses: Optional[List[UserStatus]] = Query(None, description="Filter by user statuses"),
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """
@@ -195,23 +193,19 @@ async def get_users(
     - Поиск по ФИО или email
     - Фильтрацию по ролям (используйте '-' для поиска пользователей без ролей)
     - Фильтрацию по статусам
+    - Пагинацию по курсору: next_cursor из ответа передается в cursor следующего запроса
     """
-    query = select(User).options(
-        selectinload(User.participant_info),
-        selectinload(User.mentor_info),
-        selectinload(User.user2roles).selectinload(User2Roles.role),
-        selectinload(User.current_status),
-        selectinload(User.status_history).selectinload(UserStatusHistory.status),
+    count_key = (
+        "users",
+        search,
+        tuple(sorted(roles or [])),
+        tuple(sorted(status.value for status in statuses or []))
     )
 
+    query = select(User)
+
     if search:
-        search_query = f"%{search}%"
-        query = query.where(
-            or_(
-                User.full_name.ilike(search_query),
-                User.email.ilike(search_query)
-            )
-        )
+        query = query.where(search_condition([User.full_name, User.email], search))
 
     if roles:
         if "-" in roles:
@@ -258,34 +252,40 @@ async def get_users(
         if status_ids:
             query = query.where(User.current_status_id.in_(status_ids))
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await session.scalar(count_query)
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await count_cache.get(count_key, lambda: session.scalar(count_query))
 
-    query = query.order_by(User.full_name) \
-        .limit(limit) \
-        .offset(offset)
+    query = USERS_BY_NAME.apply(query.options(*user_load_options(view)), cursor, limit)
+    if not cursor:
+        query = query.offset(offset)
 
     result = await session.execute(query)
-    users = result.scalars().all()
+    users, next_cursor = USERS_BY_NAME.page(result.unique().scalars().all(), limit)
 
-    return {
-        "users": users,
-        "total": total
-    }
+    return FastJSONResponse({
+        "users": serialize_users(users, view),
+        "total": total,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/pending", response_model=PaginatedUserResponse)
 async def get_pending_users(
         limit: int = Query(default=10, le=50, description="Number of results to return"),
-        offset: int = Query(default=0, description="Number of results to skip"),
+        offset: int = Query(default=0, description="Number of results to skip (ignored with cursor)"),
+        cursor: Optional[str] = Query(None, description="Cursor of the next page from the previous response"),
+        include_total: bool = Query(True, description="Return total count (cached for a short time)"),
+        view: UserView = Query(UserView.FULL, description="compact - only name, email and status"),
         search: Optional[str] = Query(None, min_length=2,
                                       description="Optional search query for user full name or email"),
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Получение списка пользователей со статусом PENDING.
-    Поддерживает пагинацию и опциональный поиск по ФИО или email.
+    Поддерживает пагинацию (по курсору или offset) и опциональный поиск по ФИО или email.
     """
     base_query = (
         select(User)
@@ -293,67 +293,41 @@ async def get_pending_users(
     )
 
     if search:
-        search_query = f"%{search}%"
-        base_query = base_query.where(
-            or_(
-                User.full_name.ilike(search_query),
-                User.email.ilike(search_query)
-            )
-        )
+        base_query = base_query.where(search_condition([User.full_name, User.email], search))
 
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await session.scalar(count_query)
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(base_query.subquery())
+        total = await count_cache.get(("pending_users", search), lambda: session.scalar(count_query))
 
     query = (
         base_query
-        .options(
-            selectinload(User.participant_info),
-            selectinload(User.mentor_info),
-            selectinload(User.user2roles).selectinload(User2Roles.role),
-            selectinload(User.current_status),
-            selectinload(User.status_history).selectinload(UserStatusHistory.status),
-        )
-        .order_by(User.registered_at.desc())
-        .limit(limit)
-        .offset(offset)
+        .options(*user_load_options(view))
     )
+    query = USERS_BY_REGISTRATION.apply(query, cursor, limit)
+    if not cursor:
+        query = query.offset(offset)
 
     result = await session.execute(query)
-    users = result.scalars().all()
+    users, next_cursor = USERS_BY_REGISTRATION.page(result.unique().scalars().all(), limit)
 
-    return {
-        "users": users,
-        "total": total
-    }
+    return FastJSONResponse({
+        "users": serialize_users(users, view),
+        "total": total,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/{user_id}/documents", response_model=List[FileResponse])
 async def get_user_documents(
         user_id: uuid.UUID,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Получение документов пользователя (согласие и справка с места учебы/работы)
     """
-    current_user_query = (
-        select(User)
-        .options(selectinload(User.user2roles))
-        .where(User.id == current_user.id)
-    )
-    result = await session.execute(current_user_query)
-    current_user_with_roles = result.scalar_one()
-
-    is_organizer = any(
-        role.role_id == user_router_state.organizer_role_id
-        for role in current_user_with_roles.user2roles
-    )
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in current_user_with_roles.user2roles
-    )
-
-    if current_user.id != user_id and not (is_organizer or is_admin):
+    if auth.user_id != user_id and not (auth.is_organizer or auth.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недостаточно прав для просмотра документов"
@@ -389,30 +363,17 @@ async def get_user_documents(
 async def change_user_status(
         user_id: uuid.UUID,
         status_request: ChangeUserStatusRequest,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         background_tasks: BackgroundTasks = BackgroundTasks(),
         session: AsyncSession = Depends(get_session)
 ):
     """Изменение статуса пользователя (доступно только для организаторов)"""
     await check_stage(session, StageType.REGISTRATION)
 
-    current_user_query = (
-        select(User)
-        .options(selectinload(User.user2roles))
-        .where(User.id == current_user.id)
+    await auth.require(
+        any_of=[UserRole.ORGANIZER],
+        detail="Только организаторы могут изменять статус пользователей"
     )
-    result = await session.execute(current_user_query)
-    current_user_with_roles = result.scalar_one()
-
-    is_organizer = any(
-        role.role_id == user_router_state.organizer_role_id
-        for role in current_user_with_roles.user2roles
-    )
-    if not is_organizer:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только организаторы могут изменять статус пользователей"
-        )
 
     user_query = (
         select(User)
@@ -448,8 +409,6 @@ async def change_user_status(
             detail="Неверный статус"
         )
 
-    old_status_id = user.current_status_id
-
     new_status_history = UserStatusHistory(
         user_id=user.id,
         status_id=status_id,
@@ -459,58 +418,12 @@ async def change_user_status(
     user.current_status_id = status_id
 
     await session.flush()
-    await session.commit()
 
-    async with AsyncSession(session.bind) as new_session:
-        await asyncio.sleep(0.5)
-
-        if (old_status_id != status_id and
-                status_id == user_router_state.approved_status_id):
-
-            teams_query = (
-                select(Team)
-                .options(
-                    selectinload(Team.members)
-                    .selectinload(TeamMember.user)
-                    .selectinload(User.current_status),
-                    selectinload(Team.members)
-                    .selectinload(TeamMember.role),
-                    selectinload(Team.members)
-                    .selectinload(TeamMember.status)
-                )
-            )
-            result = await new_session.execute(teams_query)
-            teams = result.scalars().all()
-
-            for team in teams:
-                await new_session.refresh(team)
-                for member in team.members:
-                    await new_session.refresh(member)
-                    await new_session.refresh(member.user)
-
-            active_teams = [team for team in teams if team.get_status() == "active"]
-            active_teams_count = len(active_teams)
-
-            if active_teams_count >= 20:
-                current_stage_query = select(Stage).where(Stage.is_active == True)
-                current_stage = await new_session.execute(current_stage_query)
-                current_stage = current_stage.scalar_one_or_none()
-
-                if current_stage and current_stage.type == StageType.REGISTRATION.value:
-                    registration_closed_stage_query = (
-                        select(Stage)
-                        .where(Stage.type == StageType.REGISTRATION_CLOSED.value)
-                    )
-                    registration_closed_stage = await new_session.execute(registration_closed_stage_query)
-                    registration_closed_stage = registration_closed_stage.scalar_one_or_none()
-
-                    if registration_closed_stage:
-                        current_stage.is_active = False
-                        registration_closed_stage.is_active = True
-                        await stage_router_state.initialize(new_session)
+    registration_closed = await check_team_status_after_user_update(session, user.id, commit=False)
+    await session.commit()
 
-                        background_tasks.add_task(send_team_confirmation_email, new_session)
-                        await new_session.commit()
+    if registration_closed:
+        await launch_campaign(session, background_tasks, CampaignName.TEAM_CONFIRMATION)
 
     await session.refresh(user)
     return user
@@ -520,31 +433,15 @@ async def change_user_status(
 async def update_user_roles(
         user_id: uuid.UUID,
         roles_request: UpdateUserRolesRequest,
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(require_roles(
+            UserRole.ADMIN,
+            detail="Только администраторы могут изменять роли пользователей"
+        )),
         session: AsyncSession = Depends(get_session)
 ):
     """
     Обновление ролей пользователя (доступно только для администраторов)
     """
-    current_user_query = (
-        select(User)
-        .options(selectinload(User.user2roles))
-        .where(User.id == current_user.id)
-    )
-    result = await session.execute(current_user_query)
-    current_user_with_roles = result.scalar_one()
-
-    is_admin = any(
-        role.role_id == user_router_state.admin_role_id
-        for role in current_user_with_roles.user2roles
-    )
-
-    if not is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только администраторы могут изменять роли пользователей"
-        )
-
     role_ids = set()
     for role_name in roles_request.roles:
         role_id = getattr(user_router_state, f"{role_name}_role_id", None)
@@ -566,6 +463,7 @@ async def update_user_roles(
         )
         session.add(new_role)
 
+    await revoke_user_tokens(session, user_id)
     await session.commit()
 
     user_query = (
@@ -595,7 +493,7 @@ async def update_user_roles(
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
         user_data: dict,
-        current_user: User = Depends(get_current_user),
+        current_user: AuthPrincipal = Depends(get_current_user),
         session: AsyncSession = Depends(get_session)
 ):
     """
@@ -676,7 +574,7 @@ async def update_current_user(
 async def update_user_documents(
         document_type: str = Form(...),  # 'consent' или 'certificate'
         file: UploadFile = File(...),
-        current_user: User = Depends(get_current_user),
+        auth: AuthContext = Depends(get_auth_context),
         session: AsyncSession = Depends(get_session)
 ):
     """
@@ -691,25 +589,11 @@ async def update_user_documents(
             detail="Неверный тип документа. Допустимые значения: consent, certificate"
         )
 
-    user_query = (
-        select(User)
-        .options(
-            selectinload(User.user2roles)
-        )
-        .where(User.id == current_user.id)
-    )
-    result = await session.execute(user_query)
-    user_with_roles = result.scalar_one()
-
     if document_type == 'consent':
         file_type_id = file_router_state.consent_type_id
     else:
-        is_participant = any(
-            role.role_id == user_router_state.participant_role_id
-            for role in user_with_roles.user2roles
-        )
         file_type_id = (
-            file_router_state.education_certificate_type_id if is_participant
+            file_router_state.education_certificate_type_id if auth.is_participant
             else file_router_state.job_certificate_type_id
         )
 
@@ -732,7 +616,7 @@ async def update_user_documents(
         select(FileModel)
         .where(
             and_(
-                FileModel.user_id == current_user.id,
+                FileModel.user_id == auth.user_id,
                 FileModel.file_type_id == file_type_id,
                 FileModel.owner_type_id == file_router_state.user_owner_type_id
             )
@@ -746,32 +630,30 @@ async def update_user_documents(
     result = await session.execute(existing_file_query)
     existing_file = result.scalar_one_or_none()
 
-    upload_dir = Path("uploads/users") / str(current_user.id)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
-    file_path = upload_dir / f"{document_type}{file_extension}"
-
     try:
-        if existing_file and os.path.exists(existing_file.file_path):
-            os.remove(existing_file.file_path)
-
-        contents = await file.read()
-
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        stored = await blob_store.store_upload(file)
 
         if existing_file:
+            await blob_store.remove_legacy_file(existing_file)
             existing_file.filename = file.filename
-            existing_file.file_path = str(file_path)
+            existing_file.file_path = stored.storage_path
+            existing_file.sha256 = stored.sha256
+            existing_file.size = stored.size
+            existing_file.mime_type = stored.mime_type
             existing_file.file_format_id = file_format_id
+            # Время загрузки содержимого - по нему отдается Last-Modified
+            existing_file.created_at = datetime.utcnow()
         else:
             new_file = FileModel(
                 filename=file.filename,
-                file_path=str(file_path),
+                file_path=stored.storage_path,
+                sha256=stored.sha256,
+                size=stored.size,
+                mime_type=stored.mime_type,
                 file_format_id=file_format_id,
                 file_type_id=file_type_id,
                 owner_type_id=file_router_state.user_owner_type_id,
-                user_id=current_user.id
+                user_id=auth.user_id
             )
             session.add(new_file)
 
@@ -784,7 +666,7 @@ async def update_user_documents(
                 selectinload(User.current_status),
                 selectinload(User.status_history).selectinload(UserStatusHistory.status),
             )
-            .where(User.id == current_user.id)
+            .where(User.id == auth.user_id)
         )
 
         result = await session.execute(user_query)
@@ -798,6 +680,8 @@ async def update_user_documents(
             )
             session.add(new_status_history)
             user.current_status_id = user_router_state.pending_status_id
+            await session.flush()
+            await refresh_user_teams_status(session, user.id)
 
         await session.commit()
 
@@ -810,7 +694,7 @@ async def update_user_documents(
                 selectinload(User.current_status),
                 selectinload(User.status_history).selectinload(UserStatusHistory.status),
             )
-            .where(User.id == current_user.id)
+            .where(User.id == auth.user_id)
         )
 
         result = await session.execute(refresh_query)
@@ -819,8 +703,6 @@ async def update_user_documents(
         return updated_user
 
     except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
         await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class CampaignProgressResponse(BaseModel):
+    """Прогресс рассылки"""
+    id: UUID
+    name: str
+    status: str
+    idempotency_key: Optional[str] = None
+    total_recipients: int
+    sent: int
+    failed: int
+    pending: int
+    throughput_per_minute: Optional[float] = None
+    created_at: datetime
+    queued_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CampaignLaunchResponse(BaseModel):
+    message: str
+    campaign_id: UUID
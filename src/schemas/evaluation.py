@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 from uuid import UUID
 from pydantic import BaseModel, Field
@@ -32,6 +33,24 @@ class TeamEvaluationResponse(TeamEvaluationBase):
         from_attributes = True
 
 
+class TeamEvaluationBatch(BaseModel):
+    """Пакет оценок члена жюри"""
+    evaluations: List[TeamEvaluationCreate] = Field(..., min_length=1, max_length=500)
+
+
+class TeamEvaluationBatchItem(BaseModel):
+    team_id: UUID
+    status: str  # saved, team_not_found, duplicate
+    detail: Optional[str] = None
+    evaluation: Optional[TeamEvaluationResponse] = None
+
+
+class TeamEvaluationBatchResponse(BaseModel):
+    saved_count: int
+    failed_count: int
+    results: List[TeamEvaluationBatchItem]
+
+
 class TeamTotalScore(BaseModel):
     """Схема для отображения итоговых результатов команды"""
     team_id: UUID
@@ -45,6 +64,24 @@ class TeamTotalScore(BaseModel):
         from_attributes = True
 
 
+class RankingMode(str, Enum):
+    RAW = "raw"  # Сумма баллов
+    NORMALIZED = "normalized"  # С поправкой на строгость судей
+
+
+class NormalizedTeamScore(BaseModel):
+    """Место команды в нормализованном рейтинге"""
+    team_id: UUID
+    team_name: str
+    team_motto: str
+    rank: int
+    normalized_score: Optional[float] = None
+    raw_total_score: float
+    evaluations_count: int
+    rank_ci_low: float
+    rank_ci_high: float
+
+
 class UnevaluatedTeam(BaseModel):
     team_id: UUID
     team_name: str
@@ -51,6 +51,9 @@ class FileResponse(FileBase):
     id: UUID
     file_path: str
     created_at: datetime
+    size: Optional[int] = None
+    mime_type: Optional[str] = None
+    sha256: Optional[str] = None
 
     file_format: FileFormatResponse
     file_type: FileTypeResponse
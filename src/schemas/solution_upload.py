@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class SolutionUploadCreate(BaseModel):
+    """Начало докачиваемой загрузки решения"""
+    filename: str = Field(..., max_length=255)
+    size: int = Field(..., gt=0, description="Размер архива в байтах")
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$", description="SHA-256 всего архива для проверки при завершении")
+
+
+class SolutionUploadResponse(BaseModel):
+    """Состояние загрузки: следующую часть нужно отправлять с offset"""
+    id: UUID
+    filename: str
+    size: int
+    offset: int
+    chunk_max_size: int
+    expires_at: datetime
@@ -19,6 +19,7 @@ class StageResponse(BaseModel):
     type: StageType
     order: int
     is_active: bool
+    starts_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -32,4 +33,20 @@ class StageActivationResponse(BaseModel):
     new_stage: StageResponse
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class StageScheduleUpdate(BaseModel):
+    starts_at: Optional[datetime] = None
+
+
+class StageScheduleResponse(BaseModel):
+    id: UUID
+    name: str
+    type: StageType
+    order: int
+    is_active: bool
+    starts_at: Optional[datetime]
+    next_run_time: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -133,7 +133,8 @@ class TeamInvitationResponse(BaseModel):
 class PaginatedTeamsResponse(BaseModel):
     """Схема ответа со списком команд и общим количеством"""
     teams: List[TeamResponse]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
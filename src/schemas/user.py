@@ -1,5 +1,6 @@
 import datetime
-from typing import Optional, List
+from enum import Enum
+from typing import Optional, List, Union
 from uuid import UUID
 from pydantic import BaseModel, EmailStr
 
@@ -51,6 +52,21 @@ class UserStatusResponse(BaseModel):
         from_attributes = True
 
 
+class UserView(str, Enum):
+    COMPACT = "compact"  # ФИО, email и текущий статус - для списков
+    FULL = "full"  # Все данные пользователя, включая историю статусов
+
+
+class UserCompactResponse(BaseModel):
+    id: UUID
+    email: str
+    full_name: str
+    current_status: UserStatusResponse
+
+    class Config:
+        from_attributes = True
+
+
 class UserResponse(BaseModel):
     id: UUID
     email: str
@@ -80,8 +96,9 @@ class UserStatusHistoryResponse(BaseModel):
         from_attributes = True
 
 class PaginatedUserResponse(BaseModel):
-    users: List[UserResponse]
-    total: int
+    users: Union[List[UserResponse], List[UserCompactResponse]]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ChangeUserStatusRequest(BaseModel):
     status: UserStatus
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import List, Optional
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -16,12 +17,88 @@ class Settings(BaseSettings):
     smtp_host: str
     smtp_port: int
     smtp_sender: str
+    smtp_timeout_seconds: float = 30
+
+    # Email outbox settings
+    email_outbox_concurrency: int = 2
+    email_outbox_batch_size: int = 50
+    email_outbox_poll_interval_seconds: float = 2
+    email_outbox_stale_timeout_seconds: float = 300
+    email_rate_limit_per_second: float = 5
+    email_rate_limit_burst: int = 10
+    email_max_attempts: int = 5
+    email_retry_base_delay_seconds: float = 30
+    campaign_batch_size: int = 500
 
     base_url: str
+
+    # Auth settings
+    auth_cache_ttl_seconds: float = 30
+    auth_cache_max_size: int = 10000
+
+    # Password hashing settings
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+
+    # File upload settings
+    upload_io_workers: int = 4
+    upload_buffer_size_bytes: int = 1024 * 1024
+    upload_read_chunk_size_bytes: int = 256 * 1024
+    upload_max_field_size_bytes: int = 1024 * 1024
+    # Документы при регистрации (PDF или изображение) и файл описания развертывания команды
+    upload_document_max_bytes: int = 10 * 1024 * 1024
+    upload_deployment_max_bytes: int = 1024 * 1024
+    upload_staging_dir: str = "uploads/.incoming"
+    solution_upload_chunk_max_bytes: int = 16 * 1024 * 1024
+    solution_upload_ttl_seconds: int = 86400
+    # Время на прием одной части: запрос держит аренду загрузки, но не соединение с бд
+    solution_upload_lease_seconds: int = 300
+    solution_upload_cleanup_interval_seconds: int = 3600
+
+    # Content-addressed file store settings
+    blob_store_dir: str = "uploads/blobs"
+    # Блоб без ссылок удаляется не раньше, чем через это время после последней загрузки того же содержимого
+    blob_gc_grace_seconds: int = 3600
+    blob_gc_interval_seconds: int = 3600
+
+    # File serving settings
+    file_serving_chunk_size_bytes: int = 1024 * 1024
+    file_serving_hash_cache_size: int = 1024
+    # Префикс internal location nginx (например "/protected/"): тело файла отдает nginx через X-Accel-Redirect
+    file_serving_accel_redirect_prefix: Optional[str] = None
+
+    # Database notifications listener settings
+    db_listener_health_check_seconds: float = 30
+    db_listener_reconnect_delay_seconds: float = 5
+
+    # Pagination settings
+    pagination_count_cache_ttl_seconds: float = 30
+
+    # Leaderboard settings
+    leaderboard_cache_ttl_seconds: float = 60
+    evaluation_criterion_weights: List[float] = [1, 1, 1, 1, 1]
+    ranking_bootstrap_iterations: int = 2000
+    ranking_confidence_level: float = 0.95
+    results_snapshot_dir: str = "results"
+    results_snapshot_max_age_seconds: int = 86400
+
+    # Scheduler settings
+    scheduler_leader_election: bool = True
+    scheduler_lease_check_seconds: float = 10
+
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
 
+    @property
+    def sync_database_url(self) -> str:
+        return f"postgresql+psycopg2://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+
+    @property
+    def asyncpg_dsn(self) -> str:
+        return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+
     class Config:
         env_file = BASE_DIR / ".env"
 
@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from apscheduler.jobstores.base import ConflictingIdError
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import async_session
+from src.models import Blob, File as DBFile
+from src.settings import settings
+from src.utils.background_tasks import scheduler
+from src.utils.file_serving import file_sha256, guess_media_type
+from src.utils.multipart_stream import StreamedFile
+from src.utils.upload_writer import upload_writer
+
+BLOB_GC_JOB_ID = "collect_unreferenced_blobs"
+
+# Счетчик ссылок на блоб ведет бд, поэтому он учитывает и каскадное удаление файлов вместе с пользователем
+# или командой. Создается после create_all, т.к. триггер висит на таблице files
+BLOB_STORE_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION files_blob_ref_count() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            IF OLD.sha256 IS NOT NULL THEN
+                UPDATE blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.sha256;
+            END IF;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            IF NEW.sha256 IS NOT NULL THEN
+                UPDATE blobs SET ref_count = ref_count + 1, last_used_at = now() WHERE sha256 = NEW.sha256;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    # CREATE OR REPLACE TRIGGER есть только с Postgres 14
+    "DROP TRIGGER IF EXISTS files_blob_ref_count ON files",
+    """
+    CREATE TRIGGER files_blob_ref_count
+    AFTER INSERT OR DELETE OR UPDATE OF sha256 ON files
+    FOR EACH ROW EXECUTE FUNCTION files_blob_ref_count()
+    """,
+]
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+    mime_type: str
+    storage_path: str
+    deduplicated: bool
+
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _check_blob(path: str, size: int, sha256: str, rehash: bool) -> Optional[str]:
+    try:
+        actual_size = os.stat(path).st_size
+    except FileNotFoundError:
+        return "missing"
+    if actual_size != size:
+        return "size_mismatch"
+    if rehash and file_sha256(path) != sha256:
+        return "hash_mismatch"
+    return None
+
+
+def _stage_legacy_file(path: str) -> Tuple[str, str, int]:
+    """
+    Жесткая ссылка (или копия) старого файла во временном каталоге с его SHA-256 и размером.
+    Старый файл остается на месте, пока запись File не переключена на блоб.
+    """
+    os.makedirs(settings.upload_staging_dir, exist_ok=True)
+    temp_path = os.path.join(settings.upload_staging_dir, f"legacy_{os.urandom(8).hex()}")
+    try:
+        os.link(path, temp_path)
+    except OSError:
+        shutil.copyfile(path, temp_path)
+    return temp_path, file_sha256(temp_path), os.stat(temp_path).st_size
+
+
+class BlobStore:
+    """
+    Контентно-адресуемое хранилище файлов. Содержимое лежит один раз под именем своего SHA-256
+    в каталогах root/ab/cd/<sha256>, записи File ссылаются на него через files.sha256.
+    Блоб неизменяем: новое содержимое - новый блоб, поэтому SHA-256 из бд служит готовым ETag.
+    Блобы без ссылок удаляет collect_garbage не раньше, чем через gc_grace_seconds после последней загрузки.
+    """
+
+    def __init__(self, root: str, gc_grace_seconds: int):
+        self.root = root
+        self.gc_grace_seconds = gc_grace_seconds
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    @staticmethod
+    def _place(temp_path: str, storage_path: str) -> bool:
+        """
+        Переносит временный файл на место блоба.
+
+        Returns:
+            bool: True, если такое содержимое уже лежит в хранилище и временный файл удален
+        """
+        if os.path.exists(storage_path):
+            os.unlink(temp_path)
+            return True
+        os.makedirs(os.path.dirname(storage_path), exist_ok=True)
+        os.replace(temp_path, storage_path)
+        return False
+
+    async def ingest(self, temp_path: str, sha256: str, size: int, mime_type: str) -> StoredBlob:
+        """
+        Переносит записанный временный файл (тот же раздел диска) в хранилище.
+        Если блоб с таким SHA-256 уже есть, временный файл удаляется и место на диске повторно не занимается.
+
+        Запись блоба фиксируется сразу в отдельной сессии, ссылку на нее добавляет запись File.
+        Вызывать до изменения записей File в транзакции вызывающего кода: иначе upsert будет ждать
+        блокировку строки блоба, которую держит триггер этой транзакции.
+        """
+        async with async_session() as session:
+            storage_path = await session.scalar(
+                insert(Blob)
+                .values(
+                    sha256=sha256,
+                    size=size,
+                    mime_type=mime_type,
+                    storage_path=self.path_for(sha256)
+                )
+                .on_conflict_do_update(index_elements=[Blob.sha256], set_={"last_used_at": func.now()})
+                .returning(Blob.storage_path)
+            )
+            # Строка блоба заблокирована до commit - сборщик мусора не удалит файл, пока он переносится
+            deduplicated = await asyncio.to_thread(self._place, temp_path, storage_path)
+            await session.commit()
+
+        return StoredBlob(sha256, size, mime_type, storage_path, deduplicated)
+
+    async def find(self, session: AsyncSession, sha256: str) -> Optional[StoredBlob]:
+        """
+        Блоб, уже лежащий в хранилище. Строка блоба блокируется на чтение до конца транзакции
+        session - сборщик мусора пропустит блоб, пока на него добавляется ссылка.
+        """
+        blob = await session.scalar(select(Blob).where(Blob.sha256 == sha256).with_for_update(read=True))
+        if blob is None:
+            return None
+        return StoredBlob(blob.sha256, blob.size, blob.mime_type, blob.storage_path, True)
+
+    async def store_upload(self, upload_file, max_file_size: Optional[int] = None, prefix: str = "upload_") -> StoredBlob:
+        """
+        Сохраняет загружаемый файл (StreamedFile или UploadFile) в хранилище.
+        SHA-256 считается во время записи на диск, MIME-тип определяется по имени файла.
+
+        :raises: HTTPException 413 если файл больше max_file_size
+        """
+        if isinstance(upload_file, StreamedFile):
+            stream = upload_file.stream
+        else:
+            await asyncio.to_thread(os.makedirs, settings.upload_staging_dir, exist_ok=True)
+            stream = await upload_writer.receive(
+                upload_file,
+                settings.upload_staging_dir,
+                max_file_size,
+                prefix,
+                digest=hashlib.sha256()
+            )
+
+        mime_type = guess_media_type(upload_file.filename, upload_file.content_type or "application/octet-stream")
+        try:
+            return await self.ingest(stream.temp_path, stream.digest.hexdigest(), stream.size, mime_type)
+        except BaseException:
+            await stream.discard()
+            raise
+
+    async def remove_legacy_file(self, file: DBFile) -> None:
+        """
+        Удаляет с диска файл, сохраненный до хранилища блобов (sha256 пуст), - он принадлежит только этой записи.
+        Содержимое из хранилища здесь не удаляется: ссылку снимает триггер при удалении записи, блоб - сборщик мусора.
+        """
+        if file.sha256 is None:
+            await asyncio.to_thread(_remove_files, [file.file_path])
+
+    async def collect_garbage(self) -> int:
+        """
+        Удаляет блобы без ссылок, которые не загружались дольше gc_grace_seconds (задача планировщика).
+        Файлы удаляются до commit, пока строки блобов заблокированы: параллельная загрузка того же
+        содержимого дождется commit и положит файл заново.
+
+        Returns:
+            int: Количество удаленных блобов
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                select(Blob.sha256, Blob.storage_path)
+                .where(
+                    Blob.ref_count == 0,
+                    Blob.last_used_at < datetime.utcnow() - timedelta(seconds=self.gc_grace_seconds)
+                )
+                .with_for_update(skip_locked=True)
+            )
+            blobs = result.all()
+            if not blobs:
+                return 0
+
+            await session.execute(delete(Blob).where(Blob.sha256.in_([blob.sha256 for blob in blobs])))
+            await asyncio.to_thread(_remove_files, [blob.storage_path for blob in blobs])
+            await session.commit()
+
+        logging.info(f"Удалено блобов без ссылок: {len(blobs)}")
+        return len(blobs)
+
+    async def stats(self, session: AsyncSession) -> dict:
+        """Занятое место и экономия от дедупликации"""
+        blobs = (await session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(Blob.size), 0),
+                func.coalesce(func.sum(Blob.size * Blob.ref_count), 0),
+                func.coalesce(func.sum(Blob.ref_count), 0),
+                func.count().filter(Blob.ref_count == 0)
+            )
+        )).one()
+        blob_count, physical_bytes, logical_bytes, referencing_files, unreferenced = blobs
+        legacy_files = await session.scalar(select(func.count()).where(DBFile.sha256.is_(None)))
+
+        return {
+            "blobs": blob_count,
+            "files": referencing_files,
+            "unreferenced_blobs": unreferenced,
+            "legacy_files": legacy_files,
+            "physical_bytes": physical_bytes,
+            "logical_bytes": logical_bytes,
+            "saved_bytes": max(logical_bytes - physical_bytes, 0),
+            "dedup_ratio": round(logical_bytes / physical_bytes, 2) if physical_bytes else None
+        }
+
+    def _orphaned_files(self, known: set) -> List[str]:
+        orphaned = []
+        for directory, _, filenames in os.walk(self.root):
+            orphaned.extend(os.path.join(directory, name) for name in filenames if name not in known)
+        return orphaned
+
+    async def verify(self, session: AsyncSession, rehash: bool = True, repair_refs: bool = False) -> Dict[str, list]:
+        """
+        Проверка целостности хранилища: файлы блобов на месте, размер и SHA-256 совпадают с записанными,
+        ref_count совпадает с числом записей files, на диске нет файлов без записи блоба.
+
+        :param rehash: Пересчитывать SHA-256 (иначе проверяются только наличие и размер)
+        :param repair_refs: Пересчитать неверные ref_count по таблице files
+        """
+        result = await session.execute(select(Blob.sha256, Blob.size, Blob.storage_path, Blob.ref_count))
+        blobs = result.all()
+
+        problems = {"missing": [], "size_mismatch": [], "hash_mismatch": [], "ref_count_mismatch": [], "orphaned": []}
+        for blob in blobs:
+            problem = await asyncio.to_thread(_check_blob, blob.storage_path, blob.size, blob.sha256, rehash)
+            if problem:
+                problems[problem].append(blob.sha256)
+
+        result = await session.execute(
+            select(DBFile.sha256, func.count())
+            .where(DBFile.sha256.isnot(None))
+            .group_by(DBFile.sha256)
+        )
+        references = dict(result.all())
+        for blob in blobs:
+            if blob.ref_count != references.get(blob.sha256, 0):
+                problems["ref_count_mismatch"].append(blob.sha256)
+
+        if repair_refs and problems["ref_count_mismatch"]:
+            await session.execute(
+                update(Blob)
+                .where(Blob.sha256.in_(problems["ref_count_mismatch"]))
+                .values(
+                    ref_count=select(func.count())
+                    .where(DBFile.sha256 == Blob.sha256)
+                    .scalar_subquery()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        problems["orphaned"] = await asyncio.to_thread(self._orphaned_files, {blob.sha256 for blob in blobs})
+        return problems
+
+    async def import_legacy(self, session: AsyncSession) -> Dict[str, int]:
+        """
+        Переносит в хранилище файлы, сохраненные до него: записывает в files SHA-256, размер и MIME-тип
+        и удаляет старый файл. Одинаковые файлы после переноса занимают место на диске один раз.
+        """
+        result = await session.execute(select(DBFile).where(DBFile.sha256.is_(None)))
+        files = result.scalars().all()
+
+        counters = {"imported": 0, "deduplicated": 0, "missing": 0}
+        for file in files:
+            if not await asyncio.to_thread(os.path.exists, file.file_path):
+                counters["missing"] += 1
+                continue
+
+            temp_path, sha256, size = await asyncio.to_thread(_stage_legacy_file, file.file_path)
+            try:
+                stored = await self.ingest(temp_path, sha256, size, guess_media_type(file.filename))
+            except BaseException:
+                await asyncio.to_thread(_remove_files, [temp_path])
+                raise
+
+            legacy_path = file.file_path
+            file.file_path = stored.storage_path
+            file.sha256 = stored.sha256
+            file.size = stored.size
+            file.mime_type = stored.mime_type
+            await session.commit()
+            await asyncio.to_thread(_remove_files, [legacy_path])
+
+            counters["imported"] += 1
+            if stored.deduplicated:
+                counters["deduplicated"] += 1
+        return counters
+
+
+blob_store = BlobStore(root=settings.blob_store_dir, gc_grace_seconds=settings.blob_gc_grace_seconds)
+
+
+async def collect_unreferenced_blobs() -> int:
+    return await blob_store.collect_garbage()
+
+
+def _add_gc_job() -> None:
+    try:
+        scheduler.add_job(
+            collect_unreferenced_blobs,
+            trigger=IntervalTrigger(seconds=settings.blob_gc_interval_seconds),
+            id=BLOB_GC_JOB_ID,
+            name="Collect unreferenced blobs",
+            replace_existing=True
+        )
+    except ConflictingIdError:
+        # Задачу одновременно добавил другой воркер
+        pass
+
+
+async def schedule_blob_gc() -> None:
+    """Регистрирует периодическую сборку блобов без ссылок (выполняет лидер планировщика)"""
+    # Хранилище задач синхронное, работаем с ним вне event loop
+    await asyncio.to_thread(_add_gc_job)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.settings import settings
+
+
+async def notify(session: AsyncSession, channel: str) -> None:
+    """
+    Отправляет NOTIFY в канал channel.
+    Вызывается до commit: Postgres доставляет уведомление только после фиксации транзакции.
+    """
+    await session.execute(select(func.pg_notify(channel, "")))
+
+
+class DatabaseEventListener:
+    """
+    Подписка воркера на уведомления Postgres (LISTEN) на отдельном соединении.
+    Используется для сброса кэшей воркера при изменениях, сделанных другими воркерами.
+    Пока соединение живо, подписчикам сообщается, что кэш можно использовать;
+    при потере соединения кэши отключаются до переподключения.
+    """
+
+    def __init__(self, dsn: str, health_check_interval: float, reconnect_delay: float):
+        self.dsn = dsn
+        self.health_check_interval = health_check_interval
+        self.reconnect_delay = reconnect_delay
+        self._subscriptions: Dict[str, List[Tuple[Callable[[], None], Callable[[bool], None]]]] = {}
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(
+            self,
+            channel: str,
+            on_notify: Callable[[], None],
+            on_connection_change: Callable[[bool], None]
+    ) -> None:
+        """
+        :param on_notify: Вызывается при каждом уведомлении в канале
+        :param on_connection_change: True после подписки, False при потере соединения
+        """
+        self._subscriptions.setdefault(channel, []).append((on_notify, on_connection_change))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        for on_notify, _ in self._subscriptions.get(channel, []):
+            on_notify()
+
+    def _set_connected(self, connected: bool) -> None:
+        for subscriptions in self._subscriptions.values():
+            for _, on_connection_change in subscriptions:
+                on_connection_change(connected)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                for channel in self._subscriptions:
+                    await self._connection.add_listener(channel, self._on_notification)
+                # Пока подписки не было, уведомления могли быть пропущены
+                self._set_connected(True)
+
+                while True:
+                    await asyncio.sleep(self.health_check_interval)
+                    await self._connection.fetchval("SELECT 1", timeout=self.health_check_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Потеряна подписка на уведомления бд: {str(e)}")
+            finally:
+                await self._disconnect()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _disconnect(self) -> None:
+        self._set_connected(False)
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+
+db_event_listener = DatabaseEventListener(
+    dsn=settings.asyncpg_dsn,
+    health_check_interval=settings.db_listener_health_check_seconds,
+    reconnect_delay=settings.db_listener_reconnect_delay_seconds
+)
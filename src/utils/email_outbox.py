@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import Message
+from typing import List, Optional
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.orm import sessionmaker
+
+from src.db import async_session
+from src.models.email_outbox import EmailOutboxMessage
+from src.models.enums import EmailStatus
+from src.settings import settings
+from src.utils.email_utils import email_sender
+
+
+class TokenBucket:
+    """Ограничение частоты отправки: rate писем в секунду, не более capacity подряд"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SMTPConnectionPool:
+    """
+    Пул постоянных SMTP соединений.
+    smtplib блокирующий, поэтому отправка выполняется в отдельном пуле потоков,
+    каждое соединение в один момент времени используется только одной задачей.
+    """
+
+    def __init__(self, host: str, port: int, size: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[smtplib.SMTP] = []
+        self._semaphore = asyncio.Semaphore(size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp")
+        return self._executor
+
+    def _connect(self) -> smtplib.SMTP:
+        return smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _send(self, connection: Optional[smtplib.SMTP], message: Message) -> smtplib.SMTP:
+        if connection is not None:
+            try:
+                connection.send_message(message)
+                return connection
+            except smtplib.SMTPServerDisconnected:
+                # Сервер закрыл простаивающее соединение - переподключаемся
+                self._close(connection)
+            except Exception:
+                self._close(connection)
+                raise
+
+        connection = self._connect()
+        try:
+            connection.send_message(message)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    async def send(self, message: Message) -> None:
+        async with self._semaphore:
+            connection = self._idle.pop() if self._idle else None
+            loop = asyncio.get_running_loop()
+            connection = await loop.run_in_executor(self.executor, self._send, connection, message)
+            self._idle.append(connection)
+
+    def close(self) -> None:
+        while self._idle:
+            self._close(self._idle.pop())
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class EmailOutboxWorker:
+    """
+    Фоновая задача, отправляющая письма из таблицы email_outbox.
+    Письма захватываются через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому несколько воркеров (процессов uvicorn) не отправляют одно письмо дважды.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            pool: SMTPConnectionPool,
+            rate_limiter: TokenBucket,
+            batch_size: int,
+            poll_interval: float,
+            max_attempts: int,
+            retry_base_delay: float,
+            stale_timeout: float
+    ):
+        self.session_factory = session_factory
+        self.pool = pool
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.stale_timeout = stale_timeout
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.pool.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Ошибка обработки очереди писем: {str(e)}")
+                processed = 0
+
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def process_batch(self) -> int:
+        """
+        Захватывает и отправляет одну пачку писем
+
+        Returns:
+            int: Количество обработанных писем
+        """
+        messages = await self._claim_batch()
+        if messages:
+            await asyncio.gather(*(self._deliver(message) for message in messages))
+        return len(messages)
+
+    async def _claim_batch(self) -> List[EmailOutboxMessage]:
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            query = (
+                select(EmailOutboxMessage)
+                .where(
+                    or_(
+                        and_(
+                            EmailOutboxMessage.status == EmailStatus.PENDING.value,
+                            EmailOutboxMessage.next_attempt_at <= now
+                        ),
+                        # Письма, захваченные упавшим воркером
+                        and_(
+                            EmailOutboxMessage.status == EmailStatus.SENDING.value,
+                            EmailOutboxMessage.locked_at < now - timedelta(seconds=self.stale_timeout)
+                        )
+                    )
+                )
+                .order_by(EmailOutboxMessage.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(query)
+            messages = result.scalars().all()
+
+            for message in messages:
+                message.status = EmailStatus.SENDING.value
+                message.locked_at = now
+                message.attempts += 1
+
+            await session.commit()
+            return messages
+
+    async def _deliver(self, message: EmailOutboxMessage) -> None:
+        await self.rate_limiter.acquire()
+        mime_message = email_sender._create_message(
+            message.to_email,
+            message.subject,
+            message.body,
+            message.is_html
+        )
+
+        try:
+            await self.pool.send(mime_message)
+        except smtplib.SMTPRecipientsRefused as e:
+            # Адрес отклонен сервером - повторная отправка не поможет
+            await self._mark_failed(message, str(e), retry=False)
+        except Exception as e:
+            await self._mark_failed(message, str(e), retry=True)
+        else:
+            await self._update(
+                message,
+                status=EmailStatus.SENT.value,
+                sent_at=datetime.utcnow(),
+                locked_at=None,
+                last_error=None
+            )
+
+    async def _mark_failed(self, message: EmailOutboxMessage, error: str, retry: bool) -> None:
+        if retry and message.attempts < self.max_attempts:
+            delay = self.retry_base_delay * 2 ** (message.attempts - 1)
+            logging.warning(f"Ошибка отправки письма {message.to_email}, повтор через {delay:.0f} с: {error}")
+            await self._update(
+                message,
+                status=EmailStatus.PENDING.value,
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+                locked_at=None,
+                last_error=error
+            )
+        else:
+            logging.error(f"Письмо {message.to_email} не отправлено после {message.attempts} попыток: {error}")
+            await self._update(
+                message,
+                status=EmailStatus.FAILED.value,
+                locked_at=None,
+                last_error=error
+            )
+
+    async def _update(self, message: EmailOutboxMessage, **values) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(EmailOutboxMessage)
+                .where(EmailOutboxMessage.id == message.id)
+                .values(**values)
+            )
+            await session.commit()
+
+
+email_outbox_worker = EmailOutboxWorker(
+    session_factory=async_session,
+    pool=SMTPConnectionPool(
+        host=settings.smtp_host,
+        port=settings.smtp_port,
+        size=settings.email_outbox_concurrency,
+        timeout=settings.smtp_timeout_seconds
+    ),
+    rate_limiter=TokenBucket(
+        rate=settings.email_rate_limit_per_second,
+        capacity=settings.email_rate_limit_burst
+    ),
+    batch_size=settings.email_outbox_batch_size,
+    poll_interval=settings.email_outbox_poll_interval_seconds,
+    max_attempts=settings.email_max_attempts,
+    retry_base_delay=settings.email_retry_base_delay_seconds,
+    stale_timeout=settings.email_outbox_stale_timeout_seconds
+)
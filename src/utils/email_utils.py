@@ -1,7 +1,16 @@
-import smtplib
+import logging
+import uuid
+from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Iterable, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import async_session
+from src.models.email_outbox import EmailOutboxMessage
+from src.models.enums import EmailStatus
 from src.settings import settings
 
 class EmailSender:
@@ -43,7 +52,21 @@ class EmailSender:
 
         return msg
 
-    def send_email(
+    @staticmethod
+    def _create_outbox_message(
+        to_email: Union[str, List[str]],
+        subject: str,
+        body: str,
+        is_html: bool = False
+    ) -> EmailOutboxMessage:
+        return EmailOutboxMessage(
+            to_email=', '.join(to_email) if isinstance(to_email, list) else to_email,
+            subject=subject,
+            body=body,
+            is_html=is_html
+        )
+
+    async def send_email(
         self,
         to_email: Union[str, List[str]],
         subject: str,
@@ -51,7 +74,8 @@ class EmailSender:
         is_html: bool = False
     ) -> bool:
         """
-        Отправляет email сообщение
+        Ставит email сообщение в очередь отправки (таблица email_outbox).
+        Само письмо отправляет воркер email_outbox_worker.
 
         Args:
             to_email: Email получателя или список получателей
@@ -59,17 +83,73 @@ class EmailSender:
             body: Тело письма
             is_html: Флаг, указывающий является ли тело письма HTML
         Returns:
-            bool: True если отправка успешна, False в случае ошибки
+            bool: True если письмо поставлено в очередь, False в случае ошибки
         """
         try:
-            msg = self._create_message(to_email, subject, body, is_html)
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.send_message(msg)
+            async with async_session() as session:
+                session.add(self._create_outbox_message(to_email, subject, body, is_html))
+                await session.commit()
             return True
 
         except Exception as e:
-            print(f"Error sending email: {e}")
+            logging.error(f"Error queueing email: {e}")
             return False
 
-email_sender = EmailSender()
\ No newline at end of file
+    async def send_emails(
+        self,
+        messages: Iterable[Tuple[str, str, str]],
+        is_html: bool = False,
+        campaign_id: Optional[uuid.UUID] = None,
+        session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Ставит в очередь пачку писем одним INSERT.
+        В рамках рассылки (campaign_id) адрес получателя уникален:
+        повторная постановка уже поставленного адреса пропускается.
+
+        Args:
+            messages: Кортежи (email получателя, тема, тело письма)
+            is_html: Флаг, указывающий является ли тело письма HTML
+            campaign_id: ID запуска рассылки
+            session: Сессия вызывающего кода. Если передана - commit выполняет вызывающий код
+
+        Returns:
+            int: Количество поставленных в очередь писем
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "campaign_id": campaign_id,
+                "to_email": ', '.join(to_email) if isinstance(to_email, list) else to_email,
+                "subject": subject,
+                "body": body,
+                "is_html": is_html,
+                "status": EmailStatus.PENDING.value,
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now
+            }
+            for to_email, subject, body in messages
+        ]
+        if not rows:
+            return 0
+
+        query = (
+            insert(EmailOutboxMessage)
+            .values(rows)
+            .on_conflict_do_nothing(constraint='uq_email_outbox_campaign_recipient')
+            .returning(EmailOutboxMessage.id)
+        )
+
+        if session is not None:
+            result = await session.execute(query)
+            return len(result.all())
+
+        async with async_session() as own_session:
+            result = await own_session.execute(query)
+            queued = len(result.all())
+            await own_session.commit()
+        return queued
+
+email_sender = EmailSender()
@@ -94,7 +94,7 @@ async def send_verification_email(user_email: str, user_name: str, token: str):
     </html>
     """
 
-    return email_sender.send_email(
+    return await email_sender.send_email(
         to_email=user_email,
         subject="Подтверждение email адреса",
         body=html_content,
@@ -0,0 +1,195 @@
+import asyncio
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Team, TeamEvaluation
+from src.schemas.evaluation import NormalizedTeamScore
+from src.settings import settings
+from src.utils.db_events import db_event_listener
+from src.utils.evaluation_utils import CRITERIA
+from src.utils.leaderboard import LEADERBOARD_CHANGED_CHANNEL
+
+
+def normalize_scores(scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Нормализация оценок с поправкой на строгость судьи.
+
+    :param scores: Тензор судья x команда x критерий, NaN - оценки нет
+    :param weights: Веса критериев
+    :return: Матрица судья x команда взвешенных z-оценок, NaN - оценки нет
+    """
+    mean = np.nanmean(scores, axis=1, keepdims=True)
+    std = np.nanstd(scores, axis=1, keepdims=True)
+    # Судья, поставивший всем одинаковый балл по критерию, не влияет на порядок
+    z_scores = np.divide(scores - mean, std, out=np.zeros_like(scores), where=std > 0)
+    weighted = np.einsum("jtc,c->jt", np.nan_to_num(z_scores), weights / weights.sum())
+    weighted[np.isnan(scores).all(axis=2)] = np.nan
+    return weighted
+
+
+def rank_descending(scores: np.ndarray) -> np.ndarray:
+    """Места (с 1) по убыванию баллов вдоль последней оси, NaN - в конце"""
+    order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), axis=-1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[-1] + 1), axis=-1)
+    return ranks
+
+
+def bootstrap_rank_intervals(
+        judge_scores: np.ndarray,
+        iterations: int,
+        confidence: float,
+        seed: int = 0
+) -> np.ndarray:
+    """
+    Доверительные интервалы мест команд бутстрепом по судьям.
+    Каждая итерация - выборка судей с возвращением, заданная числом вхождений судьи,
+    поэтому все итерации считаются одним матричным умножением.
+
+    :param judge_scores: Матрица судья x команда, NaN - оценки нет
+    :return: Массив команда x 2 (нижняя и верхняя граница места)
+    """
+    judges_count = judge_scores.shape[0]
+    rng = np.random.default_rng(seed)
+    # Целые числа вхождений переводим в float, чтобы умножение шло через BLAS
+    counts = rng.multinomial(judges_count, np.full(judges_count, 1 / judges_count), size=iterations).astype(float)
+
+    evaluated = ~np.isnan(judge_scores)
+    sums = counts @ np.where(evaluated, judge_scores, 0.0)
+    weights = counts @ evaluated.astype(float)
+    means = np.divide(sums, weights, out=np.full(sums.shape, np.nan), where=weights > 0)
+
+    ranks = rank_descending(means)
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(ranks, [tail, 100 - tail], axis=0).T
+
+
+def compute_normalized_ranking(
+        team_ids: Sequence[UUID],
+        scores: np.ndarray,
+        weights: np.ndarray,
+        iterations: int,
+        confidence: float
+) -> List[Dict]:
+    """
+    :param scores: Тензор судья x команда x критерий, NaN - оценки нет
+    :return: Строки рейтинга в порядке мест
+    """
+    judge_scores = normalize_scores(scores, weights)
+    evaluations_count = np.sum(~np.isnan(judge_scores), axis=0)
+    normalized = np.divide(
+        np.nansum(judge_scores, axis=0), evaluations_count,
+        out=np.full(len(team_ids), np.nan), where=evaluations_count > 0
+    )
+    raw_total = np.nansum(scores, axis=(0, 2))
+    ranks = rank_descending(normalized)
+    intervals = bootstrap_rank_intervals(judge_scores, iterations, confidence)
+
+    rows = [
+        {
+            "team_id": team_ids[t],
+            "rank": int(ranks[t]),
+            "normalized_score": None if np.isnan(normalized[t]) else round(float(normalized[t]), 4),
+            "raw_total_score": float(raw_total[t]),
+            "evaluations_count": int(evaluations_count[t]),
+            "rank_ci_low": float(intervals[t, 0]),
+            "rank_ci_high": float(intervals[t, 1])
+        }
+        for t in range(len(team_ids))
+    ]
+    rows.sort(key=lambda row: row["rank"])
+    return rows
+
+
+async def load_normalized_ranking(session: AsyncSession) -> List[NormalizedTeamScore]:
+    """Нормализованный рейтинг команд по всем оценкам жюри"""
+    result = await session.execute(
+        select(
+            TeamEvaluation.judge_id,
+            TeamEvaluation.team_id,
+            *(getattr(TeamEvaluation, criterion) for criterion in CRITERIA)
+        )
+    )
+    evaluations = result.all()
+    if not evaluations:
+        return []
+
+    judge_index: Dict[UUID, int] = {}
+    team_index: Dict[UUID, int] = {}
+    for judge_id, team_id, *_ in evaluations:
+        judge_index.setdefault(judge_id, len(judge_index))
+        team_index.setdefault(team_id, len(team_index))
+
+    scores = np.full((len(judge_index), len(team_index), len(CRITERIA)), np.nan)
+    rows = np.array([[judge_index[e[0]], team_index[e[1]]] for e in evaluations])
+    scores[rows[:, 0], rows[:, 1]] = np.array([e[2:] for e in evaluations], dtype=float)
+
+    team_ids = list(team_index)
+    ranking = await asyncio.to_thread(
+        compute_normalized_ranking,
+        team_ids,
+        scores,
+        np.asarray(settings.evaluation_criterion_weights, dtype=float),
+        settings.ranking_bootstrap_iterations,
+        settings.ranking_confidence_level
+    )
+
+    result = await session.execute(
+        select(Team.id, Team.team_name, Team.team_motto).where(Team.id.in_(team_ids))
+    )
+    teams = {team_id: (team_name, team_motto) for team_id, team_name, team_motto in result}
+
+    return [
+        NormalizedTeamScore(
+            team_name=teams[row["team_id"]][0],
+            team_motto=teams[row["team_id"]][1],
+            **row
+        )
+        for row in ranking
+        if row["team_id"] in teams
+    ]
+
+
+class NormalizedRankingCache:
+    """Нормализованный рейтинг в памяти воркера до следующей записи оценки"""
+
+    def __init__(self):
+        self.enabled = False
+        self._ranking: Optional[List[NormalizedTeamScore]] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._ranking = None
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.invalidate()
+        self.enabled = enabled
+
+    async def get(self, session: AsyncSession) -> List[NormalizedTeamScore]:
+        if self.enabled and self._ranking is not None:
+            return self._ranking
+
+        async with self._lock:
+            if self.enabled and self._ranking is not None:
+                return self._ranking
+
+            version = self._version
+            ranking = await load_normalized_ranking(session)
+            if self.enabled and version == self._version:
+                self._ranking = ranking
+            return ranking
+
+
+normalized_ranking_cache = NormalizedRankingCache()
+
+db_event_listener.subscribe(
+    LEADERBOARD_CHANGED_CHANNEL,
+    normalized_ranking_cache.invalidate,
+    normalized_ranking_cache.set_enabled
+)
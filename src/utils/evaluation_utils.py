@@ -0,0 +1,71 @@
+import uuid
+from typing import List
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Team, TeamEvaluation
+from src.schemas.evaluation import TeamEvaluationCreate, TeamEvaluationResponse
+
+CRITERIA = ["criterion_1", "criterion_2", "criterion_3", "criterion_4", "criterion_5"]
+
+
+async def upsert_evaluations(
+        session: AsyncSession,
+        judge_id: uuid.UUID,
+        evaluations: List[TeamEvaluationCreate]
+) -> List[TeamEvaluationResponse]:
+    """
+    Сохраняет оценки члена жюри одним запросом INSERT ... ON CONFLICT (team_id, judge_id) DO UPDATE,
+    названия команд для ответа берутся в том же запросе.
+    Каждая команда должна встречаться в evaluations не более одного раза.
+
+    :raises: IntegrityError если команды не существует
+    :return: Сохраненные оценки
+    """
+    if not evaluations:
+        return []
+
+    stmt = insert(TeamEvaluation).values([
+        {
+            "id": uuid.uuid4(),
+            "team_id": evaluation.team_id,
+            "judge_id": judge_id,
+            **{criterion: getattr(evaluation, criterion) for criterion in CRITERIA},
+            "created_at": func.now()
+        }
+        for evaluation in evaluations
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_team_evaluations_team_judge",
+        set_={
+            **{criterion: getattr(stmt.excluded, criterion) for criterion in CRITERIA},
+            "updated_at": func.now()
+        }
+    )
+    upserted = stmt.returning(*TeamEvaluation.__table__.c).cte("upserted")
+
+    result = await session.execute(
+        select(upserted, Team.team_name, Team.team_motto)
+        .join(Team, Team.id == upserted.c.team_id)
+    )
+
+    return [
+        TeamEvaluationResponse(
+            id=row.id,
+            team_id=row.team_id,
+            team_name=row.team_name,
+            team_motto=row.team_motto,
+            judge_id=row.judge_id,
+            criterion_1=row.criterion_1,
+            criterion_2=row.criterion_2,
+            criterion_3=row.criterion_3,
+            criterion_4=row.criterion_4,
+            criterion_5=row.criterion_5,
+            total_score=sum(getattr(row, criterion) for criterion in CRITERIA),
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+        for row in result
+    ]
@@ -0,0 +1,324 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, status
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from src.settings import settings
+
+MAX_RANGES = 16
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while block := file.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ContentHashCache:
+    """
+    SHA-256 файлов для строгих ETag. Считается один раз на версию файла (путь, inode, размер, mtime)
+    в пуле потоков; одновременные запросы одного файла ждут один и тот же расчет.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._hashes: "OrderedDict[tuple, asyncio.Future]" = OrderedDict()
+
+    async def get(self, path: str, stat: os.stat_result) -> str:
+        key = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        future = self._hashes.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, file_sha256, path)
+            self._hashes[key] = future
+            while len(self._hashes) > self.max_size:
+                self._hashes.popitem(last=False)
+        else:
+            self._hashes.move_to_end(key)
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self._hashes.pop(key, None)
+            raise
+
+
+content_hash_cache = ContentHashCache(max_size=settings.file_serving_hash_cache_size)
+
+
+def guess_media_type(filename: str, default: str = "application/octet-stream") -> str:
+    return mimetypes.guess_type(filename)[0] or default
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """Content-Disposition с ASCII-именем для старых клиентов и filename* (RFC 6266) для кириллицы"""
+    ascii_name = filename.encode("ascii", "replace").decode("ascii").replace('"', "'").replace("?", "_")
+    return f"{disposition}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def parse_range(header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Разбор заголовка Range (RFC 7233): "bytes=0-99", "bytes=100-", "bytes=-500", несколько через запятую.
+    Пересекающиеся и соседние диапазоны объединяются.
+
+    Returns:
+        list: Диапазоны (start, end) включительно или None, если заголовок нужно проигнорировать
+
+    :raises: HTTPException 416 если ни один диапазон не попадает в файл
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        start_str, sep, end_str = spec.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if start_str:
+                start = int(start_str)
+                end = int(end_str) if end_str else start + file_size
+                if end < start:
+                    return None
+            else:
+                suffix = int(end_str)
+                if suffix == 0:
+                    continue
+                start, end = max(file_size - suffix, 0), file_size - 1
+        except ValueError:
+            return None
+        if start < file_size:
+            ranges.append((start, min(end, file_size - 1)))
+
+    if not ranges:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    if len(ranges) > MAX_RANGES:
+        # Сервер вправе игнорировать слишком дробный Range и отдать файл целиком
+        return None
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """Сравнение ETag из If-None-Match (weak=True) или If-Range (строгое сравнение)"""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class RangeFileResponse(Response):
+    """
+    Отдача файла целиком, одним диапазоном или multipart/byteranges.
+    Тело отправляется без копирования через расширения ASGI-сервера (zerocopysend, pathsend),
+    если сервер их поддерживает, иначе читается через os.pread крупными блоками в пуле потоков.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            file_size: int,
+            ranges: Optional[List[Tuple[int, int]]],
+            media_type: str,
+            headers: dict,
+            not_found_detail: str = "Файл не найден на сервере"
+    ):
+        super().__init__(status_code=status.HTTP_206_PARTIAL_CONTENT if ranges else status.HTTP_200_OK,
+                         headers=headers)
+        self.path = path
+        self.file_size = file_size
+        self.not_found_detail = not_found_detail
+        self.chunk_size = settings.file_serving_chunk_size_bytes
+        self.parts: List[Tuple[bytes, int, int]] = []
+        self.tail = b""
+
+        if ranges is None:
+            self.parts = [(b"", 0, file_size)]
+            content_length = file_size
+            self.headers["content-type"] = media_type
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.parts = [(b"", start, end - start + 1)]
+            content_length = end - start + 1
+            self.headers["content-type"] = media_type
+            self.headers["content-range"] = f"bytes {start}-{end}/{file_size}"
+        else:
+            boundary = hashlib.md5(f"{path}{file_size}{ranges}".encode()).hexdigest()
+            for start, end in ranges:
+                part_header = (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+                ).encode("latin-1")
+                # Перевод строки перед следующей границей относится к предыдущей части
+                prefix = b"\r\n" + part_header if self.parts else part_header
+                self.parts.append((prefix, start, end - start + 1))
+            self.tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            content_length = sum(len(prefix) + count for prefix, _, count in self.parts) + len(self.tail)
+            self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+
+        self.headers["content-length"] = str(content_length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        # Файл открывается до начала ответа: если stat не выполнялся (размер взят из бд),
+        # отсутствие файла еще можно вернуть как 404
+        try:
+            file = await loop.run_in_executor(None, open, self.path, "rb")
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=self.not_found_detail)
+
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope.get("method") == "HEAD":
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            extensions = scope.get("extensions") or {}
+            if "http.response.pathsend" in extensions and self.status_code == status.HTTP_200_OK:
+                await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+                return
+
+            for prefix, offset, count in self.parts:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                if "http.response.zerocopysend" in extensions:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": True
+                    })
+                    continue
+                while count > 0:
+                    chunk = await loop.run_in_executor(None, os.pread, file.fileno(),
+                                                       min(self.chunk_size, count), offset)
+                    if not chunk:
+                        break
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                    offset += len(chunk)
+                    count -= len(chunk)
+            await send({"type": "http.response.body", "body": self.tail, "more_body": False})
+        finally:
+            await loop.run_in_executor(None, file.close)
+
+
+async def serve_file(
+        request: Request,
+        path: str,
+        filename: str,
+        media_type: str,
+        disposition: str = "attachment",
+        cache_control: str = "private, no-cache",
+        etag: Optional[str] = None,
+        not_found_detail: str = "Файл не найден на сервере",
+        size: Optional[int] = None,
+        last_modified: Optional[datetime] = None
+) -> Response:
+    """
+    Отдача файла с поддержкой Range/If-Range (RFC 7233) и условных запросов.
+    ETag строгий - SHA-256 содержимого (etag можно передать, если хэш уже известен).
+    Если известны etag, size и last_modified, файл на диске не проверяется до отправки тела.
+    Если задан file_serving_accel_redirect_prefix, тело отдает nginx через X-Accel-Redirect (sendfile),
+    диапазоны при этом тоже обрабатывает nginx.
+
+    :raises: HTTPException 404 если файла нет на диске, 416 если диапазон вне файла
+    """
+    if etag is None or size is None or last_modified is None:
+        loop = asyncio.get_running_loop()
+        try:
+            stat = await loop.run_in_executor(None, os.stat, path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+        etag = etag or await content_hash_cache.get(path, stat)
+        size = stat.st_size
+        # Время из бд может быть пустым (files.created_at nullable) - тогда Last-Modified по mtime файла
+        mtime = last_modified.timestamp() if last_modified is not None else stat.st_mtime
+    else:
+        mtime = last_modified.timestamp()
+
+    etag = f'"{etag}"'
+    headers = {
+        "accept-ranges": "bytes",
+        "cache-control": cache_control,
+        "etag": etag,
+        "last-modified": formatdate(mtime, usegmt=True),
+        "content-disposition": content_disposition(disposition, filename),
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if (if_none_match and etag_matches(if_none_match, etag, weak=True)) or (
+            not if_none_match and if_modified_since and _not_modified_since(if_modified_since, mtime)):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.file_serving_accel_redirect_prefix:
+        headers["x-accel-redirect"] = settings.file_serving_accel_redirect_prefix + quote(path.lstrip("/"))
+        return Response(media_type=media_type, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header and size > 0:
+        if_range = request.headers.get("if-range")
+        # If-Range с устаревшим валидатором - отдаем файл целиком
+        if not if_range or etag_matches(if_range, etag, weak=False) or if_range == headers["last-modified"]:
+            ranges = parse_range(range_header, size)
+
+    return RangeFileResponse(path, size, ranges, media_type, headers, not_found_detail)
+
+
+async def serve_stored_file(request: Request, file, media_type: str, **kwargs) -> Response:
+    """
+    Отдача записи File. Для файлов из хранилища блобов размер, SHA-256, MIME-тип и время берутся из бд,
+    файлы, сохраненные до хранилища, отдаются как раньше - с stat и расчетом хэша.
+    Если created_at не заполнен, Last-Modified берется из mtime файла.
+    """
+    if file.sha256 is None:
+        return await serve_file(request, file.file_path, file.filename, media_type, **kwargs)
+    return await serve_file(
+        request,
+        file.file_path,
+        file.filename,
+        file.mime_type or media_type,
+        etag=file.sha256,
+        size=file.size,
+        last_modified=file.created_at,
+        **kwargs
+    )
@@ -1,16 +1,21 @@
 import asyncio
 import os
-import tempfile
-import shutil
 import uuid
 from typing import Optional
 from fastapi import HTTPException, status
 
 from src.models import FileType, FileOwnerType, File as DBFile
+from src.settings import settings
+from src.utils.blob_store import blob_store
+from src.utils.multipart_stream import FileField
 from src.utils.router_states import file_router_state
 
 upload_semaphore = asyncio.Semaphore(5)
 
+# Согласие, справки об обучении и с места работы
+DOCUMENT_FILE = FileField((".pdf", ".jpg", ".jpeg", ".png"), settings.upload_document_max_bytes)
+DEPLOYMENT_FILE = FileField((".txt", ".md"), settings.upload_deployment_max_bytes)
+
 async def save_file(
     upload_file,
     owner_id: uuid.UUID,
@@ -40,55 +45,33 @@ async def save_file(
             else:
                 raise ValueError(f"Неизвестный тип файла: {file_type}")
 
-            base_dir = "uploads/users" if owner_type == FileOwnerType.USER else "uploads/teams"
-            upload_dir = f"{base_dir}/{owner_id}"
-            os.makedirs(upload_dir, exist_ok=True)
-
             file_extension = os.path.splitext(upload_file.filename)[1].lower()
-            file_name = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(upload_dir, file_name)
+            if file_extension == '.pdf':
+                file_format_id = file_router_state.pdf_format_id
+            elif file_extension in ['.jpg', '.jpeg', '.png']:
+                file_format_id = file_router_state.image_format_id
+            elif file_extension == '.zip':
+                file_format_id = file_router_state.zip_format_id
+            elif file_extension == '.txt':
+                file_format_id = file_router_state.txt_format_id
+            elif file_extension == '.md':
+                file_format_id = file_router_state.md_format_id
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Неподдерживаемый формат файла: {file_extension}"
+                )
 
-            temp_file = tempfile.NamedTemporaryFile(delete=False, prefix='upload_', dir=upload_dir)
             try:
-                file_size = 0
-                chunk_size = 64 * 1024
-                
-                while chunk := await upload_file.read(chunk_size):
-                    file_size += len(chunk)
-                    if max_file_size and file_size > max_file_size:
-                        raise HTTPException(
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            detail=f"Размер файла не должен превышать {max_file_size/(1024*1024)}MB"
-                        )
-                    temp_file.write(chunk)
-                    await asyncio.sleep(0)
-
-                temp_file.close()
-
-                shutil.move(temp_file.name, file_path)
-
-                if file_extension == '.pdf':
-                    file_format_id = file_router_state.pdf_format_id
-                elif file_extension in ['.jpg', '.jpeg', '.png']:
-                    file_format_id = file_router_state.image_format_id
-                elif file_extension == '.zip':
-                    file_format_id = file_router_state.zip_format_id
-                elif file_extension == '.txt':
-                    file_format_id = file_router_state.txt_format_id
-                elif file_extension == '.md':
-                    file_format_id = file_router_state.md_format_id
-                else:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Неподдерживаемый формат файла: {file_extension}"
-                    )
+                stored = await blob_store.store_upload(upload_file, max_file_size, prefix='upload_')
 
                 file_model = DBFile(
                     id=uuid.uuid4(),
                     filename=upload_file.filename,
-                    file_path=file_path,
+                    file_path=stored.storage_path,
+                    sha256=stored.sha256,
+                    size=stored.size,
+                    mime_type=stored.mime_type,
                     file_format_id=file_format_id,
                     file_type_id=file_type_id,
                     owner_type_id=owner_type_id,
@@ -99,10 +82,6 @@ async def save_file(
                 return file_model
 
             except Exception as e:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Ошибка при сохранении файла: {str(e)}"
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Team, TeamEvaluation, TeamScore
+from src.schemas.evaluation import TeamTotalScore
+from src.settings import settings
+from src.utils.db_events import db_event_listener, notify
+from src.utils.file_serving import etag_matches
+
+LEADERBOARD_CHANGED_CHANNEL = "leaderboard_changed"
+
+TOTAL_SCORE = (
+    TeamEvaluation.criterion_1 +
+    TeamEvaluation.criterion_2 +
+    TeamEvaluation.criterion_3 +
+    TeamEvaluation.criterion_4 +
+    TeamEvaluation.criterion_5
+)
+
+
+def _team_scores_query(team_ids: Optional[Iterable[UUID]] = None):
+    """Итог команды по оценкам жюри (одна оценка на пару команда-судья)"""
+    query = (
+        select(
+            TeamEvaluation.team_id,
+            func.sum(TOTAL_SCORE).label('total_score'),
+            func.count().label('evaluations_count')
+        )
+        .group_by(TeamEvaluation.team_id)
+    )
+    if team_ids is not None:
+        query = query.where(TeamEvaluation.team_id.in_(list(team_ids)))
+    return query
+
+
+def _team_score_lock_key(team_id: UUID):
+    return func.hashtext(f"team_score:{team_id}")
+
+
+async def lock_team_scores(session: AsyncSession, team_ids: Iterable[UUID]) -> None:
+    """
+    Блокирует итоги команд до конца транзакции (advisory lock).
+    Вызывается до записи оценок: иначе две транзакции, одновременно оценивающие одну команду,
+    пересчитывают итог каждая без чужой незафиксированной оценки, и одна из оценок теряется.
+    Команды блокируются в порядке id, чтобы пакеты оценок не блокировали друг друга взаимно.
+    """
+    for team_id in sorted(set(team_ids)):
+        await session.execute(select(func.pg_advisory_xact_lock(_team_score_lock_key(team_id))))
+
+
+async def refresh_team_scores(session: AsyncSession, team_ids: Iterable[UUID]) -> None:
+    """
+    Пересчитывает строки лидерборда указанных команд одним INSERT ... SELECT ... ON CONFLICT
+    и оповещает воркеры. Вызывается в транзакции, записывающей оценки, до commit;
+    перед записью оценок транзакция должна взять lock_team_scores для тех же команд.
+    """
+    stmt = insert(TeamScore).from_select(
+        ['team_id', 'total_score', 'evaluations_count'],
+        _team_scores_query(team_ids)
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[TeamScore.team_id],
+            set_={
+                "total_score": stmt.excluded.total_score,
+                "evaluations_count": stmt.excluded.evaluations_count,
+                "updated_at": func.now()
+            }
+        )
+    )
+    await notify(session, LEADERBOARD_CHANGED_CHANNEL)
+
+
+async def refresh_team_score(session: AsyncSession, team_id: UUID) -> None:
+    """Пересчитывает строку лидерборда одной команды"""
+    await refresh_team_scores(session, [team_id])
+
+
+async def rebuild_leaderboard(session: AsyncSession) -> None:
+    """Полный пересчет лидерборда (при старте приложения)"""
+    await session.execute(delete(TeamScore))
+    await session.execute(
+        insert(TeamScore).from_select(
+            ['team_id', 'total_score', 'evaluations_count'],
+            _team_scores_query()
+        )
+    )
+    await notify(session, LEADERBOARD_CHANGED_CHANNEL)
+    await session.commit()
+
+
+async def render_leaderboard(session: AsyncSession) -> Tuple[bytes, str]:
+    """
+    Лидерборд в виде готового JSON
+
+    Returns:
+        tuple: (JSON лидерборда, ETag)
+    """
+    result = await session.execute(
+        select(
+            Team.id,
+            Team.team_name,
+            Team.team_motto,
+            TeamScore.total_score,
+            TeamScore.evaluations_count
+        )
+        .join(TeamScore, TeamScore.team_id == Team.id)
+        .where(TeamScore.evaluations_count > 0)
+        .order_by(TeamScore.total_score.desc(), Team.team_name)
+    )
+    results = [
+        TeamTotalScore(
+            team_id=team_id,
+            team_name=team_name,
+            team_motto=team_motto,
+            average_score=total_score / evaluations_count,
+            evaluations_count=evaluations_count,
+            total_score=total_score
+        ).model_dump(mode="json")
+        for team_id, team_name, team_motto, total_score, evaluations_count in result
+    ]
+    body = json.dumps(results, ensure_ascii=False).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return body, etag
+
+
+class LeaderboardCache:
+    """
+    Готовый JSON лидерборда и его ETag в памяти воркера.
+    Сбрасывается по уведомлению leaderboard_changed; пока подписки нет,
+    кэш живет не дольше ttl.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.enabled = False
+        self._entry: Optional[Tuple[bytes, str]] = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entry = None
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.invalidate()
+        self.enabled = enabled
+
+    def _cached(self) -> Optional[Tuple[bytes, str]]:
+        if self._entry is None:
+            return None
+        ttl = self.ttl if self.enabled else min(self.ttl, 1)
+        if time.monotonic() - self._loaded_at >= ttl:
+            return None
+        return self._entry
+
+    async def get(self, session: AsyncSession) -> Tuple[bytes, str]:
+        """
+        Returns:
+            tuple: (JSON лидерборда, ETag)
+        """
+        entry = self._cached()
+        if entry is not None:
+            return entry
+
+        async with self._lock:
+            # Пока ждали блокировку, лидерборд мог загрузить другой запрос
+            entry = self._cached()
+            if entry is not None:
+                return entry
+
+            version = self._version
+            entry = await render_leaderboard(session)
+            if version == self._version:
+                self._entry = entry
+                self._loaded_at = time.monotonic()
+            return entry
+
+
+leaderboard_cache = LeaderboardCache(ttl=settings.leaderboard_cache_ttl_seconds)
+
+db_event_listener.subscribe(LEADERBOARD_CHANGED_CHANNEL, leaderboard_cache.invalidate, leaderboard_cache.set_enabled)
+
+
+async def leaderboard_response(request: Request, session: AsyncSession) -> Response:
+    """Ответ с лидербордом из кэша, 304 если у клиента актуальная версия"""
+    body, etag = await leaderboard_cache.get(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
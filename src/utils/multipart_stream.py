@@ -0,0 +1,260 @@
+import hashlib
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from src.settings import settings
+from src.utils.upload_writer import UploadStream, upload_writer
+
+
+class FileField(NamedTuple):
+    """Ожидаемый файл multipart запроса: допустимые расширения имени (в нижнем регистре) и лимит размера"""
+    extensions: Tuple[str, ...]
+    max_size: int
+
+
+class StreamedFile:
+    """
+    Файл из multipart запроса, записанный на диск прямо во время чтения тела запроса.
+    Лежит во временном файле, SHA-256 считается во время записи - store_upload переносит файл
+    в хранилище блобов без повторного чтения.
+    """
+
+    def __init__(self, field_name: str, filename: str, content_type: str, stream: UploadStream):
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.stream = stream
+
+    @property
+    def size(self) -> int:
+        return self.stream.size
+
+    @property
+    def sha256(self) -> str:
+        return self.stream.digest.hexdigest()
+
+    async def discard(self) -> None:
+        await self.stream.discard()
+
+
+class StreamedForm:
+    """Текстовые поля и файлы multipart запроса"""
+
+    def __init__(self, fields: Dict[str, str], files: Dict[str, StreamedFile]):
+        self.fields = fields
+        self.files = files
+
+    def field(self, name: str, required: bool = True) -> Optional[str]:
+        value = self.fields.get(name)
+        if value is None and required:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Не заполнено поле {name}"
+            )
+        return value
+
+    def file(self, name: str) -> StreamedFile:
+        upload = self.files.get(name)
+        if upload is None or not upload.filename:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Не передан файл {name}"
+            )
+        return upload
+
+    async def discard(self) -> None:
+        """Удаляет файлы, которые не были перенесены в хранилище"""
+        for upload in self.files.values():
+            await upload.discard()
+
+
+def multipart_openapi(fields: List[str], files: List[str], optional_fields: List[str] = ()) -> dict:
+    """Описание multipart тела запроса для OpenAPI (тело читается вручную и FastAPI его не видит)"""
+    properties = {name: {"type": "string"} for name in [*fields, *optional_fields]}
+    properties.update({name: {"type": "string", "format": "binary"} for name in files})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": properties,
+                        "required": [*fields, *files]
+                    }
+                }
+            }
+        }
+    }
+
+
+class _MultipartStreamParser:
+    """
+    Потоковый разбор multipart/form-data.
+    python-multipart вызывает callbacks синхронно внутри parser.write, поэтому события копятся в списке
+    и обрабатываются асинхронно после каждого прочитанного из сокета куска - так запись файла на диск
+    идет через UploadWriter, не блокируя event loop.
+    """
+
+    def __init__(self, directory: str, file_fields: Dict[str, FileField], max_field_size: int, prefix: str):
+        self.directory = directory
+        self.file_fields = file_fields
+        self.max_field_size = max_field_size
+        self.prefix = prefix
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, StreamedFile] = {}
+        self._events: List[Tuple[str, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._name = ""
+        self._value = bytearray()
+        self._file: Optional[StreamedFile] = None
+        self.complete = False
+
+    def callbacks(self) -> dict:
+        def data_callback(event: str):
+            def callback(data: bytes, start: int, end: int) -> None:
+                self._events.append((event, data[start:end]))
+            return callback
+
+        def notify_callback(event: str):
+            def callback() -> None:
+                self._events.append((event, b""))
+            return callback
+
+        return {
+            "on_part_begin": notify_callback("part_begin"),
+            "on_header_field": data_callback("header_field"),
+            "on_header_value": data_callback("header_value"),
+            "on_header_end": notify_callback("header_end"),
+            "on_headers_finished": notify_callback("headers_finished"),
+            "on_part_data": data_callback("part_data"),
+            "on_part_end": notify_callback("part_end"),
+            "on_end": notify_callback("end"),
+        }
+
+    async def process_events(self) -> None:
+        events, self._events = self._events, []
+        for event, data in events:
+            if event == "part_begin":
+                self._headers = {}
+                self._value = bytearray()
+                self._file = None
+            elif event == "header_field":
+                self._header_field += data
+            elif event == "header_value":
+                self._header_value += data
+            elif event == "header_end":
+                self._headers[self._header_field.lower()] = self._header_value
+                self._header_field = b""
+                self._header_value = b""
+            elif event == "headers_finished":
+                await self._start_part()
+            elif event == "part_data":
+                if self._file is not None:
+                    await self._file.stream.write(data)
+                else:
+                    self._value += data
+                    if len(self._value) > self.max_field_size:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Слишком длинное значение поля {self._name}"
+                        )
+            elif event == "part_end":
+                if self._file is not None:
+                    await self._file.stream.close()
+                else:
+                    self.fields[self._name] = self._value.decode("utf-8")
+            elif event == "end":
+                self.complete = True
+
+    async def _start_part(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный multipart запрос: у части нет имени"
+            )
+        self._name = options[b"name"].decode("utf-8")
+        if b"filename" not in options:
+            return
+
+        if self._name not in self.file_fields or self._name in self.files:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неожиданный файл в поле {self._name}"
+            )
+        # Формат проверяется по заголовку части, до записи первого байта на диск.
+        # Пустое имя - файл не выбран, такую часть отклонит StreamedForm.file
+        field = self.file_fields[self._name]
+        filename = options[b"filename"].decode("utf-8")
+        if filename and os.path.splitext(filename.lower())[1] not in field.extensions:
+            formats = ", ".join(extension.lstrip(".").upper() for extension in field.extensions)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Файл в поле {self._name} должен быть в формате {formats}"
+            )
+        stream = await upload_writer.open(
+            self.directory,
+            self.prefix,
+            field.max_size,
+            digest=hashlib.sha256()
+        )
+        self._file = StreamedFile(
+            field_name=self._name,
+            filename=filename,
+            content_type=self._headers.get(b"content-type", b"").decode("latin-1"),
+            stream=stream
+        )
+        self.files[self._name] = self._file
+
+
+async def parse_multipart_stream(
+        request: Request,
+        directory: str,
+        file_fields: Dict[str, FileField],
+        prefix: str = "upload_"
+) -> StreamedForm:
+    """
+    Читает multipart/form-data тело запроса и пишет файлы сразу во временные файлы в directory,
+    без промежуточного SpooledTemporaryFile Starlette. Принимаются только файлы из file_fields:
+    файл недопустимого формата отклоняется до записи на диск, превышение лимита обрывает чтение
+    запроса сразу, а не после загрузки всего тела.
+
+    :raises: HTTPException 400 при некорректном теле или формате файла, 413 при превышении размера файла
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ожидается multipart/form-data"
+        )
+
+    os.makedirs(directory, exist_ok=True)
+    stream_parser = _MultipartStreamParser(directory, file_fields, settings.upload_max_field_size_bytes, prefix)
+    form = StreamedForm(stream_parser.fields, stream_parser.files)
+    parser = MultipartParser(options[b"boundary"], stream_parser.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await stream_parser.process_events()
+        parser.finalize()
+        await stream_parser.process_events()
+        if not stream_parser.complete:
+            raise MultipartParseError("тело запроса оборвано")
+    except BaseException as e:
+        await form.discard()
+        if isinstance(e, (MultipartParseError, UnicodeDecodeError)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Некорректный multipart запрос: {str(e)}"
+            )
+        raise
+
+    return form
+
@@ -0,0 +1,106 @@
+import base64
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import Select
+
+from src.settings import settings
+
+
+class Keyset:
+    """
+    Пагинация по ключу сортировки (keyset): страница начинается сразу после последней строки
+    предыдущей, поэтому дальние страницы стоят столько же, сколько первая.
+    Последний столбец ключа должен быть уникальным (id), все столбцы сортируются в одну сторону.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def encode(self, row: Any) -> str:
+        values = [getattr(row, column.key) for column in self.columns]
+        payload = json.dumps([
+            value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, uuid.UUID) else value
+            for value in values
+        ])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(payload)
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError
+            return [self._parse(column, value) for column, value in zip(self.columns, values)]
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор"
+            )
+
+    @staticmethod
+    def _parse(column, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column.type, UUID):
+            return uuid.UUID(value)
+        return value
+
+    def order_by(self) -> List:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def apply(self, query: Select, cursor: Optional[str], limit: int) -> Select:
+        """Сортировка, продолжение после cursor и limit + 1 строка для определения следующей страницы"""
+        if cursor:
+            key = tuple_(*self.columns)
+            values = tuple_(*self.decode(cursor))
+            query = query.where(key < values if self.descending else key > values)
+        return query.order_by(*self.order_by()).limit(limit + 1)
+
+    def page(self, rows: Sequence, limit: int) -> Tuple[Sequence, Optional[str]]:
+        """
+        Returns:
+            tuple: (строки страницы, курсор следующей страницы или None)
+        """
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, self.encode(rows[-1])
+        return rows, None
+
+
+class CountCache:
+    """
+    Кэш количества строк для списков с пагинацией.
+    Общее количество не пересчитывается на каждой странице, а берется из кэша на ttl секунд.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._values: Dict[Hashable, Tuple[float, int]] = {}
+
+    async def get(self, key: Hashable, count: Callable[[], Awaitable[int]]) -> int:
+        now = time.monotonic()
+        cached = self._values.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        value = await count()
+        if len(self._values) >= self.max_size:
+            self._values = {k: v for k, v in self._values.items() if now - v[0] < self.ttl}
+            if len(self._values) >= self.max_size:
+                self._values.clear()
+        self._values[key] = (now, value)
+        return value
+
+
+count_cache = CountCache(ttl=settings.pagination_count_cache_ttl_seconds)
@@ -0,0 +1,35 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+
+def _default(obj: Any) -> Any:
+    """Типы, которые orjson не сериализует сам (UUID, datetime и enum он кодирует нативно)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Быстрый JSON ответ для больших списков.
+    Эндпоинт возвращает этот ответ сам, поэтому FastAPI не прогоняет результат
+    через повторную валидацию response_model и jsonable_encoder:
+    уже собранные схемы и строки запроса сразу кодируются в байты через orjson.
+    response_model при этом остается для документации.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
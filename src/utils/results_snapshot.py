@@ -0,0 +1,166 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import brotli
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.enums import StageType
+from src.settings import settings
+from src.utils.db_events import db_event_listener
+from src.utils.file_serving import etag_matches
+from src.utils.leaderboard import render_leaderboard, leaderboard_response
+from src.utils.router_states import stage_router_state
+from src.utils.stage_events import STAGE_CHANGED_CHANNEL
+
+CURRENT_POINTER = "current"
+
+# Этапы, на которых публичные результаты отдаются из снимка
+PUBLISHED_STAGES = {StageType.RESULTS_PUBLICATION.value, StageType.AWARD_CEREMONY.value}
+
+# Content-Encoding -> расширение файла снимка
+ENCODINGS = {
+    "br": ".json.br",
+    "gzip": ".json.gz",
+}
+
+
+class ResultsSnapshot:
+    """Замороженные публичные результаты: JSON и его сжатые копии"""
+
+    def __init__(self, version: str, variants: Dict[Optional[str], bytes]):
+        self.version = version
+        self.etag = f'"{version}"'
+        self.variants = variants
+
+    def select(self, accept_encoding: str) -> Optional[str]:
+        """Лучшее сжатие, которое принимает клиент (None - без сжатия)"""
+        accepted = {
+            encoding.split(";")[0].strip().lower()
+            for encoding in accept_encoding.split(",")
+            if encoding.strip() and not encoding.strip().endswith("q=0")
+        }
+        for encoding in ENCODINGS:
+            if encoding in accepted and encoding in self.variants:
+                return encoding
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_snapshot(directory: Path, body: bytes) -> str:
+    directory.mkdir(parents=True, exist_ok=True)
+    version = hashlib.sha256(body).hexdigest()[:16]
+
+    _write_atomic(directory / f"{version}.json", body)
+    _write_atomic(directory / f"{version}{ENCODINGS['gzip']}", gzip.compress(body, compresslevel=9, mtime=0))
+    _write_atomic(directory / f"{version}{ENCODINGS['br']}", brotli.compress(body, quality=11))
+    # Указатель переключается последним, когда все файлы версии уже на диске
+    _write_atomic(directory / CURRENT_POINTER, version.encode())
+    return version
+
+
+def _read_snapshot(directory: Path) -> Optional[ResultsSnapshot]:
+    try:
+        version = (directory / CURRENT_POINTER).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+    variants: Dict[Optional[str], bytes] = {None: (directory / f"{version}.json").read_bytes()}
+    for encoding, suffix in ENCODINGS.items():
+        path = directory / f"{version}{suffix}"
+        if path.exists():
+            variants[encoding] = path.read_bytes()
+    return ResultsSnapshot(version, variants)
+
+
+class ResultsSnapshotStore:
+    """
+    Снимок публичных результатов, замораживаемый при переходе на этап публикации результатов.
+    Файлы версии лежат в directory, воркеры держат текущую версию в памяти
+    и перечитывают ее при смене этапа.
+    """
+
+    def __init__(self, directory: Path, max_age: int):
+        self.directory = directory
+        self.max_age = max_age
+        self._snapshot: Optional[ResultsSnapshot] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, *args) -> None:
+        self._loaded = False
+
+    async def freeze(self, session: AsyncSession) -> str:
+        """
+        Записывает новую версию снимка из текущего лидерборда.
+        Вызывается до commit смены этапа, чтобы к моменту уведомления других воркеров файлы уже были на диске.
+
+        Returns:
+            str: Версия снимка
+        """
+        body, _ = await render_leaderboard(session)
+        version = await asyncio.to_thread(_write_snapshot, self.directory, body)
+        self.invalidate()
+        logging.info(f"Публичные результаты заморожены, версия {version}")
+        return version
+
+    async def get(self) -> Optional[ResultsSnapshot]:
+        if self._loaded:
+            return self._snapshot
+        async with self._lock:
+            if not self._loaded:
+                self._snapshot = await asyncio.to_thread(_read_snapshot, self.directory)
+                self._loaded = True
+        return self._snapshot
+
+    def response(self, request: Request, snapshot: ResultsSnapshot) -> Response:
+        """Ответ со снимком в подходящем сжатии, 304 если у клиента актуальная версия"""
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding"
+        }
+        if etag_matches(request.headers.get("if-none-match", ""), snapshot.etag, weak=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        encoding = snapshot.select(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=snapshot.variants[encoding], media_type="application/json", headers=headers)
+
+
+results_snapshot_store = ResultsSnapshotStore(
+    directory=Path(settings.results_snapshot_dir),
+    max_age=settings.results_snapshot_max_age_seconds
+)
+
+db_event_listener.subscribe(STAGE_CHANGED_CHANNEL, results_snapshot_store.invalidate, results_snapshot_store.invalidate)
+
+
+async def freeze_results_if_published(session: AsyncSession, stage_type: str) -> None:
+    """Замораживает результаты, если активируется этап публикации результатов"""
+    if stage_type == StageType.RESULTS_PUBLICATION.value:
+        await results_snapshot_store.freeze(session)
+
+
+async def public_results_response(request: Request, session: AsyncSession) -> Response:
+    """После публикации результатов - замороженный снимок, до нее - текущий лидерборд"""
+    current_stage = await stage_router_state.get_current_stage(session)
+    if current_stage and current_stage.type in PUBLISHED_STAGES:
+        snapshot = await results_snapshot_store.get()
+        if snapshot:
+            return results_snapshot_store.response(request, snapshot)
+    return await leaderboard_response(request, session)
@@ -0,0 +1,414 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from apscheduler.jobstores.base import ConflictingIdError
+from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import HTTPException, Request, status
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import async_session
+from src.models import SolutionUpload, File as DBFile
+from src.schemas.solution_upload import SolutionUploadCreate
+from src.settings import settings
+from src.utils.blob_store import StoredBlob, blob_store
+from src.utils.file_serving import file_sha256, guess_media_type
+from src.utils.background_tasks import scheduler
+from src.utils.router_states import file_router_state
+from src.utils.solution_utils import SOLUTION_MAX_FILE_SIZE, remove_team_solution
+from src.utils.upload_writer import upload_writer
+
+SOLUTION_UPLOAD_CLEANUP_JOB_ID = "cleanup_solution_uploads"
+# Запас аренды сверх времени приема тела части: fsync и фиксация offset после последнего блока
+LEASE_GRACE_SECONDS = 60
+
+
+def solution_upload_response(upload: SolutionUpload) -> dict:
+    return {
+        "id": upload.id,
+        "filename": upload.filename,
+        "size": upload.total_size,
+        "offset": upload.received_size,
+        "chunk_max_size": settings.solution_upload_chunk_max_bytes,
+        "expires_at": upload.expires_at
+    }
+
+
+def _offset_conflict(upload: SolutionUpload, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail,
+        headers={"Upload-Offset": str(upload.received_size)}
+    )
+
+
+def _lease_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Часть этой загрузки уже принимается другим запросом"
+    )
+
+
+def _lease_is_free():
+    return or_(SolutionUpload.lease_expires_at.is_(None), SolutionUpload.lease_expires_at <= func.now())
+
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def create_solution_upload(
+        session: AsyncSession,
+        team_id: uuid.UUID,
+        user_id: uuid.UUID,
+        data: SolutionUploadCreate
+) -> SolutionUpload:
+    """
+    Создает сессию загрузки решения. Файл для частей создается при записи первой части.
+    Незавершенные загрузки команды при этом отменяются - у команды одна активная загрузка.
+    """
+    if not data.filename.lower().endswith('.zip'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файл решения должен быть в формате ZIP"
+        )
+    if data.size > SOLUTION_MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Размер файла не должен превышать {SOLUTION_MAX_FILE_SIZE/(1024*1024)}MB"
+        )
+
+    # Запрос, который сейчас пишет часть отменяемой загрузки, получит 404 при фиксации части
+    result = await session.execute(
+        delete(SolutionUpload)
+        .where(SolutionUpload.team_id == team_id)
+        .returning(SolutionUpload.file_path)
+    )
+    stale_paths = result.scalars().all()
+
+    upload_id = uuid.uuid4()
+    upload_dir = f"uploads/teams/{team_id}"
+    os.makedirs(upload_dir, exist_ok=True)
+    upload = SolutionUpload(
+        id=upload_id,
+        team_id=team_id,
+        user_id=user_id,
+        filename=data.filename,
+        file_path=os.path.join(upload_dir, f"upload_{upload_id}.part"),
+        total_size=data.size,
+        received_size=0,
+        sha256=data.sha256.lower() if data.sha256 else None,
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.solution_upload_ttl_seconds)
+    )
+    session.add(upload)
+    await session.commit()
+
+    await asyncio.to_thread(_remove_files, stale_paths)
+    return upload
+
+
+async def get_solution_upload(
+        session: AsyncSession,
+        team_id: uuid.UUID,
+        upload_id: uuid.UUID
+) -> SolutionUpload:
+    """
+    Активная сессия загрузки команды.
+
+    :raises: HTTPException 404 если сессии нет или она истекла
+    """
+    upload = await session.scalar(
+        select(SolutionUpload).where(
+            SolutionUpload.id == upload_id,
+            SolutionUpload.team_id == team_id,
+            SolutionUpload.expires_at > datetime.utcnow()
+        )
+    )
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Загрузка не найдена или истекла"
+        )
+    return upload
+
+
+async def claim_solution_upload(
+        session: AsyncSession,
+        team_id: uuid.UUID,
+        upload_id: uuid.UUID
+) -> SolutionUpload:
+    """
+    Захватывает активную сессию загрузки арендой (запись части, завершение) и сразу фиксирует транзакцию:
+    пока принимается тело запроса, соединение с бд возвращено в пул и блокировки не держатся.
+    Аренда оборванного запроса истекает сама через solution_upload_lease_seconds.
+
+    :raises: HTTPException 404 если сессии нет или она истекла, 409 если сессия захвачена другим запросом
+    """
+    lease_seconds = settings.solution_upload_lease_seconds + LEASE_GRACE_SECONDS
+    table = SolutionUpload.__table__
+    upload = await session.scalar(
+        select(SolutionUpload).from_statement(
+            update(table)
+            .where(
+                table.c.id == upload_id,
+                table.c.team_id == team_id,
+                table.c.expires_at > datetime.utcnow(),
+                _lease_is_free()
+            )
+            .values(lease_token=uuid.uuid4(), lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+            .returning(*table.c)
+        )
+    )
+    if upload is None:
+        await get_solution_upload(session, team_id, upload_id)
+        await session.commit()
+        raise _lease_conflict()
+
+    await session.commit()
+    return upload
+
+
+async def release_solution_upload(session: AsyncSession, upload: SolutionUpload, **values) -> None:
+    """Снимает аренду сессии загрузки, если она еще принадлежит этому запросу, и записывает values"""
+    await session.execute(
+        update(SolutionUpload)
+        .where(SolutionUpload.id == upload.id, SolutionUpload.lease_token == upload.lease_token)
+        .values(lease_token=None, lease_expires_at=None, **values)
+    )
+    await session.commit()
+
+
+async def _lost_lease(session: AsyncSession, upload: SolutionUpload) -> HTTPException:
+    """Ошибка для запроса, у которого аренду перехватили или загрузку отменили"""
+    exists = await session.scalar(select(SolutionUpload.id).where(SolutionUpload.id == upload.id))
+    await session.rollback()
+    if exists is None:
+        # Загрузку отменили во время записи: файл части мог быть создан заново уже после ее удаления
+        await asyncio.to_thread(_remove_files, [upload.file_path])
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Загрузка не найдена или истекла"
+        )
+    return _lease_conflict()
+
+
+async def write_solution_chunk(
+        session: AsyncSession,
+        upload: SolutionUpload,
+        request: Request,
+        offset: int,
+        checksum: str
+) -> None:
+    """
+    Дописывает часть из тела запроса с позиции offset и сдвигает offset загрузки.
+    Часть принимается, только если ее SHA-256 совпал с checksum.
+    Сессия должна быть захвачена через claim_solution_upload; аренда снимается в любом случае.
+
+    :raises: HTTPException 409 если offset не совпадает с принятым или все части уже приняты,
+             400 при несовпадении контрольной суммы, 408 если часть принималась дольше аренды
+    """
+    try:
+        if offset != upload.received_size:
+            raise _offset_conflict(upload, f"Ожидается часть с offset {upload.received_size}")
+        if offset >= upload.total_size:
+            raise _offset_conflict(upload, "Все части уже приняты, завершите загрузку")
+
+        remaining = upload.total_size - upload.received_size
+        digest = hashlib.sha256()
+        # Запас LEASE_GRACE_SECONDS гарантирует, что после этого срока аренда еще наша
+        deadline = time.monotonic() + settings.solution_upload_lease_seconds
+        stream = await upload_writer.open_at(
+            upload.file_path,
+            offset,
+            max_size=min(remaining, settings.solution_upload_chunk_max_bytes),
+            digest=digest
+        )
+        try:
+            async for data in request.stream():
+                if time.monotonic() > deadline:
+                    raise HTTPException(
+                        status_code=status.HTTP_408_REQUEST_TIMEOUT,
+                        detail="Часть принималась слишком долго, отправьте ее повторно меньшего размера"
+                    )
+                await stream.write(data)
+            await stream.close()
+        except BaseException:
+            await stream.release()
+            raise
+
+        # Непринятый хвост после offset отбросит open_at при записи следующей части
+        if digest.hexdigest() != checksum.lower():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Контрольная сумма части не совпадает, отправьте часть повторно"
+            )
+    except HTTPException:
+        await release_solution_upload(session, upload)
+        raise
+
+    result = await session.execute(
+        update(SolutionUpload)
+        .where(
+            SolutionUpload.id == upload.id,
+            SolutionUpload.lease_token == upload.lease_token,
+            SolutionUpload.received_size == offset
+        )
+        .values(
+            received_size=offset + stream.size,
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.solution_upload_ttl_seconds),
+            lease_token=None,
+            lease_expires_at=None
+        )
+    )
+    if result.rowcount == 0:
+        raise await _lost_lease(session, upload)
+    await session.commit()
+
+
+async def _abandon_upload(session: AsyncSession, upload: SolutionUpload) -> HTTPException:
+    """Удаляет сессию, архив которой потерян, и возвращает ошибку для клиента"""
+    await session.rollback()
+    await session.execute(delete(SolutionUpload).where(SolutionUpload.id == upload.id))
+    await session.commit()
+    await asyncio.to_thread(_remove_files, [upload.file_path])
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Архив загрузки не сохранился, начните загрузку заново"
+    )
+
+
+async def _ingest_upload(session: AsyncSession, upload: SolutionUpload) -> StoredBlob:
+    """Проверяет собранный архив и переносит его в хранилище блобов, запоминая SHA-256 в сессии загрузки"""
+    if upload.received_size != upload.total_size:
+        await release_solution_upload(session, upload)
+        raise _offset_conflict(upload, f"Загружено {upload.received_size} из {upload.total_size} байт")
+
+    try:
+        sha256 = await asyncio.to_thread(file_sha256, upload.file_path)
+    except FileNotFoundError:
+        # Прерванный запрос перенес архив, но не успел это записать
+        raise await _abandon_upload(session, upload)
+    if upload.sha256 and sha256 != upload.sha256:
+        # Части прошли проверку, но архив не совпал с заявленным - загружаем заново
+        await upload_writer.truncate(upload.file_path, 0)
+        await release_solution_upload(session, upload, received_size=0)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Контрольная сумма архива не совпадает, загрузка начата заново"
+        )
+
+    stored = await blob_store.ingest(
+        upload.file_path,
+        sha256,
+        upload.total_size,
+        guess_media_type(upload.filename, "application/zip")
+    )
+    await session.execute(
+        update(SolutionUpload)
+        .where(SolutionUpload.id == upload.id, SolutionUpload.lease_token == upload.lease_token)
+        .values(blob_sha256=stored.sha256)
+    )
+    await session.commit()
+    return stored
+
+
+async def complete_solution_upload(session: AsyncSession, upload: SolutionUpload) -> DBFile:
+    """
+    Завершает загрузку: проверяет размер и SHA-256 архива, переносит его в хранилище блобов
+    и заменяет им решение команды.
+    Архив в хранилище отмечается в сессии загрузки до замены решения, поэтому повтор после сбоя
+    на любом шаге завершает ту же загрузку.
+    Сессия должна быть захвачена через claim_solution_upload.
+
+    :raises: HTTPException 409 если приняты не все части, 400 при несовпадении SHA-256 архива,
+             410 если архив потерян и загрузку нужно начать заново
+    """
+    if upload.blob_sha256 is None:
+        # В хранилище до удаления старого решения: тот же архив мог быть загружен повторно
+        stored = await _ingest_upload(session, upload)
+    else:
+        stored = await blob_store.find(session, upload.blob_sha256)
+        if stored is None:
+            raise await _abandon_upload(session, upload)
+
+    try:
+        await remove_team_solution(session, upload.team_id)
+
+        solution_file = DBFile(
+            id=uuid.uuid4(),
+            filename=upload.filename,
+            file_path=stored.storage_path,
+            sha256=stored.sha256,
+            size=stored.size,
+            mime_type=stored.mime_type,
+            file_format_id=file_router_state.zip_format_id,
+            file_type_id=file_router_state.solution_type_id,
+            owner_type_id=file_router_state.team_owner_type_id,
+            team_id=upload.team_id
+        )
+        session.add(solution_file)
+        result = await session.execute(
+            delete(SolutionUpload)
+            .where(SolutionUpload.id == upload.id, SolutionUpload.lease_token == upload.lease_token)
+        )
+        if result.rowcount == 0:
+            raise await _lost_lease(session, upload)
+        await session.commit()
+    except Exception:
+        # Архив уже в хранилище и отмечен в сессии: снимаем аренду, чтобы повтор не ждал ее истечения
+        await session.rollback()
+        await release_solution_upload(session, upload)
+        raise
+    await session.refresh(solution_file)
+    return solution_file
+
+
+async def cleanup_expired_solution_uploads() -> int:
+    """
+    Удаляет истекшие сессии загрузки и их файлы (задача планировщика).
+    Сессии, захваченные запросом, пропускаются до следующего запуска.
+
+    Returns:
+        int: Количество удаленных сессий
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            delete(SolutionUpload)
+            .where(SolutionUpload.expires_at <= datetime.utcnow(), _lease_is_free())
+            .returning(SolutionUpload.file_path)
+        )
+        paths = result.scalars().all()
+        await session.commit()
+
+    await asyncio.to_thread(_remove_files, paths)
+    if paths:
+        logging.info(f"Удалено истекших загрузок решений: {len(paths)}")
+    return len(paths)
+
+
+def _add_cleanup_job() -> None:
+    try:
+        scheduler.add_job(
+            cleanup_expired_solution_uploads,
+            trigger=IntervalTrigger(seconds=settings.solution_upload_cleanup_interval_seconds),
+            id=SOLUTION_UPLOAD_CLEANUP_JOB_ID,
+            name="Cleanup expired solution uploads",
+            replace_existing=True
+        )
+    except ConflictingIdError:
+        # Задачу одновременно добавил другой воркер
+        pass
+
+
+async def schedule_solution_upload_cleanup() -> None:
+    """Регистрирует периодическую очистку истекших загрузок (выполняет лидер планировщика)"""
+    # Хранилище задач синхронное, работаем с ним вне event loop
+    await asyncio.to_thread(_add_cleanup_job)
@@ -1,3 +1,4 @@
+from typing import NamedTuple, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -113,6 +114,14 @@ class UserStatusState:
         self.need_update_status_id = enum_data.get_user_status_id(UserStatus.NEED_UPDATE)
 
 
+class CurrentStage(NamedTuple):
+    """Снимок активного этапа"""
+    id: UUID
+    name: str
+    type: str
+    order: int
+
+
 class StageRouterState:
     def __init__(self):
         self.registration_stage_id: UUID = None
@@ -125,6 +134,11 @@ class StageRouterState:
         self.award_ceremony_stage_id: UUID = None
         self.current_stage_id: UUID = None
         self.current_stage_order: int = None
+        self.current_stage: Optional[CurrentStage] = None
+        # Кэш текущего этапа используется только пока есть подписка на смену этапа (LISTEN)
+        self.cache_enabled: bool = False
+        self._cache_loaded: bool = False
+        self._cache_version: int = 0
 
     async def initialize(self, session: AsyncSession):
         """Инициализация ID этапов при старте приложения"""
@@ -139,13 +153,41 @@ class StageRouterState:
         self.results_publication_stage_id = enum_data.get_stage_id(StageType.RESULTS_PUBLICATION)
         self.award_ceremony_stage_id = enum_data.get_stage_id(StageType.AWARD_CEREMONY)
 
+        await self.refresh(session)
+
+    async def refresh(self, session: AsyncSession) -> Optional["CurrentStage"]:
+        """Перечитать текущий этап из бд"""
+        version = self._cache_version
         result = await session.execute(
             select(Stage).where(Stage.is_active == True)
         )
-        current_stage = result.scalar_one_or_none()
-        if current_stage:
-            self.current_stage_id = current_stage.id
-            self.current_stage_order = current_stage.order
+        stage = result.scalar_one_or_none()
+
+        current_stage = CurrentStage(
+            id=stage.id,
+            name=stage.name,
+            type=stage.type,
+            order=stage.order
+        ) if stage else None
+
+        # Пока шел запрос, этап мог смениться - тогда результат не кэшируем
+        if version == self._cache_version:
+            self.current_stage = current_stage
+            self.current_stage_id = current_stage.id if current_stage else None
+            self.current_stage_order = current_stage.order if current_stage else None
+            self._cache_loaded = True
+        return current_stage
+
+    def invalidate(self) -> None:
+        """Сбросить кэш текущего этапа (этап сменился в этом или другом воркере)"""
+        self._cache_version += 1
+        self._cache_loaded = False
+
+    async def get_current_stage(self, session: AsyncSession) -> Optional["CurrentStage"]:
+        """Текущий этап из кэша, при отсутствии актуального кэша - из бд"""
+        if self.cache_enabled and self._cache_loaded:
+            return self.current_stage
+        return await self.refresh(session)
 
     async def get_current_stage_order(self, session: AsyncSession) -> int:
         """Получить порядковый номер текущего этапа"""
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.settings import settings
+from src.utils.background_tasks import scheduler
+
+SCHEDULER_LOCK_NAME = "hackathon_scheduler"
+SCHEDULER_WAKEUP_CHANNEL = "scheduler_wakeup"
+
+
+async def notify_scheduler_changed(session: AsyncSession) -> None:
+    """
+    Будит планировщик лидера после изменения задач из другого воркера.
+    Как и любой NOTIFY, доставляется после commit.
+    """
+    await session.execute(select(func.pg_notify(SCHEDULER_WAKEUP_CHANNEL, "")))
+
+
+class SchedulerLeader:
+    """
+    Выбор воркера, выполняющего задачи планировщика.
+    Во всех воркерах планировщик запущен на паузе: добавлять и менять задачи можно из любого,
+    а выполняет их только владелец advisory lock в Postgres.
+    Блокировка держится отдельным соединением: если лидер падает, соединение закрывается,
+    Postgres снимает блокировку и ее забирает другой воркер при следующей попытке.
+    """
+
+    def __init__(self, scheduler: AsyncIOScheduler, dsn: str, lease_check_interval: float, enabled: bool):
+        self.scheduler = scheduler
+        self.dsn = dsn
+        self.lease_check_interval = lease_check_interval
+        self.enabled = enabled
+        self.is_leader = False
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_elected: Optional[Callable[[], Awaitable[None]]] = None
+
+    def start(self, on_elected: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        :param on_elected: Вызывается каждый раз, когда воркер становится лидером
+        """
+        self._on_elected = on_elected
+        if not self.enabled:
+            # Один воркер - выполняет задачи сам
+            self.scheduler.start()
+            self.is_leader = True
+            if on_elected:
+                asyncio.create_task(self._elected())
+            return
+
+        self.scheduler.start(paused=True)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release()
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+    def _on_wakeup(self, connection, pid, channel, payload) -> None:
+        if self.is_leader:
+            self.scheduler.wakeup()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._connection is None:
+                    self._connection = await asyncpg.connect(self.dsn)
+
+                if not self.is_leader:
+                    acquired = await self._connection.fetchval(
+                        "SELECT pg_try_advisory_lock(hashtext($1))", SCHEDULER_LOCK_NAME
+                    )
+                    if acquired:
+                        await self._connection.add_listener(SCHEDULER_WAKEUP_CHANNEL, self._on_wakeup)
+                        self.is_leader = True
+                        self.scheduler.resume()
+                        logging.info("Воркер стал лидером планировщика")
+                        await self._elected()
+                else:
+                    # Проверка, что соединение с блокировкой живо
+                    await self._connection.fetchval("SELECT 1", timeout=self.lease_check_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Ошибка удержания лидерства планировщика: {str(e)}")
+                await self._release()
+
+            await asyncio.sleep(self.lease_check_interval)
+
+    async def _elected(self) -> None:
+        if self._on_elected is None:
+            return
+        try:
+            await self._on_elected()
+        except Exception as e:
+            logging.error(f"Ошибка при получении лидерства планировщика: {str(e)}")
+
+    async def _release(self) -> None:
+        if self.is_leader:
+            self.is_leader = False
+            if self.scheduler.running:
+                self.scheduler.pause()
+            logging.info("Воркер больше не лидер планировщика")
+
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                # Закрытие соединения снимает advisory lock
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+
+scheduler_leader = SchedulerLeader(
+    scheduler=scheduler,
+    dsn=settings.asyncpg_dsn,
+    lease_check_interval=settings.scheduler_lease_check_seconds,
+    enabled=settings.scheduler_leader_election
+)
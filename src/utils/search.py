@@ -0,0 +1,68 @@
+from typing import Sequence
+
+from sqlalchemy import func, or_, case, text
+from sqlalchemy.sql import ColumnElement
+
+# Нормализация для поиска: нижний регистр (в том числе кириллица), ё -> е.
+# Создается до create_all, т.к. на ней построены trigram индексы моделей
+SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT translate(lower(value), 'ё', 'е') $$
+    """,
+]
+
+
+def trigram_index_expression(column_name: str):
+    """Выражение GIN trigram индекса по нормализованному столбцу"""
+    return text(f"search_normalize({column_name}) gin_trgm_ops")
+
+def normalize_search_query(query: str) -> str:
+    """Та же нормализация, что и search_normalize() в бд: нижний регистр, ё -> е, без лишних пробелов"""
+    return " ".join(query.lower().replace("ё", "е").split())
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalized(column) -> ColumnElement:
+    """Выражение, по которому построены trigram индексы (см. миграцию 006)"""
+    return func.search_normalize(column)
+
+
+def search_condition(columns: Sequence, query: str) -> ColumnElement:
+    """
+    Условие поиска по столбцам: вхождение подстроки или похожее слово
+    (опечатки, порог pg_trgm.word_similarity_threshold).
+    Оба варианта используют GIN trigram индексы по search_normalize(column).
+    """
+    value = normalize_search_query(query)
+    pattern = f"%{_escape_like(value)}%"
+    return or_(*(
+        or_(
+            normalized(column).like(pattern),
+            normalized(column).op("%>")(value)
+        )
+        for column in columns
+    ))
+
+
+def search_rank(columns: Sequence, query: str) -> ColumnElement:
+    """
+    Релевантность для сортировки: совпадение с начала строки или слова выше,
+    дальше - по похожести.
+    """
+    value = normalize_search_query(query)
+    prefix = f"{_escape_like(value)}%"
+    word_prefix = f"% {_escape_like(value)}%"
+    return func.greatest(*(
+        case(
+            (normalized(column).like(prefix), 2.0),
+            (normalized(column).like(word_prefix), 1.5),
+            else_=0.0
+        ) + func.word_similarity(value, normalized(column))
+        for column in columns
+    ))
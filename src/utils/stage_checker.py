@@ -1,12 +1,11 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models.stage import Stage
 from src.models.enums import StageType
 from typing import List, Union
-from sqlalchemy import select
+from src.utils.router_states import CurrentStage, stage_router_state
 
 
-async def check_stage(db: AsyncSession, allowed_stages: Union[StageType, List[StageType]]) -> Stage:
+async def check_stage(db: AsyncSession, allowed_stages: Union[StageType, List[StageType]]) -> CurrentStage:
     """
     Проверяет, находится ли система на допустимом этапе
 
@@ -15,10 +14,7 @@ async def check_stage(db: AsyncSession, allowed_stages: Union[StageType, List[St
     :return: Текущий активный этап
     :raises: HTTPException если текущий этап не соответствует разрешенным
     """
-    result = await db.execute(
-        select(Stage).where(Stage.is_active == True)
-    )
-    current_stage = result.scalar_one_or_none()
+    current_stage = await stage_router_state.get_current_stage(db)
 
     if not current_stage:
         raise HTTPException(
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.utils.db_events import db_event_listener, notify
+from src.utils.router_states import stage_router_state
+
+STAGE_CHANGED_CHANNEL = "stage_changed"
+
+
+async def notify_stage_changed(session: AsyncSession) -> None:
+    """Оповещает все воркеры о смене этапа (доставляется после commit)"""
+    await notify(session, STAGE_CHANGED_CHANNEL)
+
+
+def _on_connection_change(connected: bool) -> None:
+    # Кэш текущего этапа используется только пока есть подписка на смену этапа
+    stage_router_state.invalidate()
+    stage_router_state.cache_enabled = connected
+
+
+db_event_listener.subscribe(STAGE_CHANGED_CHANNEL, stage_router_state.invalidate, _on_connection_change)
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from apscheduler.jobstores.base import ConflictingIdError
+from apscheduler.triggers.date import DateTrigger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import async_session
+from src.models import Stage
+from src.utils.background_tasks import scheduler, start_stage
+
+STAGE_JOB_PREFIX = "stage_start:"
+
+
+def stage_job_id(stage_type: str) -> str:
+    return f"{STAGE_JOB_PREFIX}{stage_type}"
+
+
+async def plan_stage_transitions(session: AsyncSession) -> Dict[str, datetime]:
+    """
+    Пересчитывает задачи автоматической смены этапов по Stage.starts_at.
+    Для каждого еще не наступившего этапа с заданным временем регистрируется одна задача
+    с DateTrigger, задачи этапов без времени или уже пройденных удаляются.
+
+    Returns:
+        dict: Тип этапа -> время перехода
+    """
+    result = await session.execute(select(Stage).order_by(Stage.order))
+    stages = result.scalars().all()
+
+    current_order = next((stage.order for stage in stages if stage.is_active), None)
+    plan = {
+        stage.type: stage.starts_at
+        for stage in stages
+        if stage.starts_at is not None
+        and (current_order is None or stage.order > current_order)
+    }
+
+    # Хранилище задач синхронное, работаем с ним вне event loop
+    await asyncio.to_thread(_apply_plan, plan)
+    logging.info(f"Запланированы переходы этапов: {plan}")
+    return plan
+
+
+def _apply_plan(plan: Dict[str, datetime]) -> None:
+    planned_ids = {stage_job_id(stage_type) for stage_type in plan}
+    for job in scheduler.get_jobs():
+        if job.id.startswith(STAGE_JOB_PREFIX) and job.id not in planned_ids:
+            job.remove()
+
+    for stage_type, starts_at in plan.items():
+        job_id = stage_job_id(stage_type)
+        job = scheduler.get_job(job_id)
+        if job is not None and job.trigger.run_date == starts_at:
+            continue
+        try:
+            scheduler.add_job(
+                start_stage,
+                trigger=DateTrigger(run_date=starts_at),
+                args=[stage_type],
+                id=job_id,
+                name=f"Start stage {stage_type}",
+                replace_existing=True
+            )
+        except ConflictingIdError:
+            # Задачу одновременно добавил другой воркер
+            logging.warning(f"Задача {job_id} уже добавлена другим воркером")
+
+
+async def replan_stage_transitions() -> None:
+    """Пересчет расписания в отдельной сессии (при получении лидерства планировщика)"""
+    async with async_session() as session:
+        await plan_stage_transitions(session)
+
+
+async def get_stage_next_run_times() -> Dict[str, datetime]:
+    """Время ближайшего запуска запланированных переходов: тип этапа -> время"""
+    jobs: List = await asyncio.to_thread(scheduler.get_jobs)
+    return {
+        job.id[len(STAGE_JOB_PREFIX):]: job.next_run_time
+        for job in jobs
+        if job.id.startswith(STAGE_JOB_PREFIX)
+    }
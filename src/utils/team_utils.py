@@ -1,11 +1,164 @@
 from uuid import UUID
 
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models import Team, Stage, User, TeamMember
-from src.models.enums import StageType, UserStatus, TeamRole
-from src.utils.router_states import stage_router_state, team_router_state
-from typing import List
+from src.models import Team, Stage, User, TeamMember, TeamStatusSummary
+from src.models.enums import StageType, UserStatus
+from src.utils.router_states import stage_router_state, team_router_state, user_router_state
+from src.utils.stage_events import notify_stage_changed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ACTIVE_TEAMS_LIMIT = 20
+
+
+def _user_status_names() -> Dict[UUID, str]:
+    return {
+        user_router_state.pending_status_id: UserStatus.PENDING.value,
+        user_router_state.approved_status_id: UserStatus.APPROVED.value,
+        user_router_state.need_update_status_id: UserStatus.NEED_UPDATE.value,
+    }
+
+
+def _team_status_values(members: List[Tuple[UUID, UUID]]) -> dict:
+    """
+    Считает поля TeamStatusSummary по списку принятых участников команды (role_id, current_status_id).
+    Логика совпадает с Team.get_status / Team.get_status_details.
+    """
+    status_names = _user_status_names()
+
+    mentor_status_id = None
+    team_leader_status_id = None
+    has_mentor = False
+    has_team_leader = False
+    regular_status_ids = []
+
+    for role_id, current_status_id in members:
+        if role_id == team_router_state.mentor_role_id:
+            if not has_mentor:
+                has_mentor = True
+                mentor_status_id = current_status_id
+        elif role_id == team_router_state.teamlead_role_id:
+            if not has_team_leader:
+                has_team_leader = True
+                team_leader_status_id = current_status_id
+        elif role_id == team_router_state.member_role_id:
+            regular_status_ids.append(current_status_id)
+
+    regular_statuses = [status_names.get(status_id) for status_id in regular_status_ids]
+
+    if not has_mentor or not has_team_leader or len(regular_statuses) != 4:
+        status = "incomplete"
+    else:
+        checked = [status_names.get(mentor_status_id), status_names.get(team_leader_status_id)] + regular_statuses
+        if all(name == UserStatus.APPROVED.value for name in checked):
+            status = "active"
+        elif UserStatus.NEED_UPDATE.value in checked:
+            status = "needs_update"
+        elif UserStatus.PENDING.value in checked:
+            status = "pending"
+        else:
+            status = "invalid"
+
+    return {
+        "status": status,
+        "total_members": len(members),
+        "regular_members_count": len(regular_statuses),
+        "has_mentor": has_mentor,
+        "mentor_status": status_names.get(mentor_status_id) if has_mentor else None,
+        "has_team_leader": has_team_leader,
+        "team_leader_status": status_names.get(team_leader_status_id) if has_team_leader else None,
+        "members_approved": regular_statuses.count(UserStatus.APPROVED.value),
+        "members_pending": regular_statuses.count(UserStatus.PENDING.value),
+        "members_need_update": regular_statuses.count(UserStatus.NEED_UPDATE.value),
+    }
+
+
+async def refresh_teams_status(db: AsyncSession, team_ids: Iterable[UUID]) -> Dict[UUID, TeamStatusSummary]:
+    """
+    Пересчитывает хранимый статус указанных команд.
+    Вызывается после изменения TeamMember или User.current_status_id, до commit.
+
+    Returns:
+        dict: team_id -> обновленная запись TeamStatusSummary
+    """
+    # В порядке id: строки команд блокируются в одном порядке во всех транзакциях
+    team_ids = sorted(set(team_ids))
+    if not team_ids:
+        return {}
+
+    members_query = (
+        select(TeamMember.team_id, TeamMember.role_id, User.current_status_id)
+        .join(User, User.id == TeamMember.user_id)
+        .where(
+            TeamMember.team_id.in_(team_ids),
+            TeamMember.status_id == team_router_state.accepted_status_id
+        )
+        .order_by(TeamMember.created_at)
+    )
+    result = await db.execute(members_query)
+    members_by_team: Dict[UUID, List[Tuple[UUID, UUID]]] = {team_id: [] for team_id in team_ids}
+    for team_id, role_id, current_status_id in result:
+        members_by_team[team_id].append((role_id, current_status_id))
+
+    # Одним INSERT ... ON CONFLICT: параллельные запросы не вставляют одну и ту же команду дважды
+    table = TeamStatusSummary.__table__
+    stmt = insert(table).values([
+        {"team_id": team_id, **_team_status_values(members_by_team[team_id])}
+        for team_id in team_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.team_id],
+        set_={
+            **{
+                column.name: stmt.excluded[column.name]
+                for column in table.c
+                if column.name not in ("team_id", "updated_at")
+            },
+            "updated_at": func.now()
+        }
+    ).returning(*table.c)
+    result = await db.execute(
+        select(TeamStatusSummary).from_statement(stmt).execution_options(populate_existing=True)
+    )
+    return {summary.team_id: summary for summary in result.scalars()}
+
+
+async def refresh_team_status(db: AsyncSession, team_id: UUID) -> TeamStatusSummary:
+    """Пересчитывает хранимый статус одной команды"""
+    summaries = await refresh_teams_status(db, [team_id])
+    return summaries[team_id]
+
+
+async def refresh_user_teams_status(db: AsyncSession, user_id: UUID) -> Dict[UUID, TeamStatusSummary]:
+    """Пересчитывает статус команд, в которых пользователь является принятым участником"""
+    result = await db.execute(
+        select(TeamMember.team_id).where(
+            TeamMember.user_id == user_id,
+            TeamMember.status_id == team_router_state.accepted_status_id
+        )
+    )
+    return await refresh_teams_status(db, result.scalars().all())
+
+
+async def rebuild_team_statuses(db: AsyncSession) -> None:
+    """Полный пересчет статусов всех команд (при старте приложения)"""
+    result = await db.execute(select(Team.id))
+    await refresh_teams_status(db, result.scalars().all())
+    await db.commit()
+
+
+def active_team_ids_query():
+    """Подзапрос с ID активных команд (по индексу team_status_summaries.status)"""
+    return select(TeamStatusSummary.team_id).where(TeamStatusSummary.status == "active")
+
+
+async def get_active_teams_count(db: AsyncSession) -> int:
+    """Количество активных команд"""
+    result = await db.execute(
+        select(func.count()).select_from(TeamStatusSummary).where(TeamStatusSummary.status == "active")
+    )
+    return result.scalar_one()
 
 
 async def check_active_teams(db: AsyncSession) -> List[Team]:
@@ -14,17 +167,15 @@ async def check_active_teams(db: AsyncSession) -> List[Team]:
     """
     teams_query = (
         select(Team)
-        .outerjoin(TeamMember)
-        .outerjoin(User)
+        .join(TeamStatusSummary, TeamStatusSummary.team_id == Team.id)
+        .where(TeamStatusSummary.status == "active")
     )
 
     result = await db.execute(teams_query)
-    teams = result.unique().scalars().all()
-
-    return [team for team in teams if team.get_status() == "active"]
+    return result.scalars().all()
 
 
-async def check_and_update_registration_stage(db: AsyncSession) -> bool:
+async def check_and_update_registration_stage(db: AsyncSession, commit: bool = True) -> bool:
     """
     Проверяет количество активных команд и автоматически закрывает регистрацию,
     если достигнуто необходимое количество команд
@@ -32,16 +183,16 @@ async def check_and_update_registration_stage(db: AsyncSession) -> bool:
     Returns:
         bool: True если регистрация была закрыта, False в противном случае
     """
-    active_teams = await check_active_teams(db)
-    active_teams_count = len(active_teams)
+    active_teams_count = await get_active_teams_count(db)
+    if active_teams_count < ACTIVE_TEAMS_LIMIT:
+        return False
 
     current_stage = await db.execute(
         select(Stage).where(Stage.is_active == True)
     )
     current_stage = current_stage.scalar_one_or_none()
 
-    if (active_teams_count >= 20 and current_stage and
-            current_stage.type == StageType.REGISTRATION.value):
+    if current_stage and current_stage.type == StageType.REGISTRATION.value:
         registration_closed_stage = await db.execute(
             select(Stage).where(Stage.type == StageType.REGISTRATION_CLOSED.value)
         )
@@ -50,10 +201,14 @@ async def check_and_update_registration_stage(db: AsyncSession) -> bool:
         if registration_closed_stage:
             current_stage.is_active = False
             registration_closed_stage.is_active = True
+            await notify_stage_changed(db)
 
-            await db.commit()
+            if commit:
+                await db.commit()
+            else:
+                await db.flush()
 
-            await stage_router_state.initialize(db)
+            stage_router_state.invalidate()
 
             return True
 
@@ -62,25 +217,35 @@ async def check_and_update_registration_stage(db: AsyncSession) -> bool:
 
 async def check_team_status_after_user_update(
         db: AsyncSession,
-        user_id: UUID
-) -> None:
+        user_id: UUID,
+        commit: bool = True
+) -> bool:
     """
-    Проверяет статус команд пользователя после обновления его статуса
+    Пересчитывает статус команд пользователя после обновления его статуса
     и при необходимости обновляет этап регистрации
+
+    Returns:
+        bool: True если регистрация была закрыта, False в противном случае
     """
-    teams_query = (
-        select(Team)
-        .join(TeamMember)
+    result = await db.execute(
+        select(TeamStatusSummary.team_id, TeamStatusSummary.status)
+        .join(TeamMember, TeamMember.team_id == TeamStatusSummary.team_id)
         .where(
             TeamMember.user_id == user_id,
             TeamMember.status_id == team_router_state.accepted_status_id
         )
     )
-    result = await db.execute(teams_query)
-    teams = result.unique().scalars().all()
+    old_statuses: Dict[UUID, Optional[str]] = dict(result.all())
+
+    summaries = await refresh_user_teams_status(db, user_id)
 
-    for team in teams:
-        old_status = team.get_status()
-        if old_status != "active" and team.get_status() == "active":
-            await check_and_update_registration_stage(db)
-            break
\ No newline at end of file
+    became_active = any(
+        summary.status == "active" and old_statuses.get(team_id) != "active"
+        for team_id, summary in summaries.items()
+    )
+    if became_active:
+        return await check_and_update_registration_stage(db, commit=commit)
+
+    if commit:
+        await db.commit()
+    return False
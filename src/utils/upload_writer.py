@@ -0,0 +1,205 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from src.settings import settings
+
+
+class UploadStream:
+    """
+    Временный файл загрузки, открытый на запись через UploadWriter.
+    Данные копятся в буфере и сбрасываются на диск крупными блоками,
+    пока блок пишется - вызывающий код может читать следующий.
+    Если передан digest (объект hashlib), он обновляется записанными блоками в том же потоке.
+    """
+
+    def __init__(
+            self,
+            writer: "UploadWriter",
+            fd: int,
+            temp_path: str,
+            max_size: Optional[int] = None,
+            digest=None
+    ):
+        self.writer = writer
+        self.temp_path = temp_path
+        self.max_size = max_size
+        self.digest = digest
+        self.size = 0
+        self._fd: Optional[int] = fd
+        self._buffer = bytearray()
+        self._pending: Optional[asyncio.Future] = None
+
+    async def write(self, data: bytes) -> None:
+        """
+        :raises: HTTPException 413 если размер файла превысил max_size
+        """
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Размер файла не должен превышать {self.max_size/(1024*1024)}MB"
+            )
+        self._buffer += data
+        if len(self._buffer) >= self.writer.buffer_size:
+            # Не больше одной записи в полете на файл - порядок блоков сохраняется
+            await self._wait_pending()
+            self._pending = asyncio.ensure_future(self.writer._run(self._write_block, self._fd, self._buffer, False))
+            self._buffer = bytearray()
+
+    def _write_block(self, fd: int, data: bytearray, fsync: bool) -> None:
+        if self.digest is not None:
+            self.digest.update(data)
+        if fsync:
+            self.writer._flush(fd, data)
+        else:
+            self.writer._write(fd, data)
+
+    async def _wait_pending(self) -> None:
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    async def close(self) -> None:
+        """Дописывает буфер, выполняет fsync и закрывает файл. Файл остается по пути temp_path."""
+        await self._wait_pending()
+        await self.writer._run(self._write_block, self._fd, self._buffer, True)
+        self._buffer = bytearray()
+        # os.close освобождает дескриптор даже при ошибке - повторно его не закрываем
+        fd, self._fd = self._fd, None
+        await self.writer._run(os.close, fd)
+
+    async def release(self) -> None:
+        """Закрывает файл без дописывания буфера, файл остается на диске"""
+        if self._pending is not None:
+            # Дожидаемся записи в потоке, прежде чем закрыть дескриптор
+            await asyncio.shield(asyncio.gather(self._pending, return_exceptions=True))
+            self._pending = None
+        fd, self._fd = self._fd, None
+        await asyncio.shield(self.writer._run(self.writer._discard, fd, None))
+
+    async def discard(self) -> None:
+        """Закрывает и удаляет временный файл"""
+        await self.release()
+        await asyncio.shield(self.writer._run(self.writer._discard, None, self.temp_path))
+
+
+class UploadWriter:
+    """
+    Запись загружаемых файлов на диск без блокировки event loop.
+    Запись выполняется в отдельном пуле потоков крупными блоками (см. UploadStream).
+    Файл пишется во временный файл, в конце один раз выполняется fsync,
+    после чего хранилище блобов переносит его на место атомарным переименованием.
+    """
+
+    def __init__(self, max_workers: int, buffer_size: int, read_chunk_size: int):
+        self.max_workers = max_workers
+        self.buffer_size = buffer_size
+        self.read_chunk_size = read_chunk_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="upload-writer"
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    def _write(fd: int, data: bytearray) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
+    @classmethod
+    def _flush(cls, fd: int, data: bytearray) -> None:
+        cls._write(fd, data)
+        os.fsync(fd)
+
+    @staticmethod
+    def _discard(fd: Optional[int], temp_path: Optional[str]) -> None:
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        if temp_path is not None and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+    @staticmethod
+    def _open_at(path: str, offset: int) -> int:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            # Отбрасываем хвост незавершенной записи после offset
+            os.ftruncate(fd, offset)
+            os.lseek(fd, offset, os.SEEK_SET)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd
+
+    async def open(
+            self,
+            directory: str,
+            prefix: str = "upload_",
+            max_size: Optional[int] = None,
+            digest=None
+    ) -> UploadStream:
+        """Создает временный файл загрузки в каталоге directory"""
+        fd, temp_path = await self._run(tempfile.mkstemp, "", prefix, directory)
+        return UploadStream(self, fd, temp_path, max_size, digest)
+
+    async def open_at(self, path: str, offset: int, max_size: Optional[int] = None, digest=None) -> UploadStream:
+        """Открывает файл path на дозапись с позиции offset (всё, что дальше offset, отбрасывается)"""
+        fd = await self._run(self._open_at, path, offset)
+        return UploadStream(self, fd, path, max_size, digest)
+
+    async def truncate(self, path: str, size: int) -> None:
+        await self._run(os.truncate, path, size)
+
+    async def receive(
+            self,
+            upload_file,
+            directory: str,
+            max_file_size: Optional[int] = None,
+            prefix: str = "upload_",
+            digest=None
+    ) -> UploadStream:
+        """
+        Записывает загружаемый файл во временный файл в каталоге directory.
+        Возвращает закрытый поток: файл записан целиком, после fsync, и лежит по пути stream.temp_path.
+
+        :raises: HTTPException 413 если файл больше max_file_size
+        """
+        stream = await self.open(directory, prefix, max_file_size, digest)
+        try:
+            while chunk := await upload_file.read(self.read_chunk_size):
+                await stream.write(chunk)
+            await stream.close()
+            return stream
+        except BaseException:
+            await stream.discard()
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+upload_writer = UploadWriter(
+    max_workers=settings.upload_io_workers,
+    buffer_size=settings.upload_buffer_size_bytes,
+    read_chunk_size=settings.upload_read_chunk_size_bytes
+)
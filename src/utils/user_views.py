@@ -0,0 +1,33 @@
+from typing import List, Sequence, Type, Union
+
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload, joinedload
+
+from src.models import User
+from src.models.user import User2Roles, UserStatusHistory
+from src.schemas.user import UserView, UserResponse, UserCompactResponse
+
+USER_VIEW_SCHEMAS = {
+    UserView.COMPACT: UserCompactResponse,
+    UserView.FULL: UserResponse,
+}
+
+
+def user_load_options(view: UserView) -> list:
+    """Опции загрузки связей пользователя, нужных для представления view"""
+    if view == UserView.COMPACT:
+        # Статус - many-to-one, подтягивается тем же запросом
+        return [joinedload(User.current_status)]
+    return [
+        selectinload(User.participant_info),
+        selectinload(User.mentor_info),
+        selectinload(User.user2roles).selectinload(User2Roles.role),
+        selectinload(User.current_status),
+        selectinload(User.status_history).selectinload(UserStatusHistory.status),
+    ]
+
+
+def serialize_users(users: Sequence[User], view: UserView) -> List[Union[UserResponse, UserCompactResponse]]:
+    """Схемы ответа для пользователей, загруженных с user_load_options(view)"""
+    schema: Type[BaseModel] = USER_VIEW_SCHEMAS[view]
+    return [schema.model_validate(user) for user in users]
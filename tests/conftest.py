@@ -0,0 +1,20 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings обязательны при импорте src.settings - для тестов достаточно значений-заглушек
+for name, value in {
+    "JWT_SECRET": "test-secret",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "hackathon_test",
+    "SMTP_HOST": "localhost",
+    "SMTP_PORT": "2525",
+    "SMTP_SENDER": "noreply@example.com",
+    "BASE_URL": "http://localhost:5173",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.sql.util import find_tables
+
+from app import app
+from src.auth.jwt import create_access_token, principal_cache
+from src.auth.permissions import AuthContext
+from src.auth.principal import AuthPrincipal
+from src.db import get_session
+from src.utils.router_states import team_router_state, user_router_state
+
+
+def is_auth_query(statement) -> bool:
+    """Запросы авторизации: проверка token_version (с членствами) и загрузка членств в командах"""
+    columns = [column.name for column in statement.selected_columns]
+    tables = {table.name for table in find_tables(statement)}
+    return (
+        columns == ["token_version", "team_id", "team_role_id"]
+        or (columns == ["team_id", "role_id"] and tables == {"team_members"})
+    )
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return self.scalar_one_or_none()
+
+
+class CountingSession:
+    """Сессия без бд: запоминает выполненные запросы и отвечает по таблицам запроса"""
+
+    def __init__(self, user_id: uuid.UUID, memberships: dict, tables: dict = None):
+        self.user_id = user_id
+        self.memberships = memberships
+        self.tables = tables or {}
+        self.statements = []
+
+    @property
+    def auth_queries(self) -> int:
+        return sum(1 for statement in self.statements if is_auth_query(statement))
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        columns = [column.name for column in statement.selected_columns]
+        if columns == ["token_version", "team_id", "team_role_id"]:
+            return FakeResult([
+                SimpleNamespace(token_version=0, team_id=team_id, team_role_id=role_id)
+                for team_id, role_id in self.memberships.items()
+            ] or [SimpleNamespace(token_version=0, team_id=None, team_role_id=None)])
+        if columns == ["team_id", "role_id"]:
+            return FakeResult(list(self.memberships.items()))
+        table_names = {table.name for table in find_tables(statement)}
+        for name, rows in self.tables.items():
+            if name in table_names:
+                return FakeResult(rows)
+        return FakeResult([])
+
+    async def scalar(self, statement, *args, **kwargs):
+        return (await self.execute(statement)).scalar()
+
+
+@pytest.fixture(autouse=True)
+def router_states(monkeypatch):
+    for name in ("admin", "organizer", "judge", "mentor", "participant"):
+        monkeypatch.setattr(user_router_state, f"{name}_role_id", uuid.uuid4())
+    monkeypatch.setattr(team_router_state, "accepted_status_id", uuid.uuid4())
+    monkeypatch.setattr(team_router_state, "member_role_id", uuid.uuid4())
+    monkeypatch.setattr(team_router_state, "mentor_role_id", uuid.uuid4())
+    principal_cache._entries.clear()
+    yield
+    principal_cache._entries.clear()
+    app.dependency_overrides.clear()
+
+
+def make_token(user_id: uuid.UUID, role_ids) -> str:
+    principal = AuthPrincipal(
+        id=user_id,
+        email="user@example.com",
+        role_ids=role_ids,
+        current_status_id=None,
+        token_version=0
+    )
+    return create_access_token(principal.to_claims())
+
+
+def request(session: CountingSession, path: str, token: str, method: str = "GET", json=None) -> int:
+    async def override_session():
+        yield session
+
+    app.dependency_overrides[get_session] = override_session
+    # Ответы маршрутов на данных-заглушках не проверяются, важны только запросы авторизации
+    client = TestClient(app, raise_server_exceptions=False)
+    return client.request(method, path, headers={"Authorization": f"Bearer {token}"}, json=json).status_code
+
+
+def evaluation_body(team_id: uuid.UUID) -> dict:
+    return {"team_id": str(team_id), **{f"criterion_{index}": 5 for index in range(1, 6)}}
+
+
+# Маршруты с проверкой членства в команде: (метод, путь, тело)
+TEAM_GUARDED_ROUTES = [
+    ("GET", "/teams/mentor/teams/{team_id}", None),
+    ("GET", "/teams/{team_id}/solution", None),
+    ("GET", "/teams/{team_id}/deployment", None),
+]
+
+# Маршруты с проверкой только ролей: (метод, путь, роль, тело)
+ROLE_GUARDED_ROUTES = [
+    ("GET", "/files/{file_id}", "admin", None),
+    ("POST", "/teams/notify/consultation", "organizer", None),
+    ("POST", "/teams/notify/judge-briefing", "organizer", None),
+    ("POST", "/teams/notify/judge-briefing/{user_id}", "organizer", None),
+    ("POST", "/teams/notify/task-update", "organizer", None),
+    ("POST", "/teams/notify/opening", "organizer", None),
+    ("POST", "/teams/notify/judge-opening", "organizer", None),
+    ("POST", "/teams/notify/defense-schedule", "organizer", None),
+    ("POST", "/teams/notify/closing-ceremony", "organizer", None),
+    ("POST", "/evaluations/evaluate-team", "judge", evaluation_body),
+    ("POST", "/evaluations/batch", "judge", lambda team_id: {"evaluations": [evaluation_body(team_id)]}),
+    ("GET", "/evaluations/team/{team_id}", "judge", None),
+    ("GET", "/evaluations/results", "judge", None),
+    ("GET", "/evaluations/my-evaluations", "judge", None),
+    ("GET", "/evaluations/unevaluated-teams", "judge", None),
+    ("GET", "/evaluations/detailed", "admin", None),
+]
+
+
+def format_path(path: str, team_id: uuid.UUID) -> str:
+    return path.format(team_id=team_id, file_id=uuid.uuid4(), user_id=uuid.uuid4())
+
+
+@pytest.mark.parametrize("cached", [False, True])
+@pytest.mark.parametrize("method, path, body", TEAM_GUARDED_ROUTES)
+def test_team_guarded_endpoint_does_one_auth_query(cached, method, path, body):
+    user_id, team_id = uuid.uuid4(), uuid.uuid4()
+    token = make_token(user_id, [user_router_state.participant_role_id])
+    if cached:
+        request(CountingSession(user_id, {}), "/files/" + str(uuid.uuid4()), token)
+
+    session = CountingSession(
+        user_id,
+        {team_id: team_router_state.member_role_id},
+        tables={"teams": [SimpleNamespace(id=team_id)]}
+    )
+    status_code = request(session, format_path(path, team_id), token, method, body)
+
+    assert status_code not in (401, 403)
+    assert session.auth_queries == 1
+
+
+@pytest.mark.parametrize("cached, expected", [(False, 1), (True, 0)])
+@pytest.mark.parametrize("method, path, role, body", ROLE_GUARDED_ROUTES)
+def test_role_guarded_endpoint_auth_queries(cached, expected, method, path, role, body):
+    user_id, team_id = uuid.uuid4(), uuid.uuid4()
+    token = make_token(user_id, [getattr(user_router_state, f"{role}_role_id")])
+    if cached:
+        request(CountingSession(user_id, {}), "/files/" + str(uuid.uuid4()), token)
+
+    session = CountingSession(user_id, {})
+    status_code = request(session, format_path(path, team_id), token, method, body and body(team_id))
+
+    assert status_code not in (401, 403)
+    assert session.auth_queries == expected
+
+
+def test_team_guard_denies_non_member():
+    user_id, team_id = uuid.uuid4(), uuid.uuid4()
+    token = make_token(user_id, [user_router_state.participant_role_id])
+    session = CountingSession(user_id, {}, tables={"teams": [SimpleNamespace(id=team_id)]})
+
+    assert request(session, f"/teams/{team_id}/solution", token) == 403
+    assert session.auth_queries == 1
+
+
+def test_repeated_checks_reuse_memberships():
+    user_id, team_id = uuid.uuid4(), uuid.uuid4()
+    principal = AuthPrincipal(user_id, "user@example.com", [], None, 0)
+    session = CountingSession(user_id, {team_id: team_router_state.mentor_role_id})
+    auth = AuthContext(principal, session)
+
+    async def checks():
+        await auth.require(any_of=[], team_member=team_id)
+        await auth.require(team_mentor=team_id)
+        assert await auth.is_team_member(team_id)
+        assert not await auth.is_team_member(uuid.uuid4())
+
+    asyncio.run(checks())
+    assert session.auth_queries == 1
@@ -0,0 +1,47 @@
+from src.campaigns.registry import CampaignName, get_campaign
+from src.campaigns.templates import TEAM_NAME, CampaignTemplate, button, link, paragraph
+
+
+def test_dollar_in_title_and_links_is_rendered_literally():
+    url = "https://example.com/pay?amount=$100&ref=$name"
+    template = CampaignTemplate(
+        "Тема",
+        "Призовой фонд $1000",
+        paragraph("Стоимость участия - 0$$"),
+        button(url, "Оплатить $"),
+        link(url)
+    )
+
+    html = template.render("Иван")
+
+    assert "Призовой фонд $1000" in html
+    assert "Стоимость участия - 0$" in html
+    assert "Оплатить $" in html
+    assert html.count(f'href="{url}"') == 2
+    assert "Здравствуйте, Иван!" in html
+
+
+def test_recipient_values_are_not_reparsed():
+    template = CampaignTemplate("Тема", "Заголовок", TEAM_NAME)
+
+    html = template.render("$team_name", "Команда $name & Co")
+
+    assert "Здравствуйте, $team_name!" in html
+    assert "Команда: Команда $name &amp; Co" in html
+
+
+def test_registry_templates_render():
+    for name in CampaignName:
+        html = get_campaign(name).template.render("Иван", "Команда")
+        assert "Здравствуйте, Иван!" in html
+        assert "$" not in html
+
+
+def test_team_confirmation_lists_escaped_roster():
+    template = get_campaign(CampaignName.TEAM_CONFIRMATION).template
+
+    html = template.render("Иван", "Команда", ["Иван Иванов (teamlead)", "<b>Петр</b> (member)"])
+
+    assert 'Ваша команда "Команда" успешно зарегистрирована' in html
+    assert '<li style="margin: 5px 0;">Иван Иванов (teamlead)</li>' in html
+    assert "&lt;b&gt;Петр&lt;/b&gt; (member)" in html
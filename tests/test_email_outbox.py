@@ -0,0 +1,285 @@
+import asyncio
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select, Update
+
+from src.models import EmailOutboxMessage
+from src.models.enums import EmailStatus
+from src.utils.email_outbox import EmailOutboxWorker, SMTPConnectionPool, TokenBucket
+
+COLUMNS = [column.name for column in EmailOutboxMessage.__table__.columns]
+
+
+class SinkHandler:
+    """SMTP сервер-приемник: запоминает письма, первые fail_first писем отклоняет временной ошибкой"""
+
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            return "451 4.3.0 Try again later"
+        self.received.append(message_from_bytes(envelope.content))
+        return "250 OK"
+
+    @property
+    def recipients(self):
+        return [message["To"] for message in self.received]
+
+
+@pytest.fixture
+def smtp_sink():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+class OutboxStore:
+    """
+    Таблица email_outbox в памяти.
+    Изменения сессии видны другим сессиям только после commit, строки, выбранные с FOR UPDATE,
+    заблокированы до конца транзакции и пропускаются другими сессиями (SKIP LOCKED)
+    """
+
+    def __init__(self, messages):
+        self.rows = {
+            message.id: {name: getattr(message, name) for name in COLUMNS}
+            for message in messages
+        }
+        self.locks = {}
+        self.claim_statements = []
+
+    def __call__(self):
+        return OutboxSession(self)
+
+    def claimable(self, row, now: datetime, stale_timeout: float) -> bool:
+        if row["status"] == EmailStatus.PENDING.value:
+            return row["next_attempt_at"] <= now
+        return (
+            row["status"] == EmailStatus.SENDING.value
+            and row["locked_at"] < now - timedelta(seconds=stale_timeout)
+        )
+
+    def status(self, message_id) -> str:
+        return self.rows[message_id]["status"]
+
+
+class FakeScalars:
+    def __init__(self, items):
+        self.items = items
+
+    def all(self):
+        return self.items
+
+
+class FakeResult:
+    def __init__(self, items):
+        self.items = items
+
+    def scalars(self):
+        return FakeScalars(self.items)
+
+
+class OutboxSession:
+    stale_timeout = 60
+
+    def __init__(self, store: OutboxStore):
+        self.store = store
+        self.claimed = []
+        self.updates = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self._release()
+
+    async def execute(self, statement):
+        if isinstance(statement, Update):
+            params = statement.compile().params
+            self.updates.append((params.pop("id_1"), params))
+            return FakeResult([])
+
+        assert isinstance(statement, Select)
+        self.store.claim_statements.append(statement)
+        now = datetime.utcnow()
+        rows = sorted(
+            (
+                row for row in self.store.rows.values()
+                if row["id"] not in self.store.locks
+                and self.store.claimable(row, now, self.stale_timeout)
+            ),
+            key=lambda row: row["next_attempt_at"]
+        )[:statement._limit]
+
+        for row in rows:
+            self.store.locks[row["id"]] = self
+        self.claimed = [EmailOutboxMessage(**row) for row in rows]
+        return FakeResult(self.claimed)
+
+    async def commit(self):
+        # Даем другим воркерам выполнить свой SELECT, пока строки еще заблокированы
+        await asyncio.sleep(0)
+        for message in self.claimed:
+            self.store.rows[message.id].update({name: getattr(message, name) for name in COLUMNS})
+        for message_id, values in self.updates:
+            self.store.rows[message_id].update(values)
+        self._release()
+
+    def _release(self):
+        for message_id, owner in list(self.store.locks.items()):
+            if owner is self:
+                del self.store.locks[message_id]
+        self.claimed, self.updates = [], []
+
+
+def make_messages(count: int):
+    return [
+        EmailOutboxMessage(
+            id=uuid.uuid4(),
+            to_email=f"user{index}@example.com",
+            subject="Тема",
+            body=f"Письмо {index}",
+            is_html=False,
+            status=EmailStatus.PENDING.value,
+            attempts=0,
+            next_attempt_at=datetime.utcnow() - timedelta(seconds=1),
+            locked_at=None
+        )
+        for index in range(count)
+    ]
+
+
+def make_worker(store: OutboxStore, port: int, **overrides) -> EmailOutboxWorker:
+    options = dict(
+        rate_limiter=TokenBucket(rate=0, capacity=1),
+        batch_size=10,
+        poll_interval=0.01,
+        max_attempts=3,
+        retry_base_delay=30,
+        stale_timeout=OutboxSession.stale_timeout
+    )
+    options.update(overrides)
+    return EmailOutboxWorker(
+        session_factory=store,
+        pool=SMTPConnectionPool("127.0.0.1", port, size=2, timeout=5),
+        **options
+    )
+
+
+async def drain(worker: EmailOutboxWorker) -> int:
+    total = 0
+    while processed := await worker.process_batch():
+        total += processed
+    worker.pool.close()
+    return total
+
+
+def test_messages_are_delivered_to_smtp(smtp_sink):
+    handler, port = smtp_sink
+    messages = make_messages(3)
+    store = OutboxStore(messages)
+
+    assert asyncio.run(drain(make_worker(store, port))) == 3
+
+    assert sorted(handler.recipients) == sorted(message.to_email for message in messages)
+    for message in messages:
+        row = store.rows[message.id]
+        assert row["status"] == EmailStatus.SENT.value
+        assert row["attempts"] == 1
+        assert row["sent_at"] is not None
+
+
+def test_failed_delivery_is_retried_with_backoff(smtp_sink):
+    handler, port = smtp_sink
+    handler.fail_first = 2
+    message = make_messages(1)[0]
+    store = OutboxStore([message])
+    worker = make_worker(store, port, retry_base_delay=30)
+    row = store.rows[message.id]
+
+    async def attempt() -> datetime:
+        started_at = datetime.utcnow()
+        assert await worker.process_batch() == 1
+        return started_at
+
+    for attempt_number, delay in ((1, 30), (2, 60)):
+        started_at = asyncio.run(attempt())
+        assert row["status"] == EmailStatus.PENDING.value
+        assert row["attempts"] == attempt_number
+        assert "Try again later" in row["last_error"]
+        # Экспоненциальная задержка: retry_base_delay * 2 ** (attempts - 1)
+        assert started_at + timedelta(seconds=delay) <= row["next_attempt_at"]
+        assert row["next_attempt_at"] <= datetime.utcnow() + timedelta(seconds=delay)
+        # До наступления next_attempt_at письмо не захватывается повторно
+        assert asyncio.run(worker.process_batch()) == 0
+        row["next_attempt_at"] = datetime.utcnow() - timedelta(seconds=1)
+
+    assert asyncio.run(drain(worker)) == 1
+    assert row["status"] == EmailStatus.SENT.value
+    assert row["attempts"] == 3
+    assert handler.recipients == [message.to_email]
+
+
+def test_message_fails_after_max_attempts(smtp_sink):
+    handler, port = smtp_sink
+    handler.fail_first = 1
+    message = make_messages(1)[0]
+    store = OutboxStore([message])
+
+    assert asyncio.run(drain(make_worker(store, port, max_attempts=1))) == 1
+
+    assert store.status(message.id) == EmailStatus.FAILED.value
+    assert handler.recipients == []
+
+
+def test_token_bucket_limits_send_rate(smtp_sink):
+    handler, port = smtp_sink
+    store = OutboxStore(make_messages(6))
+    worker = make_worker(store, port, rate_limiter=TokenBucket(rate=20, capacity=2))
+
+    started_at = time.monotonic()
+    asyncio.run(drain(worker))
+    elapsed = time.monotonic() - started_at
+
+    # Два письма уходят сразу (capacity), остальные четыре - не чаще 20 в секунду
+    assert len(handler.received) == 6
+    assert elapsed >= 4 / 20 * 0.9
+
+
+def test_claim_query_skips_locked_rows(smtp_sink):
+    handler, port = smtp_sink
+    messages = make_messages(40)
+    store = OutboxStore(messages)
+    workers = [make_worker(store, port, batch_size=5) for _ in range(3)]
+
+    async def run_concurrently():
+        return await asyncio.gather(*(drain(worker) for worker in workers))
+
+    processed = asyncio.run(run_concurrently())
+
+    # Каждое письмо захвачено одним воркером и отправлено ровно один раз
+    assert sum(processed) == len(messages)
+    assert sorted(handler.recipients) == sorted(message.to_email for message in messages)
+    assert all(store.status(message.id) == EmailStatus.SENT.value for message in messages)
+    assert all(store.rows[message.id]["attempts"] == 1 for message in messages)
+    # Воркеры действительно работали параллельно
+    assert sum(1 for count in processed if count) > 1
+
+    for statement in store.claim_statements:
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert sql.endswith("FOR UPDATE SKIP LOCKED")
@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.utils.evaluation_stats import compute_normalized_ranking, normalize_scores, rank_descending
+
+WEIGHTS = np.ones(5)
+
+
+def test_judge_severity_does_not_change_normalized_scores():
+    rng = np.random.default_rng(1)
+    scores = rng.uniform(3, 8, size=(4, 6, 5))
+    # Второй судья ставит всем на 3 балла меньше, четвертый - на 2 больше
+    biased = scores + np.array([0, -3, 0, 2]).reshape(4, 1, 1)
+
+    assert np.allclose(normalize_scores(scores, WEIGHTS), normalize_scores(biased, WEIGHTS))
+
+
+def test_harsh_judge_does_not_decide_ranking():
+    # Команды 0 и 1 одинаково сильные, но команду 1 оценил только строгий судья 2
+    scores = np.full((3, 4, 5), np.nan)
+    scores[0, [0, 2, 3]] = [[8] * 5, [5] * 5, [3] * 5]
+    scores[1, [0, 2, 3]] = [[9] * 5, [6] * 5, [4] * 5]
+    scores[2, [1, 2, 3]] = [[5] * 5, [2] * 5, [0] * 5]
+
+    ranking = compute_normalized_ranking(["a", "b", "c", "d"], scores, WEIGHTS, iterations=200, confidence=0.95)
+
+    by_team = {row["team_id"]: row for row in ranking}
+    # По сырой сумме команда b хуже c, после нормализации она наравне с a
+    assert by_team["b"]["raw_total_score"] < by_team["c"]["raw_total_score"]
+    assert by_team["b"]["normalized_score"] == by_team["a"]["normalized_score"]
+    assert by_team["b"]["rank"] < by_team["c"]["rank"]
+    for row in ranking:
+        assert row["rank_ci_low"] <= row["rank_ci_high"]
+
+
+def test_unevaluated_teams_rank_last():
+    ranks = rank_descending(np.array([[1.0, np.nan, 3.0, 2.0]]))
+
+    assert ranks.tolist() == [[3, 4, 1, 2]]
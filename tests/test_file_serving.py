@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from src.utils.file_serving import etag_matches, serve_stored_file
+from src.utils.leaderboard import leaderboard_cache, leaderboard_response
+
+
+def make_request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.mark.parametrize("header, weak, expected", [
+    ('"v1"', True, True),
+    ('"v0", "v1"', True, True),
+    ('"v0",W/"v1"', True, True),
+    ('W/"v1"', False, False),
+    ('*', True, True),
+    ('"v10"', True, False),
+    ('"v1-gzip"', True, False),
+    ('', True, False),
+])
+def test_etag_matches_compares_whole_entity_tags(header, weak, expected):
+    assert etag_matches(header, '"v1"', weak=weak) is expected
+
+
+@pytest.mark.parametrize("if_none_match, expected_status", [
+    ('"v0", W/"v1"', 304),
+    ('"v1"', 304),
+    ('"v2"', 200),
+    ('*', 304),
+])
+def test_leaderboard_revalidation_parses_if_none_match(monkeypatch, if_none_match, expected_status):
+    async def cached(session):
+        return b"[]", '"v1"'
+
+    monkeypatch.setattr(leaderboard_cache, "get", cached)
+    response = asyncio.run(leaderboard_response(make_request({"If-None-Match": if_none_match}), None))
+
+    assert response.status_code == expected_status
+    assert response.headers["etag"] == '"v1"'
+
+
+@pytest.fixture
+def stored_file(tmp_path):
+    content = b"solution"
+    path = tmp_path / "solution.zip"
+    path.write_bytes(content)
+    os.utime(path, (1700000000, 1700000000))
+    return SimpleNamespace(
+        file_path=str(path),
+        filename="solution.zip",
+        sha256=hashlib.sha256(content).hexdigest(),
+        size=len(content),
+        mime_type="application/zip",
+        created_at=None
+    )
+
+
+def test_last_modified_falls_back_to_file_mtime(stored_file):
+    response = asyncio.run(serve_stored_file(make_request({}), stored_file, "application/octet-stream"))
+
+    assert response.headers["last-modified"] == formatdate(1700000000, usegmt=True)
+    assert response.headers["etag"] == f'"{stored_file.sha256}"'
+
+
+def test_last_modified_uses_created_at(stored_file):
+    stored_file.created_at = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+    response = asyncio.run(serve_stored_file(make_request({}), stored_file, "application/octet-stream"))
+
+    assert response.headers["last-modified"] == "Thu, 01 Oct 2026 12:00:00 GMT"
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.utils.multipart_stream import FileField, parse_multipart_stream
+
+BOUNDARY = "boundary"
+DOCUMENT = FileField((".pdf", ".png"), 1024)
+
+
+def multipart_body(filename: str, content: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="email"\r\n\r\n'
+        f"user@example.com\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="consent_file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, chunk_size: int = 64) -> Request:
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+    received = []
+
+    async def receive():
+        chunk = chunks.pop(0)
+        received.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    request = Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }, receive)
+    request.received = received
+    return request
+
+
+def parse(request: Request, directory):
+    return asyncio.run(parse_multipart_stream(request, str(directory), {"consent_file": DOCUMENT}))
+
+
+def test_allowed_file_is_streamed_to_disk(tmp_path):
+    form = parse(make_request(multipart_body("Согласие.PDF", b"%PDF" * 10)), tmp_path)
+
+    upload = form.file("consent_file")
+    assert form.field("email") == "user@example.com"
+    assert upload.size == 40
+    assert open(upload.stream.temp_path, "rb").read() == b"%PDF" * 10
+    asyncio.run(form.discard())
+
+
+def test_wrong_extension_is_rejected_before_writing(tmp_path):
+    body = multipart_body("payload.exe", b"x" * 100_000)
+    request = make_request(body)
+
+    with pytest.raises(HTTPException) as error:
+        parse(request, tmp_path)
+
+    assert error.value.status_code == 400
+    assert "PDF, PNG" in error.value.detail
+    # Тело дальше заголовка части не читалось, на диск ничего не записано
+    assert sum(len(chunk) for chunk in request.received) < len(body) // 10
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_over_limit_is_rejected(tmp_path):
+    with pytest.raises(HTTPException) as error:
+        parse(make_request(multipart_body("scan.png", b"x" * 2048)), tmp_path)
+
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,107 @@
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from src.db import get_session
+from src.models.enums import StageType
+from src.utils.results_snapshot import CURRENT_POINTER, _write_snapshot, results_snapshot_store
+from src.utils.router_states import CurrentStage, stage_router_state
+
+RESULTS = [
+    {
+        "team_id": str(uuid.uuid4()),
+        "team_name": f"Команда {index}",
+        "team_motto": "Девиз",
+        "average_score": 40.0 - index,
+        "evaluations_count": 3,
+        "total_score": 120.0 - 3 * index
+    }
+    for index in range(50)
+]
+BODY = json.dumps(RESULTS, ensure_ascii=False).encode("utf-8")
+
+
+class NoDatabaseSession:
+    async def execute(self, statement, *args, **kwargs):
+        raise AssertionError("После публикации результаты отдаются без запросов к бд")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_snapshot_store, "directory", tmp_path)
+    results_snapshot_store.invalidate()
+    monkeypatch.setattr(stage_router_state, "cache_enabled", True)
+    monkeypatch.setattr(stage_router_state, "_cache_loaded", True)
+    monkeypatch.setattr(stage_router_state, "current_stage", CurrentStage(
+        id=uuid.uuid4(), name="Публикация результатов", type=StageType.RESULTS_PUBLICATION.value, order=7
+    ))
+
+    async def override_session():
+        yield NoDatabaseSession()
+
+    app.dependency_overrides[get_session] = override_session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    results_snapshot_store.invalidate()
+
+
+def test_snapshot_files_are_versioned(tmp_path):
+    version = _write_snapshot(tmp_path, BODY)
+
+    assert (tmp_path / CURRENT_POINTER).read_text() == version
+    assert (tmp_path / f"{version}.json").read_bytes() == BODY
+    assert (tmp_path / f"{version}.json.gz").exists()
+    assert (tmp_path / f"{version}.json.br").exists()
+    # Тот же контент - та же версия
+    assert _write_snapshot(tmp_path, BODY) == version
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("identity", None),
+])
+def test_snapshot_is_served_pre_compressed(client, tmp_path, accept_encoding, expected):
+    version = _write_snapshot(tmp_path, BODY)
+
+    response = client.get("/evaluations/public-results", headers={"Accept-Encoding": accept_encoding})
+
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == expected
+    assert response.content == BODY
+    assert response.headers["etag"] == f'"{version}"'
+    assert response.headers["cache-control"] == f"public, max-age={results_snapshot_store.max_age}"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("if_none_match", ['"{version}"', '"0123456789abcdef", W/"{version}"', "*"])
+def test_snapshot_revalidation_returns_304(client, tmp_path, if_none_match):
+    version = _write_snapshot(tmp_path, BODY)
+
+    response = client.get(
+        "/evaluations/public-results",
+        headers={"If-None-Match": if_none_match.format(version=version)}
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{version}"'
+
+
+def test_new_version_is_served_after_invalidation(client, tmp_path):
+    _write_snapshot(tmp_path, BODY)
+    assert client.get("/evaluations/public-results").content == BODY
+
+    changed = json.dumps(RESULTS[:10], ensure_ascii=False).encode("utf-8")
+    version = _write_snapshot(tmp_path, changed)
+    # Без уведомления о смене этапа воркер отдает загруженную версию
+    assert client.get("/evaluations/public-results").content == BODY
+
+    results_snapshot_store.invalidate()
+    response = client.get("/evaluations/public-results")
+    assert response.content == changed
+    assert response.headers["etag"] == f'"{version}"'
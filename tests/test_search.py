@@ -0,0 +1,56 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from src.models import User, Team
+from src.utils.search import normalize_search_query, search_condition, search_rank
+
+
+def compile_sql(statement) -> str:
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    # Драйвер с paramstyle pyformat удваивает % в тексте запроса
+    return sql.replace("%%", "%")
+
+
+def test_query_is_normalized_like_search_normalize():
+    # search_normalize() в бд: lower() и ё -> е
+    assert normalize_search_query("  ЁЛКИНА   Алёна ") == "елкина алена"
+    assert normalize_search_query("Ivanov@Example.COM") == "ivanov@example.com"
+
+
+def test_condition_uses_trigram_indexed_expressions():
+    sql = compile_sql(select(User.id).where(search_condition([User.full_name, User.email], "Алёна")))
+
+    # Оба оператора (LIKE и %>) применяются к выражениям индексов ix_users_full_name_trgm и ix_users_email_trgm
+    assert "search_normalize(users.full_name) LIKE '%алена%'" in sql
+    assert "search_normalize(users.full_name) %> 'алена'" in sql
+    assert "search_normalize(users.email) LIKE '%алена%'" in sql
+    assert "search_normalize(users.email) %> 'алена'" in sql
+    assert "ILIKE" not in sql
+
+
+def test_like_wildcards_in_query_are_escaped():
+    condition = search_condition([Team.team_name], "100%_team")
+    params = condition.compile(dialect=postgresql.dialect()).params
+
+    assert "%100\\%\\_team%" in params.values()
+    assert "100%_team" in params.values()
+
+
+def test_rank_prefers_prefix_matches():
+    sql = compile_sql(select(search_rank([User.full_name], "ива")))
+
+    assert "LIKE 'ива%') THEN 2.0" in sql
+    assert "LIKE '% ива%') THEN 1.5" in sql
+    assert "word_similarity('ива', search_normalize(users.full_name))" in sql
+
+
+def test_models_declare_same_indexes_as_migration():
+    indexes = {index.name: index for index in [*User.__table__.indexes, *Team.__table__.indexes]}
+
+    for table, column in (("users", "full_name"), ("users", "email"), ("teams", "team_name")):
+        ddl = str(CreateIndex(indexes[f"ix_{table}_{column}_trgm"]).compile(dialect=postgresql.dialect()))
+        assert ddl == (
+            f"CREATE INDEX ix_{table}_{column}_trgm ON {table} "
+            f"USING gin (search_normalize({column}) gin_trgm_ops)"
+        )
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from src.models import SolutionUpload
+from src.utils import resumable_upload
+from src.utils.blob_store import StoredBlob
+from src.utils.resumable_upload import complete_solution_upload, write_solution_chunk
+
+CHUNK = b"chunk" * 1000
+
+
+class LeaseSession:
+    """Сессия без бд: отслеживает, открыта ли транзакция, и отвечает заданным числом строк"""
+
+    def __init__(self, rowcount: int = 1, exists: bool = True):
+        self.rowcount = rowcount
+        self.exists = exists
+        self.in_transaction = False
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.in_transaction = True
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    async def scalar(self, statement, *args, **kwargs):
+        self.in_transaction = True
+        return uuid.uuid4() if self.exists else None
+
+    def add(self, instance):
+        self.added = instance
+
+    async def refresh(self, instance):
+        pass
+
+    async def commit(self):
+        self.in_transaction = False
+
+    async def rollback(self):
+        self.in_transaction = False
+
+
+def make_upload(tmp_path) -> SolutionUpload:
+    return SolutionUpload(
+        id=uuid.uuid4(),
+        team_id=uuid.uuid4(),
+        filename="solution.zip",
+        file_path=str(tmp_path / "upload.part"),
+        total_size=len(CHUNK),
+        received_size=0,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        lease_token=uuid.uuid4()
+    )
+
+
+def make_request(session: LeaseSession) -> Request:
+    messages = [CHUNK[:1000], CHUNK[1000:]]
+
+    async def receive():
+        # Тело части принимается без открытой транзакции и без соединения с бд
+        assert not session.in_transaction
+        body = messages.pop(0)
+        return {"type": "http.request", "body": body, "more_body": bool(messages)}
+
+    return Request({"type": "http", "method": "PUT", "path": "/", "query_string": b"", "headers": []}, receive)
+
+
+def test_chunk_is_received_outside_transaction(tmp_path):
+    session = LeaseSession()
+    upload = make_upload(tmp_path)
+
+    asyncio.run(write_solution_chunk(
+        session, upload, make_request(session), 0, hashlib.sha256(CHUNK).hexdigest()
+    ))
+
+    assert (tmp_path / "upload.part").read_bytes() == CHUNK
+    assert not session.in_transaction
+    # offset фиксируется, только если аренда еще наша и offset не сдвинул другой запрос
+    [finish] = session.statements
+    assert "solution_uploads.lease_token = " in finish
+    assert "solution_uploads.received_size = " in finish
+
+
+@pytest.mark.parametrize("exists, expected_status", [(True, 409), (False, 404)])
+def test_lost_lease_rejects_chunk(tmp_path, exists, expected_status):
+    session = LeaseSession(rowcount=0, exists=exists)
+    upload = make_upload(tmp_path)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(write_solution_chunk(
+            session, upload, make_request(session), 0, hashlib.sha256(CHUNK).hexdigest()
+        ))
+
+    assert error.value.status_code == expected_status
+    # Отмененная во время записи загрузка не оставляет файл части
+    assert (tmp_path / "upload.part").exists() is exists
+    assert not session.in_transaction
+
+
+def test_checksum_mismatch_releases_lease(tmp_path):
+    session = LeaseSession()
+    upload = make_upload(tmp_path)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(write_solution_chunk(session, upload, make_request(session), 0, "0" * 64))
+
+    assert error.value.status_code == 400
+    [release] = session.statements
+    assert "SET lease_token=" in release and "received_size" not in release.split("WHERE")[0]
+
+
+def test_complete_retry_takes_archive_from_blob_store(tmp_path, monkeypatch):
+    session = LeaseSession()
+    upload = make_upload(tmp_path)
+    upload.received_size = upload.total_size
+    # Первый запрос перенес архив в хранилище и упал до commit
+    upload.blob_sha256 = hashlib.sha256(CHUNK).hexdigest()
+    stored = StoredBlob(upload.blob_sha256, len(CHUNK), "application/zip", "blobs/stored", True)
+
+    async def find(session, sha256):
+        return stored if sha256 == stored.sha256 else None
+
+    async def ingest(*args):
+        raise AssertionError("Архив уже в хранилище")
+
+    async def remove_team_solution(session, team_id):
+        pass
+
+    monkeypatch.setattr(resumable_upload.blob_store, "find", find)
+    monkeypatch.setattr(resumable_upload.blob_store, "ingest", ingest)
+    monkeypatch.setattr(resumable_upload, "remove_team_solution", remove_team_solution)
+
+    solution_file = asyncio.run(complete_solution_upload(session, upload))
+
+    assert solution_file.sha256 == stored.sha256
+    assert solution_file.file_path == stored.storage_path
+    assert session.statements[-1].startswith("DELETE FROM solution_uploads")
+
+
+def test_complete_with_lost_archive_is_gone(tmp_path):
+    session = LeaseSession()
+    upload = make_upload(tmp_path)
+    upload.received_size = upload.total_size
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(complete_solution_upload(session, upload))
+
+    # Архив перенесен прерванным запросом без отметки - вместо 500 сессия удаляется
+    assert error.value.status_code == 410
+    assert session.statements[-1].startswith("DELETE FROM solution_uploads")
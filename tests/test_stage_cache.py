@@ -0,0 +1,109 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from src.models import Stage
+from src.models.enums import StageType
+from src.utils.db_events import db_event_listener
+from src.utils.router_states import stage_router_state
+from src.utils.stage_checker import check_stage
+from src.utils.stage_events import STAGE_CHANGED_CHANNEL
+
+
+class FakeResult:
+    def __init__(self, stage):
+        self.stage = stage
+
+    def scalar_one_or_none(self):
+        return self.stage
+
+
+class StageSession:
+    """Сессия без бд: отдает активный этап и считает запросы"""
+
+    def __init__(self, stage_type: StageType):
+        self.queries = 0
+        self.activate(stage_type)
+
+    def activate(self, stage_type: StageType) -> None:
+        self.stage = Stage(id=uuid.uuid4(), name=stage_type.name, type=stage_type.value, order=1)
+
+    async def execute(self, statement, *args, **kwargs):
+        self.queries += 1
+        return FakeResult(self.stage)
+
+
+@pytest.fixture(autouse=True)
+def stage_cache():
+    stage_router_state.invalidate()
+    yield
+    db_event_listener._set_connected(False)
+    stage_router_state.cache_enabled = False
+
+
+def notify_stage_changed() -> None:
+    """Уведомление stage_changed, пришедшее на LISTEN соединение воркера"""
+    db_event_listener._on_notification(None, 0, STAGE_CHANGED_CHANNEL, "")
+
+
+async def check_many(session: StageSession, stage_type: StageType, count: int) -> None:
+    for _ in range(count):
+        assert (await check_stage(session, stage_type)).type == stage_type.value
+
+
+def test_guarded_requests_share_one_stage_query():
+    db_event_listener._set_connected(True)
+    session = StageSession(StageType.REGISTRATION)
+
+    asyncio.run(check_many(session, StageType.REGISTRATION, 100))
+
+    assert session.queries == 1
+
+
+def test_notification_from_other_worker_invalidates_cache():
+    db_event_listener._set_connected(True)
+    session = StageSession(StageType.REGISTRATION)
+    asyncio.run(check_many(session, StageType.REGISTRATION, 3))
+
+    # Другой воркер переключил этап и отправил NOTIFY
+    session.activate(StageType.REGISTRATION_CLOSED)
+    notify_stage_changed()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(check_stage(session, StageType.REGISTRATION))
+    assert error.value.status_code == 403
+    asyncio.run(check_many(session, StageType.REGISTRATION_CLOSED, 3))
+    assert session.queries == 2
+
+
+def test_cache_is_bypassed_without_listen_connection():
+    db_event_listener._set_connected(True)
+    session = StageSession(StageType.REGISTRATION)
+    asyncio.run(check_many(session, StageType.REGISTRATION, 3))
+
+    # Соединение LISTEN потеряно - уведомления могут пропасть, поэтому каждый запрос идет в бд
+    db_event_listener._set_connected(False)
+    asyncio.run(check_many(session, StageType.REGISTRATION, 3))
+
+    assert session.queries == 4
+
+
+def test_stage_change_during_refresh_is_not_cached():
+    db_event_listener._set_connected(True)
+    session = StageSession(StageType.REGISTRATION)
+    execute = session.execute
+
+    async def execute_with_concurrent_change(statement, *args, **kwargs):
+        result = await execute(statement)
+        # Уведомление пришло, пока выполнялся запрос этапа
+        notify_stage_changed()
+        return result
+
+    session.execute = execute_with_concurrent_change
+    asyncio.run(check_stage(session, StageType.REGISTRATION))
+    session.execute = execute
+    asyncio.run(check_stage(session, StageType.REGISTRATION))
+
+    assert session.queries == 2
@@ -0,0 +1,122 @@
+import asyncio
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from src.auth.permissions import AuthContext
+from src.auth.principal import AuthPrincipal
+from src.routers import evaluations
+from src.schemas.evaluation import TeamEvaluationCreate
+from src.utils.evaluation_utils import CRITERIA
+
+
+class FakeDatabase:
+    """
+    Бд с уровнем изоляции READ COMMITTED: транзакция видит зафиксированные строки и свои изменения.
+    pg_advisory_xact_lock держится до commit/rollback.
+    """
+
+    def __init__(self):
+        self.evaluations = {}
+        self.team_scores = {}
+        self.locks = {}
+
+
+class FakeSession:
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+        self.pending_evaluations = {}
+        self.pending_scores = {}
+        self.held_locks = []
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        assert "pg_advisory_xact_lock" in sql, "Роутер выполняет только блокировки, запись подменена"
+        key = next(iter(statement.compile().params.values()))
+        lock = self.database.locks.setdefault(key, asyncio.Lock())
+        await lock.acquire()
+        self.held_locks.append(lock)
+
+    def _release(self):
+        for lock in self.held_locks:
+            lock.release()
+        self.held_locks.clear()
+
+    async def commit(self):
+        self.database.evaluations.update(self.pending_evaluations)
+        self.database.team_scores.update(self.pending_scores)
+        self._release()
+
+    async def rollback(self):
+        self.pending_evaluations.clear()
+        self.pending_scores.clear()
+        self._release()
+
+
+async def fake_upsert_evaluations(session, judge_id, items):
+    for item in items:
+        session.pending_evaluations[(item.team_id, judge_id)] = sum(getattr(item, name) for name in CRITERIA)
+    return list(items)
+
+
+async def fake_refresh_team_scores(session, team_ids):
+    # Переключение на другую транзакцию между записью оценки и пересчетом итога
+    await asyncio.sleep(0.01)
+    visible = {**session.database.evaluations, **session.pending_evaluations}
+    for team_id in team_ids:
+        session.pending_scores[team_id] = sum(
+            total for (evaluated_team_id, _), total in visible.items() if evaluated_team_id == team_id
+        )
+    await asyncio.sleep(0.01)
+
+
+async def fake_refresh_team_score(session, team_id):
+    await fake_refresh_team_scores(session, [team_id])
+
+
+def make_auth(session) -> AuthContext:
+    principal = AuthPrincipal(
+        id=uuid.uuid4(),
+        email="judge@example.com",
+        role_ids=[],
+        current_status_id=None,
+        token_version=0
+    )
+    return AuthContext(principal, session, memberships={})
+
+
+def make_evaluation(team_id, score) -> TeamEvaluationCreate:
+    return TeamEvaluationCreate(team_id=team_id, **{name: score for name in CRITERIA})
+
+
+def test_concurrent_judges_do_not_lose_team_total(monkeypatch):
+    monkeypatch.setattr(evaluations, "upsert_evaluations", fake_upsert_evaluations)
+    monkeypatch.setattr(evaluations, "refresh_team_score", fake_refresh_team_score)
+    monkeypatch.setattr(evaluations, "refresh_team_scores", fake_refresh_team_scores)
+    database = FakeDatabase()
+    team_id = uuid.uuid4()
+
+    async def evaluate(score):
+        session = FakeSession(database)
+        await evaluations.create_evaluation(make_evaluation(team_id, score), make_auth(session), session)
+
+    async def run():
+        await asyncio.gather(evaluate(10), evaluate(5))
+
+    asyncio.run(run())
+
+    # Без блокировки каждая транзакция видит только свою оценку, и итог равен 50 или 25
+    assert database.team_scores[team_id] == 75
+
+
+def test_teams_are_locked_once_in_sorted_order():
+    team_ids = sorted(uuid.uuid4() for _ in range(3))
+    session = FakeSession(FakeDatabase())
+
+    # Пакет с повторами и в обратном порядке: иначе два пакета могут ждать друг друга
+    asyncio.run(evaluations.lock_team_scores(session, [*reversed(team_ids), team_ids[0]]))
+
+    assert len(session.statements) == 3
+    assert list(session.database.locks) == [f"team_score:{team_id}" for team_id in team_ids]
@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.utils.router_states import team_router_state, user_router_state
+from src.utils.team_utils import refresh_teams_status
+
+
+class StatusSession:
+    def __init__(self, members):
+        self.members = members
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        if len(self.statements) == 1:
+            return self.members
+        return SimpleNamespace(scalars=lambda: [])
+
+
+@pytest.fixture(autouse=True)
+def router_states(monkeypatch):
+    for name in ("accepted_status_id", "member_role_id", "mentor_role_id", "teamlead_role_id"):
+        monkeypatch.setattr(team_router_state, name, uuid.uuid4())
+    for name in ("pending_status_id", "approved_status_id", "need_update_status_id"):
+        monkeypatch.setattr(user_router_state, name, uuid.uuid4())
+
+
+def test_summaries_are_upserted_in_one_statement():
+    team_ids = [uuid.uuid4() for _ in range(3)]
+    members = [(team_ids[0], team_router_state.mentor_role_id, user_router_state.approved_status_id)]
+    session = StatusSession(members)
+
+    asyncio.run(refresh_teams_status(session, [*team_ids, team_ids[1]]))
+
+    upsert = session.statements[1].compile(dialect=postgresql.dialect())
+    sql = str(upsert)
+    # Параллельные запросы без SELECT перед вставкой: конфликт по ключу решает бд
+    assert sql.startswith("INSERT INTO team_status_summaries")
+    assert "ON CONFLICT (team_id) DO UPDATE SET status = excluded.status" in sql
+    assert "updated_at = now()" in sql
+    # Строки в порядке id, без повторов
+    inserted = [value for name, value in upsert.params.items() if name.startswith("team_id")]
+    assert inserted == sorted(team_ids)
+    statuses = [value for name, value in upsert.params.items() if name.startswith("status")]
+    assert statuses == ["incomplete"] * 3